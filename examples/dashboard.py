@@ -0,0 +1,38 @@
+import argparse
+
+import PyQt5.QtWidgets as Qt  # QApplication, QWidget
+import pyThorlabsPM100x
+import pyThorlabsPM100x.driver
+import pyThorlabsPM100x.pyvisa_virtual
+from pyThorlabsPM100x.dashboard import Dashboard
+
+parser = argparse.ArgumentParser(description="Show several power meters in a single window.")
+parser.add_argument('-virtual', help="Simulate the consoles (see -n)", action="store_true")
+parser.add_argument('-n', help="Number of simulated consoles (default 16)", type=int, default=16)
+args = parser.parse_args()
+
+if args.virtual:
+    # Simulate args.n consoles, all of them Thorlabs power meters which answer to queries
+    pyThorlabsPM100x.pyvisa_virtual.set_default_devices(
+        pyThorlabsPM100x.pyvisa_virtual.generate_device_configs(args.n, foreign_fraction=0, unresponsive_fraction=0))
+
+app = Qt.QApplication([])
+window = Qt.QWidget()
+window.setWindowTitle("Power meters")
+window.resize(900, 700)
+
+# Create one interface for each console found, and connect it. Each interface acquires data on its own,
+# while all the widgets of the dashboard are refreshed together by a single timer
+Interfaces = []
+for (address, idn, _) in pyThorlabsPM100x.driver.ThorlabsPM100x(virtual=args.virtual).list_devices():
+    Interface = pyThorlabsPM100x.interface(app=app, virtual=args.virtual)
+    Interface.verbose = False
+    Interface.connect_device(f"{idn} --> {address}")
+    app.aboutToQuit.connect(Interface.close)
+    Interfaces.append(Interface)
+
+dashboard = Dashboard(app, window, Interfaces, refresh_time=0.1, time_window=30)
+dashboard.start_all()
+
+window.show()
+app.exec()  # Start the event loop.
@@ -4,6 +4,7 @@ package_name = 'PyQt5'
 spec = importlib.util.find_spec(package_name)
 if spec:
     from .main import interface, gui
+    from .dashboard import Dashboard
 
 
 
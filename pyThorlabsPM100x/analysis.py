@@ -0,0 +1,188 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Noise analysis of the acquired power, computed with NumPy.
+
+Provides :func:`welch_psd` (Welch-averaged power spectral density) and :func:`histogram`,
+together with :class:`NoiseAnalyzer`, which computes both on a worker thread and delivers the
+results via a Qt signal, so that the GUI (and the acquisition) are never stalled.
+"""
+
+import threading
+
+import numpy as np
+import PyQt5.QtCore as QtCore
+
+
+def latest_contiguous(timestamps, values):
+    '''
+    Return the samples acquired after the last non-finite value (e.g. the ``NaN`` marking a gap
+    in the acquisition), i.e. the most recent block of valid, evenly acquired samples.
+
+    Parameters
+    ----------
+    timestamps, values : numpy.ndarray
+        Acquisition times and values.
+
+    Returns
+    -------
+    (timestamps, values) : (numpy.ndarray, numpy.ndarray)
+    '''
+    invalid = np.flatnonzero(~np.isfinite(values))
+    if len(invalid) > 0:
+        (timestamps, values) = (timestamps[invalid[-1]+1:], values[invalid[-1]+1:])
+    return timestamps, values
+
+
+def welch_psd(values, sample_rate, segment_length=256, overlap=0.5):
+    '''
+    One-sided power spectral density estimated with Welch's method.
+
+    The signal is split into segments of ``segment_length`` samples, overlapping by a fraction
+    ``overlap``. Each segment is detrended (by removing its mean) and multiplied by a Hann window,
+    and the periodograms of all segments are averaged. All segments are processed at once with
+    vectorized NumPy operations.
+
+    Parameters
+    ----------
+    values : array_like of float
+        Evenly sampled signal. Must not contain ``NaN`` values.
+    sample_rate : float
+        Sampling rate, in Hz.
+    segment_length : int, optional
+        Number of samples per segment. If the signal is shorter, a single segment with all the
+        samples is used. Default is 256.
+    overlap : float, optional
+        Fraction of overlap between consecutive segments, in ``[0, 1)``. Default is 0.5.
+
+    Returns
+    -------
+    (frequencies, psd) : (numpy.ndarray, numpy.ndarray)
+        Frequencies (in Hz), and power spectral density (in units of ``values`` squared per Hz).
+
+    Raises
+    ------
+    ValueError
+        If the signal has less than 2 samples, or ``overlap`` is not valid.
+    '''
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        raise ValueError("At least 2 samples are required to compute a spectrum.")
+    if not (0 <= overlap < 1):
+        raise ValueError("overlap must be in the interval [0, 1).")
+    nperseg = int(min(segment_length, len(values)))
+    step = max(int(nperseg*(1 - overlap)), 1)
+    n_segments = (len(values) - nperseg)//step + 1
+    indices = np.arange(nperseg)[None, :] + step*np.arange(n_segments)[:, None]
+    segments = values[indices]
+    segments = segments - segments.mean(axis=1, keepdims=True)
+    window = np.hanning(nperseg)
+    spectra = np.abs(np.fft.rfft(segments*window, axis=1))**2
+    psd = spectra.mean(axis=0) / (sample_rate * (window**2).sum())
+    # One-sided spectrum: double all frequencies except DC (and Nyquist, for even lengths)
+    if nperseg % 2 == 0:
+        psd[1:-1] *= 2
+    else:
+        psd[1:] *= 2
+    return np.fft.rfftfreq(nperseg, d=1/sample_rate), psd
+
+
+def histogram(values, bins=50):
+    '''
+    Histogram of the finite values in ``values``.
+
+    Parameters
+    ----------
+    values : array_like of float
+        The data. Non-finite values are ignored.
+    bins : int, optional
+        Number of bins. Default is 50.
+
+    Returns
+    -------
+    (counts, edges) : (numpy.ndarray, numpy.ndarray)
+        See ``numpy.histogram``.
+    '''
+    values = np.asarray(values, dtype=float)
+    return np.histogram(values[np.isfinite(values)], bins=bins)
+
+
+class NoiseAnalyzer(QtCore.QObject):
+    """
+    Compute the spectrum and the histogram of a block of samples on a worker thread.
+
+    Each call to :meth:`request` starts a new worker thread, unless the previous computation
+    is still running (in which case the request is dropped). When the computation is done, the
+    results are emitted via :attr:`sig_result` (and therefore delivered to slots in the main
+    thread, via Qt's queued connections).
+
+    Attributes
+    ----------
+    segment_length : int
+        Number of samples per segment of the Welch method (see :func:`welch_psd`).
+    bins : int
+        Number of bins of the histogram.
+    busy : bool
+        ``True`` while a computation is running.
+
+    Signals
+    -------
+    sig_result : pyqtSignal(object)
+        Emitted with a dictionary with keys ``'frequencies'``, ``'psd'``, ``'counts'``, ``'edges'``,
+        ``'sample_rate'`` and ``'samples'`` (number of samples analyzed).
+    sig_error : pyqtSignal(str)
+        Emitted with an error message if the computation fails (e.g. too few samples).
+    """
+
+    sig_result = QtCore.pyqtSignal(object)
+    sig_error = QtCore.pyqtSignal(str)
+
+    def __init__(self, segment_length=256, bins=50):
+        super().__init__()
+        self.segment_length = segment_length
+        self.bins = bins
+        self.busy = False
+
+    def request(self, timestamps, values):
+        '''
+        Start the analysis of a block of samples on a worker thread. Only the most recent block of
+        contiguous valid samples is analyzed (see :func:`latest_contiguous`), and the sampling rate
+        is estimated from the median interval between timestamps.
+
+        Parameters
+        ----------
+        timestamps, values : numpy.ndarray
+            Acquisition times (in seconds) and values. They are copied, so they can be views of a
+            buffer which keeps changing.
+
+        Returns
+        -------
+        bool
+            ``True`` if the computation was started, ``False`` if the previous one is still running.
+        '''
+        if self.busy:
+            return False
+        self.busy = True
+        args = (np.array(timestamps, dtype=float), np.array(values, dtype=float))
+        threading.Thread(target=self._run, args=args, daemon=True).start()
+        return True
+
+    def _run(self, timestamps, values):
+        try:
+            (timestamps, values) = latest_contiguous(timestamps, values)
+            if len(values) < 2:
+                raise ValueError("Not enough valid samples to compute a spectrum.")
+            interval = np.median(np.diff(timestamps))
+            if not (interval > 0):
+                raise ValueError("Could not determine the sampling rate from the timestamps.")
+            sample_rate = 1/interval
+            (frequencies, psd) = welch_psd(values, sample_rate, self.segment_length)
+            (counts, edges) = histogram(values, self.bins)
+            result = {'frequencies': frequencies, 'psd': psd, 'counts': counts, 'edges': edges,
+                      'sample_rate': sample_rate, 'samples': len(values)}
+        except Exception as e:
+            self.busy = False
+            self.sig_error.emit(str(e))
+            return
+        self.busy = False
+        self.sig_result.emit(result)
@@ -0,0 +1,116 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Software auto-ranging engine for pyThorlabsPM100x.
+
+Provides :class:`SoftwareAutoRange`, which decides when the power range of the console
+should be changed by looking at the most recent readings, and keeps a cache of the range
+changes already performed (the "range ladder") so that the following changes between the
+same ranges require a single write to the instrument.
+"""
+
+import collections
+import math
+
+
+class SoftwareAutoRange:
+    """
+    Decide when to step the power range up or down, based on the recent readings.
+
+    The range is increased as soon as the last reading, or the value extrapolated linearly from
+    the last readings, exceeds ``upper*power_range`` (i.e. *before* the console saturates, for
+    signals which are rising). The range is decreased when the last ``hold`` readings are all
+    below ``lower*power_range``. Since ``lower`` is smaller than 0.1 (the ratio between
+    consecutive ranges), and ``upper`` is larger than 10 times ``lower``, the signal cannot bounce
+    back and forth between two ranges (hysteresis). After each range change, the history of
+    readings is cleared, so that at least ``hold`` readings in the new range are needed before
+    a new decision is taken.
+
+    Attributes
+    ----------
+    upper : float
+        Fraction of the current power range above which the range is increased.
+    lower : float
+        Fraction of the current power range below which the range is decreased.
+    hold : int
+        Number of consecutive readings below ``lower*power_range`` required to decrease the range.
+    ladder : dict
+        Cache of the range changes already performed. Keys are ``(wavelength, power_range, direction)``,
+        values are the power range reached when stepping from ``power_range`` in ``direction``
+        (equal to ``power_range`` itself if the range could not be changed).
+    """
+
+    def __init__(self, upper=0.9, lower=0.08, hold=5):
+        '''
+        Parameters
+        ----------
+        upper : float, optional
+            See :attr:`upper`. Default is 0.9.
+        lower : float, optional
+            See :attr:`lower`. Default is 0.08.
+        hold : int, optional
+            See :attr:`hold`. Default is 5.
+
+        Raises
+        ------
+        ValueError
+            If the thresholds do not satisfy ``0 < lower < 0.1`` and ``10*lower < upper <= 1``.
+        '''
+        if not (0 < lower < 0.1 and 10*lower < upper <= 1):
+            raise ValueError("The thresholds must satisfy 0 < lower < 0.1 and 10*lower < upper <= 1.")
+        self.upper = upper
+        self.lower = lower
+        self.hold = max(int(hold), 2)
+        self.ladder = {}
+        self.history = collections.deque(maxlen=self.hold)
+
+    def reset(self):
+        '''Clear the history of readings (but not the :attr:`ladder`).'''
+        self.history.clear()
+
+    def check(self, values, power_range):
+        '''
+        Add new readings to the history, and decide whether the power range should be changed.
+
+        Parameters
+        ----------
+        values : iterable of float
+            New readings, in W. ``NaN`` values are ignored.
+        power_range : float
+            Current power range, in W.
+
+        Returns
+        -------
+        int
+            ``+1`` if the power range should be increased, ``-1`` if it should be decreased, ``0`` otherwise.
+        '''
+        self.history.extend(v for v in values if not math.isnan(v))
+        if not self.history or not power_range:
+            return 0
+        last = self.history[-1]
+        if len(self.history) >= 2:
+            predicted = last + (last - self.history[-2])
+        else:
+            predicted = last
+        if max(last, predicted) >= self.upper*power_range:
+            return +1
+        if len(self.history) == self.hold and max(self.history) < self.lower*power_range:
+            return -1
+        return 0
+
+    def next_range(self, wavelength, power_range, direction):
+        '''
+        Return the power range reached, according to the :attr:`ladder`, when stepping from
+        ``power_range`` in ``direction`` at the given wavelength, or ``None`` if this step has
+        never been performed.
+        '''
+        return self.ladder.get((wavelength, power_range, direction))
+
+    def record_step(self, wavelength, old_range, direction, new_range):
+        '''
+        Store in the :attr:`ladder` the result of a range change, and the opposite change.
+        '''
+        self.ladder[(wavelength, old_range, direction)] = new_range
+        if new_range != old_range:
+            self.ladder[(wavelength, new_range, -direction)] = old_range
+        self.reset()
@@ -0,0 +1,110 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Growable NumPy buffer used by :class:`~pyThorlabsPM100x.main.interface` to store the
+acquired power readings together with their timestamps.
+"""
+
+import numpy as np
+
+
+class AcquisitionBuffer:
+    """
+    Append-only storage for ``(timestamp, value)`` samples, backed by NumPy arrays.
+
+    Samples are appended in blocks via :meth:`append`. The underlying arrays are
+    over-allocated and doubled in size when full, so appending is amortized O(1) per sample.
+
+    The arrays returned by :attr:`timestamps` and :attr:`values` are views (no copy) of
+    the samples acquired so far. Since stored samples are never modified, and growing the
+    buffer allocates new arrays instead of resizing the old ones, a view obtained at some
+    point keeps showing the same data even while acquisition continues.
+
+    Optionally, each sample can also have a raw value (e.g. the reading before a calibration was
+    applied, see :attr:`raw_values`). The array of raw values is only allocated when the first
+    block with raw values different from the values is appended.
+
+    Attributes
+    ----------
+    size : int
+        Number of samples currently stored.
+    """
+
+    def __init__(self, capacity=4096):
+        '''
+        Parameters
+        ----------
+        capacity : int, optional
+            Number of samples initially allocated. Default is 4096.
+        '''
+        self._initial_capacity = max(int(capacity), 1)
+        self.clear()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def timestamps(self):
+        '''numpy.ndarray: View of the timestamps (in seconds since the epoch) of all stored samples.'''
+        return self._timestamps[:self.size]
+
+    @property
+    def values(self):
+        '''numpy.ndarray: View of the values of all stored samples.'''
+        return self._values[:self.size]
+
+    @property
+    def raw_values(self):
+        '''numpy.ndarray: View of the raw values of all stored samples (the same as :attr:`values` if
+        no raw values were ever appended).'''
+        if self._raw_values is None:
+            return self.values
+        return self._raw_values[:self.size]
+
+    @property
+    def has_raw_values(self):
+        '''bool: ``True`` if raw values different from the values were appended.'''
+        return self._raw_values is not None
+
+    def append(self, timestamps, values, raw_values=None):
+        '''
+        Append a block of samples.
+
+        Parameters
+        ----------
+        timestamps : array_like of float
+            Timestamps of the new samples, in seconds since the epoch.
+        values : array_like of float
+            Values of the new samples. ``None`` values are stored as ``NaN``.
+        raw_values : array_like of float, optional
+            Raw values of the new samples. Default is ``None`` (same as ``values``).
+        '''
+        timestamps = np.asarray(timestamps, dtype=float).ravel()
+        values = np.asarray(values, dtype=float).ravel()
+        if timestamps.shape != values.shape:
+            raise ValueError("timestamps and values must have the same length.")
+        if raw_values is not None:
+            raw_values = np.asarray(raw_values, dtype=float).ravel()
+            if raw_values.shape != values.shape:
+                raise ValueError("raw_values and values must have the same length.")
+            if self._raw_values is None:
+                self._raw_values = self._values.copy()  # Samples stored so far have raw values equal to their values
+        n = len(values)
+        if self.size + n > len(self._values):
+            new_capacity = max(2*len(self._values), self.size + n)
+            self._timestamps = np.concatenate((self._timestamps[:self.size], np.empty(new_capacity - self.size)))
+            self._values = np.concatenate((self._values[:self.size], np.empty(new_capacity - self.size)))
+            if self._raw_values is not None:
+                self._raw_values = np.concatenate((self._raw_values[:self.size], np.empty(new_capacity - self.size)))
+        self._timestamps[self.size:self.size+n] = timestamps
+        self._values[self.size:self.size+n] = values
+        if self._raw_values is not None:
+            self._raw_values[self.size:self.size+n] = values if raw_values is None else raw_values
+        self.size += n
+
+    def clear(self):
+        '''Discard all stored samples.'''
+        self._timestamps = np.empty(self._initial_capacity)
+        self._values = np.empty(self._initial_capacity)
+        self._raw_values = None
+        self.size = 0
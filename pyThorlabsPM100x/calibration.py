@@ -0,0 +1,152 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Wavelength-dependent correction of the power readings.
+
+Provides :class:`CalibrationTable`, which stores the correction factors of a setup (e.g. fiber
+coupling efficiency, ratio of a beam splitter) measured at a set of wavelengths, and applies to
+blocks of readings the factor linearly interpolated at the current wavelength. Factors are
+interpolated once per wavelength, and cached.
+
+Calibration files
+-----------------
+* ``.json``: a dictionary with the lists ``'wavelengths'`` (in nm) and ``'factors'``.
+* Any other extension: a text file with two columns (wavelength in nm, factor), separated by
+  commas, semicolons or whitespace. Lines starting with ``#``, and lines which do not contain two
+  numbers (e.g. a header), are ignored.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+class CalibrationTable:
+    """
+    Correction factors as a function of the wavelength.
+
+    A reading ``P`` acquired at the wavelength ``wl`` is corrected to ``P*factor(wl)``, where
+    ``factor(wl)`` is linearly interpolated between the wavelengths of the table. Outside the
+    range of the table, the factor of the nearest wavelength is used.
+
+    Attributes
+    ----------
+    wavelengths : numpy.ndarray
+        Wavelengths of the table, in nm, in increasing order.
+    factors : numpy.ndarray
+        Correction factor at each wavelength.
+    source : str or None
+        Path of the file from which the table was loaded (if any).
+    """
+
+    def __init__(self, wavelengths, factors, source=None):
+        '''
+        Parameters
+        ----------
+        wavelengths : array_like of float
+            Wavelengths, in nm (in any order, but without duplicates).
+        factors : array_like of float
+            Correction factor at each wavelength.
+        source : str, optional
+            See :attr:`source`.
+
+        Raises
+        ------
+        ValueError
+            If the table is empty, if the two arrays have different lengths, if a wavelength is
+            repeated, or if any value is not finite.
+        '''
+        wavelengths = np.asarray(wavelengths, dtype=float).ravel()
+        factors = np.asarray(factors, dtype=float).ravel()
+        if len(wavelengths) == 0 or wavelengths.shape != factors.shape:
+            raise ValueError("The calibration table must contain the same (non-zero) number of wavelengths and factors.")
+        if not (np.all(np.isfinite(wavelengths)) and np.all(np.isfinite(factors))):
+            raise ValueError("The calibration table contains invalid values.")
+        order = np.argsort(wavelengths)
+        (self.wavelengths, self.factors) = (wavelengths[order], factors[order])
+        if np.any(np.diff(self.wavelengths) == 0):
+            raise ValueError("The calibration table contains repeated wavelengths.")
+        self.source = source
+        self._cache = {}    # Interpolated factors, in the format {wavelength: factor}
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Load a calibration table from a file (see the format in the description of this module).
+
+        Parameters
+        ----------
+        path : str
+            Path of the file.
+
+        Returns
+        -------
+        CalibrationTable
+
+        Raises
+        ------
+        OSError
+            If the file cannot be read.
+        ValueError
+            If the file does not contain a valid table.
+        '''
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path) as f:
+                data = json.load(f)
+            try:
+                return cls(data['wavelengths'], data['factors'], source=path)
+            except (KeyError, TypeError):
+                raise ValueError("A JSON calibration file must contain the lists 'wavelengths' and 'factors'.") from None
+        rows = []
+        with open(path) as f:
+            for line in f:
+                fields = line.split('#', 1)[0].replace(',', ' ').replace(';', ' ').split()
+                try:
+                    rows.append((float(fields[0]), float(fields[1])))
+                except (IndexError, ValueError):
+                    continue    # Header, or empty line
+        if not rows:
+            raise ValueError(f"No calibration data found in the file {path}.")
+        (wavelengths, factors) = zip(*rows)
+        return cls(wavelengths, factors, source=path)
+
+    def factor(self, wavelength):
+        '''
+        Return the correction factor at ``wavelength`` (in nm). The result is cached, so that
+        calling this method for every block of readings acquired at the same wavelength is cheap.
+        '''
+        try:
+            return self._cache[wavelength]
+        except KeyError:
+            value = self._cache[wavelength] = float(np.interp(wavelength, self.wavelengths, self.factors))
+            return value
+
+    def factors_at(self, wavelengths):
+        '''
+        Return the correction factors at each element of the array ``wavelengths`` (in nm), e.g. to
+        correct the result of :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.sweep_wavelength`.
+        '''
+        return np.interp(np.asarray(wavelengths, dtype=float), self.wavelengths, self.factors)
+
+    def covers(self, wavelength):
+        '''Return ``True`` if ``wavelength`` (in nm) is within the range of the table.'''
+        return self.wavelengths[0] <= wavelength <= self.wavelengths[-1]
+
+    def apply(self, values, wavelength):
+        '''
+        Correct a block of readings acquired at ``wavelength``.
+
+        Parameters
+        ----------
+        values : array_like of float
+            Power readings.
+        wavelength : float
+            Wavelength (in nm) at which the readings were acquired.
+
+        Returns
+        -------
+        numpy.ndarray
+            The corrected readings (a new array).
+        '''
+        return np.asarray(values, dtype=float)*self.factor(wavelength)
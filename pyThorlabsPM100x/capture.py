@@ -0,0 +1,296 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Threshold-triggered capture for pyThorlabsPM100x.
+
+Provides :class:`TriggeredCapture`, which looks for rare events (e.g. dropouts or spikes of
+the power) in the stream of readings, and stores only a few samples around each of them.
+The most recent readings are kept in a fixed-size pre-trigger ring buffer, so that the
+memory used depends on the number of events, and not on the duration of the acquisition.
+Completed captures can also be appended to a file (one JSON object per line) as soon as they are
+complete, and read back with :func:`load_captures`.
+"""
+
+import json
+
+import numpy as np
+
+CONDITIONS = ('level', 'slope', 'window')
+SLOPES = ('rising', 'falling', 'either')
+
+
+class CaptureEvent:
+    """
+    Samples acquired around a trigger.
+
+    Attributes
+    ----------
+    condition : str
+        The trigger condition which was met (one of :data:`CONDITIONS`).
+    trigger_time : float
+        Timestamp of the sample which met the trigger condition, in seconds since the epoch.
+    trigger_value : float
+        Value of the sample which met the trigger condition.
+    trigger_index : int
+        Index, in :attr:`timestamps` and :attr:`values`, of the sample which met the trigger
+        condition. It is equal to the number of pre-trigger samples stored.
+    timestamps : numpy.ndarray
+        Timestamps of the pre-trigger samples, of the trigger sample and of the post-trigger samples.
+    values : numpy.ndarray
+        Values of the pre-trigger samples, of the trigger sample and of the post-trigger samples.
+    """
+
+    def __init__(self, condition, timestamps, values, trigger_index):
+        self.condition = condition
+        self.timestamps = timestamps
+        self.values = values
+        self.trigger_index = trigger_index
+        self.trigger_time = float(timestamps[trigger_index])
+        self.trigger_value = float(values[trigger_index])
+
+    def to_dict(self):
+        '''Return the capture as a dictionary of JSON-serializable values (see :meth:`from_dict`).'''
+        return {'condition': self.condition, 'trigger_index': int(self.trigger_index),
+                'timestamps': np.asarray(self.timestamps, dtype=float).tolist(), 'values': np.asarray(self.values, dtype=float).tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''Create a capture from a dictionary returned by :meth:`to_dict`.'''
+        return cls(data['condition'], np.array(data['timestamps'], dtype=float), np.array(data['values'], dtype=float), data['trigger_index'])
+
+    def __repr__(self):
+        return (f"CaptureEvent(condition={self.condition!r}, trigger_time={self.trigger_time}, "
+                f"trigger_value={self.trigger_value}, samples={len(self.values)})")
+
+
+class TriggeredCapture:
+    """
+    Detect trigger conditions in blocks of readings, and store the samples around each trigger.
+
+    Readings are passed to :meth:`process`. The last ``pre_samples`` readings are always kept in
+    a ring buffer. When a reading meets the trigger condition, a capture starts: the content of
+    the ring buffer, the trigger sample and the following ``post_samples`` readings are stored in
+    a :class:`CaptureEvent`, which is returned by :meth:`process` as soon as it is complete.
+    Triggers occurring while a capture is in progress are ignored.
+
+    Supported conditions are:
+
+    * ``'level'``: the value crosses ``threshold`` (upwards if ``slope='rising'``, downwards
+      if ``slope='falling'``, or both if ``slope='either'``).
+    * ``'slope'``: the derivative of the value (in units per second) is larger than ``threshold``
+      (``'rising'``), smaller than ``-threshold`` (``'falling'``), or larger than ``threshold``
+      in absolute value (``'either'``).
+    * ``'window'``: the value leaves the interval ``[low, high]``.
+
+    ``NaN`` readings never meet any condition.
+
+    Attributes
+    ----------
+    condition : str
+        One of :data:`CONDITIONS`.
+    threshold : float or None
+        Threshold used by the ``'level'`` and ``'slope'`` conditions.
+    low, high : float or None
+        Bounds used by the ``'window'`` condition.
+    slope : str
+        One of :data:`SLOPES`. Not used by the ``'window'`` condition.
+    pre_samples : int
+        Number of samples stored before each trigger.
+    post_samples : int
+        Number of samples stored after each trigger.
+    path : str or None
+        File to which the completed captures are appended by :meth:`save`, or ``None``.
+    """
+
+    def __init__(self, condition='level', threshold=None, low=None, high=None, slope='either',
+                 pre_samples=100, post_samples=100, path=None):
+        '''
+        Parameters
+        ----------
+        condition : str, optional
+            See :attr:`condition`. Default is ``'level'``.
+        threshold : float, optional
+            See :attr:`threshold`. Required by the ``'level'`` and ``'slope'`` conditions.
+        low, high : float, optional
+            See :attr:`low` and :attr:`high`. Required by the ``'window'`` condition.
+        slope : str, optional
+            See :attr:`slope`. Default is ``'either'``.
+        pre_samples : int, optional
+            See :attr:`pre_samples`. Default is 100.
+        post_samples : int, optional
+            See :attr:`post_samples`. Default is 100.
+        path : str, optional
+            See :attr:`path`. If the file exists, new captures are appended to it. Default is ``None``.
+
+        Raises
+        ------
+        ValueError
+            If the condition, the slope or the parameters required by the condition are not valid.
+        OSError
+            If ``path`` cannot be opened for writing.
+        '''
+        if condition not in CONDITIONS:
+            raise ValueError(f"Invalid trigger condition {condition!r}. Valid conditions are " + ", ".join(CONDITIONS))
+        if slope not in SLOPES:
+            raise ValueError(f"Invalid slope {slope!r}. Valid slopes are " + ", ".join(SLOPES))
+        if condition == 'window':
+            if low is None or high is None or not (low < high):
+                raise ValueError("The 'window' condition requires low < high.")
+        elif threshold is None:
+            raise ValueError(f"The {condition!r} condition requires a threshold.")
+        if pre_samples < 0 or post_samples < 0:
+            raise ValueError("pre_samples and post_samples must be non-negative.")
+        if path:
+            open(path, 'a').close()     # Fail now, rather than when the first capture is completed
+        self.condition = condition
+        self.threshold = threshold
+        self.low = low
+        self.high = high
+        self.slope = slope
+        self.pre_samples = int(pre_samples)
+        self.post_samples = int(post_samples)
+        self.path = path or None
+        self.reset()
+
+    def reset(self):
+        '''Empty the pre-trigger ring buffer, and discard the capture in progress (if any).'''
+        self._ring_timestamps = np.full(self.pre_samples, np.nan)
+        self._ring_values = np.full(self.pre_samples, np.nan)
+        self._ring_head = 0         # Index of the ring where the next sample will be written
+        self._ring_count = 0        # Number of valid samples in the ring
+        self._last = (np.nan, np.nan)   # (timestamp, value) of the last sample processed, used to detect crossings
+        self._pending = None        # Capture in progress: [condition, list of timestamp blocks, list of value blocks, trigger_index, samples still needed]
+
+    def save(self, event):
+        '''
+        Append a capture to :attr:`path`, as a single line of JSON (see :meth:`CaptureEvent.to_dict`).
+        Nothing is done if :attr:`path` is ``None``.
+
+        Raises
+        ------
+        OSError
+            If the file cannot be written.
+        '''
+        if not self.path:
+            return
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event.to_dict()) + '\n')
+
+    @property
+    def capturing(self):
+        '''bool: ``True`` while a capture is in progress (i.e. post-trigger samples are being collected).'''
+        return self._pending is not None
+
+    def _triggers(self, timestamps, values):
+        # Boolean mask of the samples which meet the trigger condition
+        prev_t = np.concatenate(([self._last[0]], timestamps[:-1]))
+        prev_v = np.concatenate(([self._last[1]], values[:-1]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.condition == 'window':
+                outside = (values < self.low) | (values > self.high)
+                prev_outside = (prev_v < self.low) | (prev_v > self.high)
+                return outside & ~prev_outside & ~np.isnan(prev_v)
+            if self.condition == 'level':
+                rising = (prev_v < self.threshold) & (values >= self.threshold)
+                falling = (prev_v > self.threshold) & (values <= self.threshold)
+            else:
+                derivative = (values - prev_v) / (timestamps - prev_t)
+                rising = derivative > self.threshold
+                falling = derivative < -self.threshold
+        if self.slope == 'rising':
+            return rising
+        if self.slope == 'falling':
+            return falling
+        return rising | falling
+
+    def _ring_contents(self):
+        # Samples in the ring buffer, from the oldest to the newest
+        order = (self._ring_head - self._ring_count + np.arange(self._ring_count)) % max(self.pre_samples, 1)
+        return self._ring_timestamps[order], self._ring_values[order]
+
+    def _ring_append(self, timestamps, values):
+        if self.pre_samples == 0:
+            return
+        (timestamps, values) = (timestamps[-self.pre_samples:], values[-self.pre_samples:])
+        n = len(values)
+        index = (self._ring_head + np.arange(n)) % self.pre_samples
+        self._ring_timestamps[index] = timestamps
+        self._ring_values[index] = values
+        self._ring_head = (self._ring_head + n) % self.pre_samples
+        self._ring_count = min(self._ring_count + n, self.pre_samples)
+
+    def process(self, timestamps, values):
+        '''
+        Process a block of readings.
+
+        Parameters
+        ----------
+        timestamps : array_like of float
+            Acquisition time of each reading, in seconds since the epoch.
+        values : array_like of float
+            Value of each reading.
+
+        Returns
+        -------
+        list of CaptureEvent
+            The captures completed by this block (usually empty).
+        '''
+        timestamps = np.asarray(timestamps, dtype=float).ravel()
+        values = np.asarray(values, dtype=float).ravel()
+        n = len(values)
+        if n == 0:
+            return []
+        triggers = self._triggers(timestamps, values)
+        events = []
+        pos = 0
+        while pos < n:
+            if self._pending is None:
+                candidates = np.flatnonzero(triggers[pos:])
+                if len(candidates) == 0:
+                    break
+                j = pos + int(candidates[0])
+                # Pre-trigger samples are taken from the ring buffer, and from the current block
+                (ring_t, ring_v) = self._ring_contents()
+                start = max(len(ring_t) + j - self.pre_samples, 0)
+                pre_t = np.concatenate((ring_t, timestamps[:j]))[start:]
+                pre_v = np.concatenate((ring_v, values[:j]))[start:]
+                self._pending = [self.condition, [pre_t, timestamps[j:j+1]], [pre_v, values[j:j+1]], len(pre_v), self.post_samples]
+                pos = j + 1
+            else:
+                take = min(self._pending[4], n - pos)
+                self._pending[1].append(timestamps[pos:pos+take])
+                self._pending[2].append(values[pos:pos+take])
+                self._pending[4] -= take
+                pos += take
+            if self._pending is not None and self._pending[4] == 0:
+                (condition, t_blocks, v_blocks, trigger_index, _) = self._pending
+                events.append(CaptureEvent(condition, np.concatenate(t_blocks), np.concatenate(v_blocks), trigger_index))
+                self._pending = None
+        self._ring_append(timestamps, values)
+        self._last = (timestamps[-1], values[-1])
+        return events
+
+
+def load_captures(path):
+    '''
+    Read the captures saved by :meth:`TriggeredCapture.save`.
+
+    Parameters
+    ----------
+    path : str
+        The file to read. A truncated last line (e.g. if the program was killed while writing it)
+        is ignored.
+
+    Returns
+    -------
+    list of CaptureEvent
+        The captures, in the order in which they were saved.
+    '''
+    events = []
+    with open(path) as f:
+        for line in f:
+            try:
+                events.append(CaptureEvent.from_dict(json.loads(line)))
+            except ValueError:
+                break
+    return events
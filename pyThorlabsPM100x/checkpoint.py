@@ -0,0 +1,199 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Crash-safe, incremental checkpoints of an acquisition session.
+
+Provides :class:`SessionCheckpoint`, which periodically appends to a file the samples and
+events acquired since the previous checkpoint (and the settings, when they change), and
+:func:`load_session`, which reads such a file back.
+
+File format
+-----------
+The file is a sequence of records, each made of a 12-byte header followed by a payload.
+The header is packed as ``'<4sII'``:
+
+==========  =======  ===============================================================
+Field       Type     Description
+==========  =======  ===============================================================
+magic       4 bytes  Always ``b'PMCK'``.
+type        uint32   :data:`RECORD_SAMPLES`, :data:`RECORD_RAW_SAMPLES`, :data:`RECORD_EVENTS`,
+                     :data:`RECORD_SETTINGS` or :data:`RECORD_RESET`.
+length      uint32   Length of the payload, in bytes.
+==========  =======  ===============================================================
+
+The payload of a ``RECORD_SAMPLES`` record is a sequence of little-endian doubles
+``(timestamp, value)``. A ``RECORD_RAW_SAMPLES`` record, written instead once the buffer
+contains raw values (see :attr:`~pyThorlabsPM100x.buffer.AcquisitionBuffer.raw_values`), is a
+sequence of ``(timestamp, value, raw_value)``. The payloads of ``RECORD_EVENTS`` (list of events) and
+``RECORD_SETTINGS`` (dictionary) records are UTF-8 JSON strings. A ``RECORD_RESET`` record
+(empty payload) means that all samples and events written before it were discarded.
+
+Records are only appended, and each checkpoint is flushed to disk, so a crash can at most
+leave an incomplete record at the end of the file, which is ignored by :func:`load_session`
+(and overwritten when the session is resumed).
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+RECORD_HEADER = struct.Struct('<4sII')
+RECORD_MAGIC = b'PMCK'
+RECORD_SAMPLES = 1
+RECORD_EVENTS = 2
+RECORD_SETTINGS = 3
+RECORD_RESET = 4
+RECORD_RAW_SAMPLES = 5
+
+
+def _read_records(path):
+    # Yield (type, payload) for each complete record of the file, and finally the number of valid bytes
+    with open(path, 'rb') as f:
+        data = f.read()
+    position = 0
+    while position + RECORD_HEADER.size <= len(data):
+        (magic, record_type, length) = RECORD_HEADER.unpack_from(data, position)
+        if magic != RECORD_MAGIC or position + RECORD_HEADER.size + length > len(data):
+            break
+        start = position + RECORD_HEADER.size
+        yield record_type, data[start:start + length]
+        position = start + length
+    yield None, position
+
+
+def load_session(path):
+    '''
+    Read a session checkpoint file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the checkpoint file.
+
+    Returns
+    -------
+    dict
+        Dictionary with keys ``'timestamps'`` and ``'values'`` (numpy arrays), ``'raw_values'`` (numpy
+        array, or ``None`` if the session does not contain raw values), ``'events'`` (list of
+        ``(index, timestamp, kind, value)`` tuples), ``'settings'`` (the last settings saved, or
+        ``None``) and ``'size'`` (number of bytes of the file occupied by complete records).
+    '''
+    (samples, events, settings) = ([], [], None)
+    for (record_type, payload) in _read_records(path):
+        if record_type is None:
+            size = payload
+        elif record_type == RECORD_SAMPLES:
+            samples.append(np.frombuffer(payload, dtype='<f8').reshape(-1, 2))
+        elif record_type == RECORD_RAW_SAMPLES:
+            samples.append(np.frombuffer(payload, dtype='<f8').reshape(-1, 3))
+        elif record_type == RECORD_EVENTS:
+            events.extend(tuple(event) for event in json.loads(payload.decode('utf-8')))
+        elif record_type == RECORD_SETTINGS:
+            settings = json.loads(payload.decode('utf-8'))
+        elif record_type == RECORD_RESET:
+            (samples, events) = ([], [])
+    if any(block.shape[1] == 3 for block in samples):
+        # The raw values of the samples written without them are equal to their values
+        samples = [block if block.shape[1] == 3 else np.column_stack((block, block[:, 1])) for block in samples]
+    data = np.concatenate(samples) if samples else np.empty((0, 2))
+    return {'timestamps': data[:, 0].copy(), 'values': data[:, 1].copy(), 'raw_values': data[:, 2].copy() if data.shape[1] == 3 else None,
+            'events': events, 'settings': settings, 'size': size}
+
+
+class SessionCheckpoint:
+    """
+    Append the new samples, events and settings of a session to a checkpoint file.
+
+    Each call to :meth:`write` only appends what changed since the previous call, so its cost
+    depends on the amount of new data, and not on the length of the session.
+
+    Attributes
+    ----------
+    path : str
+        Path of the checkpoint file.
+    samples_written : int
+        Number of samples of the buffer already written to the file.
+    events_written : int
+        Number of events already written to the file.
+    """
+
+    def __init__(self, path, resume=False):
+        '''
+        Parameters
+        ----------
+        path : str
+            Path of the checkpoint file.
+        resume : bool, optional
+            If ``False`` (default), the file is created (or overwritten). If ``True``, the file must
+            contain a session (see :func:`load_session`) whose samples and events are already in the
+            buffer and in the list of events passed to :meth:`write`; new records are appended after
+            the last complete record of the file.
+        '''
+        self.path = path
+        self.samples_written = 0
+        self.events_written = 0
+        self._last_settings = None
+        if resume:
+            session = load_session(path)
+            self.samples_written = len(session['values'])
+            self.events_written = len(session['events'])
+            self._last_settings = json.dumps(session['settings'], sort_keys=True) if session['settings'] is not None else None
+            self._file = open(path, 'r+b')
+            self._file.truncate(session['size'])    # Removes an incomplete record left by a crash (if any)
+            self._file.seek(session['size'])
+        else:
+            self._file = open(path, 'wb')
+
+    def _append(self, record_type, payload):
+        self._file.write(RECORD_HEADER.pack(RECORD_MAGIC, record_type, len(payload)))
+        self._file.write(payload)
+
+    def write(self, buffer, events, settings):
+        '''
+        Append to the file the samples and events acquired since the last call, and the settings
+        if they changed, then flush the file to disk.
+
+        Parameters
+        ----------
+        buffer : AcquisitionBuffer
+            The buffer containing all samples of the session (and their raw values, if any). If it
+            contains less samples than those already written (i.e. it was cleared), a reset record
+            is written, followed by all its samples.
+        events : list of tuple
+            All events of the session, in the format ``(index, timestamp, kind, value)``.
+        settings : dict
+            Current settings.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+        '''
+        start = self._file.tell()
+        if len(buffer) < self.samples_written or len(events) < self.events_written:
+            self._append(RECORD_RESET, b'')
+            (self.samples_written, self.events_written) = (0, 0)
+        if len(buffer) > self.samples_written:
+            columns = [buffer.timestamps[self.samples_written:], buffer.values[self.samples_written:]]
+            if buffer.has_raw_values:
+                columns.append(buffer.raw_values[self.samples_written:])
+            self._append(RECORD_RAW_SAMPLES if buffer.has_raw_values else RECORD_SAMPLES, np.column_stack(columns).astype('<f8').tobytes())
+            self.samples_written = len(buffer)
+        if len(events) > self.events_written:
+            self._append(RECORD_EVENTS, json.dumps(events[self.events_written:], default=str).encode('utf-8'))
+            self.events_written = len(events)
+        settings_string = json.dumps(settings, sort_keys=True, default=str)
+        if settings_string != self._last_settings:
+            self._append(RECORD_SETTINGS, settings_string.encode('utf-8'))
+            self._last_settings = settings_string
+        written = self._file.tell() - start
+        if written:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return written
+
+    def close(self):
+        '''Close the checkpoint file.'''
+        self._file.close()
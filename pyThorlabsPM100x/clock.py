@@ -0,0 +1,99 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Clocks used to timestamp the readings, and to simulate the time in the virtual backend.
+
+Each clock has a method ``time()``, which returns the current time in seconds, and a method
+``sleep(duration)``. :class:`WallClock` (the default) and :class:`MonotonicClock` follow the real
+time, while :class:`ManualClock` only moves forward when it is told to: with a manual clock, the
+virtual devices of :mod:`pyThorlabsPM100x.pyvisa_virtual` produce deterministic readings, and
+long simulated durations (e.g. a zeroing routine, or the delay of an unresponsive device) take
+no real time at all.
+"""
+
+import threading
+import time
+
+
+class WallClock:
+    """
+    Clock following the system time (``time.time()``), i.e. seconds since the epoch.
+    """
+
+    def time(self):
+        '''Return the current time, in seconds since the epoch.'''
+        return time.time()
+
+    def sleep(self, duration):
+        '''Wait for ``duration`` seconds.'''
+        time.sleep(duration)
+
+
+class MonotonicClock:
+    """
+    Clock following ``time.monotonic()``, which is not affected by changes of the system time.
+    Its origin is arbitrary, so its timestamps are not seconds since the epoch.
+    """
+
+    def time(self):
+        '''Return the current value of ``time.monotonic()``, in seconds.'''
+        return time.monotonic()
+
+    def sleep(self, duration):
+        '''Wait for ``duration`` seconds.'''
+        time.sleep(duration)
+
+
+class ManualClock:
+    """
+    Simulated clock, which only moves forward when :meth:`advance` or :meth:`sleep` are called.
+
+    Attributes
+    ----------
+    step : float
+        Time (in s) added to the clock after each call to :meth:`time`. With ``step > 0``, successive
+        readings get increasing timestamps even if the clock is never advanced explicitly.
+    """
+
+    def __init__(self, start=0.0, step=0.0):
+        '''
+        Parameters
+        ----------
+        start : float, optional
+            Initial time, in seconds. Default is 0.
+        step : float, optional
+            See :attr:`step`. Default is 0.
+        '''
+        self.step = step
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self):
+        '''Return the current simulated time, in seconds (and then advance it by :attr:`step`).'''
+        with self._lock:
+            now = self._now
+            self._now += self.step
+            return now
+
+    def sleep(self, duration):
+        '''Advance the simulated time by ``duration`` seconds, and return immediately.'''
+        self.advance(duration)
+
+    def advance(self, duration):
+        '''
+        Advance the simulated time.
+
+        Parameters
+        ----------
+        duration : float
+            Time to add to the clock, in seconds.
+
+        Raises
+        ------
+        ValueError
+            If ``duration`` is negative.
+        '''
+        if duration < 0:
+            raise ValueError("A clock cannot go backwards.")
+        with self._lock:
+            self._now += duration
@@ -0,0 +1,329 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Dashboard showing several power meters in a single window.
+
+Provides :class:`Dashboard`, a view which displays the state of many
+:class:`~pyThorlabsPM100x.main.interface` objects at once: a table with one row per console
+(name, last power, wavelength, status) and a single pyqtgraph plot with one curve per console.
+
+Unlike embedding one :class:`~pyThorlabsPM100x.main.gui` per console, the dashboard does not
+react to each reading. All the widgets are refreshed by a single timer: at each tick, only the
+cells whose text changed are rewritten (with the repainting of the table suspended until all cells
+are updated), and only the curves of the consoles which acquired new readings are redrawn, using
+the decimated data of each interface's :attr:`~pyThorlabsPM100x.main.interface.pyramid`. The cost
+of a tick therefore depends on the number of consoles and on the size of the plot, but not on the
+acquisition rate or on the length of the acquisition.
+"""
+
+import functools
+
+import numpy as np
+import PyQt5.QtWidgets as Qt
+import PyQt5.QtCore as QtCore
+import pyqtgraph as pg
+
+import pyThorlabsPM100x.units
+
+
+class Dashboard:
+    """
+    Table and plot showing the readings of several interfaces, refreshed by a single timer.
+
+    Attributes
+    ----------
+    app : Qt.QApplication
+        The shared PyQt5 application object.
+    parent : Qt.QWidget
+        The widget that hosts the dashboard (its layout is set by the constructor).
+    interfaces : list of interface
+        The interfaces shown, in the order of the rows of :attr:`table`.
+    table : Qt.QTableWidget
+        Table with one row per interface, and the columns listed in :attr:`COLUMNS`.
+    graphWidget : pg.PlotWidget
+        Plot with one curve per interface (power versus the time elapsed since the first reading
+        of any interface).
+    timer : QtCore.QTimer
+        Timer which calls :meth:`refresh` every :attr:`refresh_time` seconds.
+    refresh_time : float
+        Time between two refreshes of the widgets, in seconds.
+    time_window : float or None
+        If set, only the last ``time_window`` seconds of data are plotted, and the x range of the plot
+        is set to show them at each refresh. If ``None``, all data are plotted.
+    units : str
+        Units of the powers shown in the table and in the plot (one of :data:`pyThorlabsPM100x.units.UNITS`).
+    """
+
+    COLUMNS = ('Device', 'Power', 'Wavelength [nm]', 'Status')
+
+    def __init__(self, app, parent, interfaces=(), refresh_time=0.1, time_window=60, units='W'):
+        '''
+        Parameters
+        ----------
+        app : Qt.QApplication
+            The shared PyQt5 application object.
+        parent : Qt.QWidget
+            The Qt widget that will host the dashboard.
+        interfaces : iterable of interface, optional
+            Interfaces shown initially (more can be added with :meth:`add_interface`). Default is none.
+        refresh_time : float, optional
+            See :attr:`refresh_time`. Default is 0.1.
+        time_window : float, optional
+            See :attr:`time_window`. Default is 60. ``None`` (or 0) shows all data.
+        units : str, optional
+            See :attr:`units`. Default is ``'W'``.
+        '''
+        self.app = app
+        self.parent = parent
+        self.interfaces = []
+        self._entries = {}      # State of each interface shown, in the format {interface: dict}, created by self.add_interface()
+        self._origin = None     # Timestamp corresponding to the origin of the horizontal axis of the plot
+        self.time_window = time_window or None
+        self.units = pyThorlabsPM100x.units.normalize_units(units)
+        self.create_widgets()
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.refresh)
+        self.set_refresh_time(refresh_time)
+        for interface in interfaces:
+            self.add_interface(interface)
+
+    def create_widgets(self):
+        '''
+        Create the buttons (start, pause and stop the acquisition of all interfaces), the table and
+        the plot, and set the layout of :attr:`parent`.
+        '''
+        self.button_StartAll = Qt.QPushButton("Start all")
+        self.button_StartAll.clicked.connect(self.start_all)
+        self.button_PauseAll = Qt.QPushButton("Pause all")
+        self.button_PauseAll.clicked.connect(self.pause_all)
+        self.button_StopAll = Qt.QPushButton("Stop all")
+        self.button_StopAll.clicked.connect(self.stop_all)
+        hbox = Qt.QHBoxLayout()
+        for widget in (self.button_StartAll, self.button_PauseAll, self.button_StopAll):
+            hbox.addWidget(widget)
+        hbox.addStretch(1)
+
+        self.table = Qt.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(Qt.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(Qt.QHeaderView.Stretch)
+
+        self.graphWidget = pg.PlotWidget()
+        self.graphWidget.showGrid(x=True, y=True)
+        self.graphWidget.addLegend()
+        self.graphWidget.setLabel("bottom", "Time [s]")
+        self.graphWidget.setLabel("left", f"Power [{self.units}]")
+        self.graphWidget.getViewBox().setAutoVisible(y=True)     # The y range only takes into account the data within the x range
+
+        splitter = Qt.QSplitter(QtCore.Qt.Vertical)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.graphWidget)
+        vbox = Qt.QVBoxLayout()
+        vbox.addLayout(hbox)
+        vbox.addWidget(splitter)
+        self.parent.setLayout(vbox)
+
+    def add_interface(self, interface, name=None):
+        '''
+        Add an interface to the dashboard (a new row of the table, and a new curve of the plot).
+
+        Parameters
+        ----------
+        interface : interface
+            The interface to add. It is removed automatically from the dashboard when it is closed.
+        name : str, optional
+            Name shown in the table and in the legend of the plot. Default is ``None``, in which case
+            the name of the connected device is shown (the legend is updated at each refresh, e.g.
+            when the interface connects to another device).
+        '''
+        if interface in self._entries:
+            return
+        row = len(self.interfaces)
+        self.table.insertRow(row)
+        items = [Qt.QTableWidgetItem('') for _ in self.COLUMNS]
+        for (column, item) in enumerate(items):
+            self.table.setItem(row, column, item)
+        curve = self.graphWidget.plot([], [], name=name or f"#{row + 1}", connect="finite")     #NaN values (e.g. gaps in the acquisition) are not connected
+        curve.setClipToView(True)
+        on_close = functools.partial(self.remove_interface, interface)
+        interface.sig_close.connect(on_close)
+        self.interfaces.append(interface)
+        self._entries[interface] = {'name': name, 'items': items, 'texts': [None]*len(self.COLUMNS), 'curve': curve,
+                                    'size': None, 'on_close': on_close, 'legend': None, 'row': None}
+        self._refresh_styles()
+
+    def remove_interface(self, interface):
+        '''
+        Remove an interface from the dashboard. The interface itself is not closed.
+        '''
+        entry = self._entries.pop(interface, None)
+        if entry is None:
+            return
+        row = self.interfaces.index(interface)
+        self.interfaces.pop(row)
+        self.table.removeRow(row)
+        self.graphWidget.removeItem(entry['curve'])
+        try:
+            interface.sig_close.disconnect(entry['on_close'])
+        except TypeError:
+            pass
+        self._origin = None     # The origin of the time axis might have been the first reading of this interface
+        self._refresh_styles()     # The following rows moved up
+
+    def set_refresh_time(self, refresh_time):
+        '''
+        Set :attr:`refresh_time` and restart :attr:`timer`.
+
+        Parameters
+        ----------
+        refresh_time : float
+            Time between two refreshes, in seconds (must be positive).
+
+        Raises
+        ------
+        ValueError
+            If ``refresh_time`` is not positive.
+        '''
+        if refresh_time <= 0:
+            raise ValueError("The refresh time must be positive.")
+        self.refresh_time = refresh_time
+        self.timer.start(int(refresh_time*1e3))
+
+    def set_time_window(self, time_window):
+        '''Set :attr:`time_window`. Pass ``None`` (or 0) to plot all data.'''
+        self.time_window = time_window or None
+        if not self.time_window:
+            self.graphWidget.enableAutoRange()
+        self._invalidate()
+
+    def set_units(self, units):
+        '''
+        Set :attr:`units`.
+
+        Raises
+        ------
+        ValueError
+            If ``units`` is not supported.
+        '''
+        self.units = pyThorlabsPM100x.units.normalize_units(units)
+        self.graphWidget.setLabel("left", f"Power [{self.units}]")
+        self._invalidate()
+
+    def _invalidate(self):
+        # Force all cells and curves to be redrawn at the next refresh
+        for entry in self._entries.values():
+            entry['size'] = None
+            entry['texts'] = [None]*len(self.COLUMNS)
+
+    def start_all(self):
+        '''Start the acquisition of all connected interfaces which are not acquiring yet.'''
+        for interface in self.interfaces:
+            if interface.instrument.connected and not interface.continuous_read:
+                interface.start_reading()
+
+    def pause_all(self):
+        '''Pause the acquisition of all interfaces which are acquiring.'''
+        for interface in self.interfaces:
+            if interface.continuous_read:
+                interface.pause_reading()
+
+    def stop_all(self):
+        '''Stop the acquisition of all connected interfaces, and delete their data.'''
+        for interface in self.interfaces:
+            if interface.instrument.connected:
+                interface.stop_reading()
+
+    def refresh(self):
+        '''
+        Called by :attr:`timer`. Update the cells of the table whose content changed, and the curves
+        of the interfaces which acquired new data since the previous refresh. Nothing is done while
+        :attr:`parent` is not visible.
+        '''
+        if not self.parent.isVisible():
+            return
+        self.table.setUpdatesEnabled(False)     # The table is repainted once, after all cells are updated
+        try:
+            for (row, interface) in enumerate(self.interfaces):
+                entry = self._entries[interface]
+                texts = self._row_texts(interface, entry)
+                for (column, text) in enumerate(texts):
+                    if text != entry['texts'][column]:
+                        entry['items'][column].setText(text)
+                entry['texts'] = texts
+        finally:
+            self.table.setUpdatesEnabled(True)
+        self._refresh_styles()
+        self._refresh_plot()
+
+    def _row_texts(self, interface, entry):
+        # Return the texts of the row of interface in the table
+        name = entry['name'] or interface.connected_device_name or '(not connected)'
+        if not interface.instrument.connected:
+            return [name, '', '', 'Reconnecting' if interface.reconnecting else 'Disconnected']
+        if len(interface.buffer) == 0:
+            power = ''
+        else:
+            value = float(pyThorlabsPM100x.units.from_watts(interface.output['Power'], self.units))
+            power = 'nan' if np.isnan(value) else (f"{value:.2f}" if self.units == 'dBm' else f"{value:.3e}")
+        if interface.zeroing:
+            status = 'Zeroing'
+        else:
+            status = 'Reading' if interface.continuous_read else 'Paused'
+        return [name, power, str(getattr(interface, 'wavelength', '')), status]
+
+    def _refresh_styles(self):
+        # Give each curve the color of its current row (also used for the name in the table), and the name shown in the table as legend
+        legend = self.graphWidget.getPlotItem().legend
+        changed = False
+        for (row, interface) in enumerate(self.interfaces):
+            entry = self._entries[interface]
+            if entry['row'] != row:
+                color = pg.intColor(row, hues=9, values=2)
+                entry['curve'].setPen(pg.mkPen(color))
+                entry['items'][0].setForeground(color)
+                entry['row'] = row
+                changed = True
+            name = entry['texts'][0] or entry['name'] or f"#{row + 1}"
+            if entry['legend'] != name:
+                legend.getLabel(entry['curve']).setText(name)
+                entry['legend'] = name
+                changed = True
+        if changed:
+            legend.update()
+
+    def _refresh_plot(self):
+        # Redraw the curves of the interfaces whose buffer changed since the previous refresh
+        starts = [interface.buffer.timestamps[0] for interface in self.interfaces if len(interface.buffer) > 0]
+        origin = min(starts) if starts else None
+        if origin != self._origin:
+            self._origin = origin
+            self._invalidate()
+        if origin is None:
+            for entry in self._entries.values():
+                if entry['size'] != 0:
+                    entry['curve'].setData([], [])
+                    entry['size'] = 0
+            return
+        t_end = max(interface.buffer.timestamps[-1] for interface in self.interfaces if len(interface.buffer) > 0)
+        t_start = t_end - self.time_window if self.time_window else origin
+        max_points = 2*max(self.graphWidget.width(), 500)
+        for interface in self.interfaces:
+            entry = self._entries[interface]
+            size = len(interface.buffer)
+            if size == entry['size']:
+                continue
+            if size == 0:
+                entry['curve'].setData([], [])
+            else:
+                (t, values) = interface.pyramid.get_range(t_start, t_end, max_points)
+                entry['curve'].setData(t - origin, pyThorlabsPM100x.units.from_watts(values, self.units))
+            entry['size'] = size
+        if self.time_window:    # Curves which were not redrawn can contain older data, which are hidden by setting the x range explicitly
+            self.graphWidget.setXRange(t_start - origin, t_end - origin, padding=0)
+
+    def close(self):
+        '''Stop :attr:`timer` and remove all interfaces from the dashboard (the interfaces are not closed).'''
+        self.timer.stop()
+        for interface in list(self.interfaces):
+            self.remove_interface(interface)
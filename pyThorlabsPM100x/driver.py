@@ -1,11 +1,78 @@
 ''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
 
+import contextlib
+import functools
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from pyThorlabsPM100x.clock import WallClock
+
+#Cached attributes of the driver returned by ThorlabsPM100x.cached_state, in the format {key: attribute}
+STATE_ATTRIBUTES = {'connected': 'connected', 'model': 'model', 'being_zeroed': 'being_zeroed',
+                    'wavelength': '_wavelength', 'min_wavelength': 'min_wavelength', 'max_wavelength': 'max_wavelength',
+                    'power': '_power', 'power_units': '_power_units', 'power_range': '_power_range',
+                    'min_power_range': '_min_power_range', 'max_power_range': '_max_power_range',
+                    'auto_power_range': '_auto_power_range', 'sensor_idn': 'sensor_idn'}
+
+def _synchronized(method):
+    #Decorator which executes a method of ThorlabsPM100x as a single transaction (see ThorlabsPM100x._transaction)
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._transaction():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def zero_async(driver, poll_interval=0.1, timeout=60):
+    '''
+    Start the zeroing routine of ``driver`` (via ``driver.start_zero()``), and wait for its completion
+    on a background thread, by calling ``driver.read_zero_state()`` every ``poll_interval`` seconds
+    (as measured by ``driver.clock``).
+    Used by :meth:`ThorlabsPM100x.set_zero_async` and by :meth:`~pyThorlabsPM100x.worker.ProcessDriver.set_zero_async`.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Future which receives the duration of the zeroing (in seconds) once it is completed, or the
+        exception raised while starting it or while waiting for it (``RuntimeError`` if it did not
+        complete within ``timeout`` seconds).
+    '''
+    future = Future()
+    try:
+        driver.start_zero()
+    except Exception as e:
+        future.set_exception(e)
+        return future
+    clock = driver.clock
+    def wait():
+        start = clock.time()
+        try:
+            while driver.read_zero_state():
+                if clock.time() - start > timeout:
+                    raise RuntimeError(f"The zeroing routine did not complete within {timeout} s.")
+                clock.sleep(poll_interval)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(clock.time() - start)
+    threading.Thread(target=wait, name='PM100x zeroing', daemon=True).start()
+    return future
+
 class ThorlabsPM100x:
     """
     Low-level driver to communicate with Thorlabs PM100A and PM100D powermeter consoles via VISA (NI-VISA backend).
  
     The console must be set to "PM100D NI-VISA" mode (and not to "TLPM" mode) in order to be detected
     by this driver. See the project README for details on how to switch mode.
+
+    The driver is thread-safe: each SCPI query or write is performed while holding an internal
+    (re-entrant) lock, and so is each public method or property which communicates with the device,
+    so that operations made of several steps (e.g. :meth:`move_to_next_power_range` or
+    :meth:`connect_device`) are never interleaved with commands sent by other threads. The cached
+    state of the driver can be read at any time, without waiting for the lock, via :attr:`cached_state`.
  
     Attributes
     ----------
@@ -22,14 +89,27 @@ class ThorlabsPM100x:
         Model specified by the user when instantiating this driver (if any). When set, only devices
         matching this model are returned by :meth:`list_devices` and accepted by :meth:`connect_device`.
     being_zeroed : int
-        Flag (0/1) set to 1 while the powermeter is performing its zeroing routine. While set, reading
-        :attr:`power` does not query the instrument and returns ``(None, '')``.
+        Flag (0/1) set to 1 while the powermeter is performing its zeroing routine (see :meth:`start_zero`
+        and :meth:`set_zero_async`). While set, reading :attr:`power` does not query the instrument and
+        returns ``(None, '')``.
     min_wavelength : int or None
         Minimum operating wavelength (in nm) supported by the connected device. Populated by
         :meth:`read_min_max_wavelength`, which is called automatically upon connection.
     max_wavelength : int or None
         Maximum operating wavelength (in nm) supported by the connected device. Populated by
         :meth:`read_min_max_wavelength`, which is called automatically upon connection.
+    pool_timeout : float
+        Time (in seconds) after which the VISA resources opened by :meth:`list_devices`, and not
+        used by :meth:`connect_device`, are closed.
+    profile_cache : str or None
+        Path of the JSON file containing the profiles of the console/sensor pairs already connected
+        (see :meth:`read_parameters_upon_connection`), or ``None`` if profiles are not used.
+    sensor_idn : str or None
+        Identity of the sensor head attached to the connected console (answer to ``SYST:SENS:IDN?``),
+        read upon connection when :attr:`profile_cache` is set.
+    clock : object
+        Clock used to timestamp the readings (e.g. in :meth:`sweep_wavelength`) and to wait (see
+        :mod:`pyThorlabsPM100x.clock`). In virtual mode, it is also the clock of the simulated devices.
     """
     #The list model_identifiers is used to identify a device as a Thorlabs console, and to detect its model.
     #Each element of the list is a list of two strings. If the second string is contained in the device identity (i.e. the answer to '*IDN?')
@@ -39,7 +119,7 @@ class ThorlabsPM100x:
                         ['PM100A',   'Thorlabs,PM100A']
                         ]
 
-    def __init__(self,model=None, virtual=False):
+    def __init__(self,model=None, virtual=False, pool_timeout=60, profile_cache=None, clock=None):
         """
         Parameters
         ----------
@@ -49,7 +129,20 @@ class ThorlabsPM100x:
         virtual : bool, optional
             If ``True``, use the virtual VISA backend (``pyvisa_virtual``) instead of real hardware.
             This allows the driver to run without any physical device or pyvisa installation, using
-            three simulated PM100x consoles. Default is ``False``.
+            three simulated PM100x consoles (or the devices set with
+            :func:`pyThorlabsPM100x.pyvisa_virtual.set_default_devices`). Default is ``False``.
+        pool_timeout : float, optional
+            Time (in seconds) after which the VISA resources opened by :meth:`list_devices`, and not
+            used by :meth:`connect_device`, are closed. Default is 60.
+        profile_cache : str, optional
+            Path of a JSON file used to store the fixed properties (wavelength limits and power range
+            limits) of each console/sensor pair, so that they do not need to be queried again at the
+            next connection. The file is created if it does not exist. Default is ``None`` (no cache).
+        clock : object, optional
+            Clock used to timestamp the readings (one of the clocks of :mod:`pyThorlabsPM100x.clock`).
+            In virtual mode, the simulated devices follow this clock too, so that passing a
+            :class:`~pyThorlabsPM100x.clock.ManualClock` makes the simulated readings deterministic.
+            Default is ``None``, which uses a :class:`~pyThorlabsPM100x.clock.WallClock`.
 
         Raises
         ------
@@ -65,7 +158,11 @@ class ThorlabsPM100x:
         else:
             import pyvisa as _visa
         self._VisaIOError = _visa.VisaIOError
-        self.rm = _visa.ResourceManager()
+        self.clock = clock if clock is not None else WallClock()
+        if virtual:
+            self.rm = _visa.ResourceManager(clock=self.clock)
+        else:
+            self.rm = _visa.ResourceManager()
         self.connected = False
         self.model = None       #model of the device currently connected. 
         self.model_user = model #model specified by user. This variable is only used if the user specified a specific model
@@ -77,12 +174,68 @@ class ThorlabsPM100x:
         self._power_units = None
         self._min_power_range = None
         self._max_power_range = None
+        self._power_range_limits = {}   #Cache of the min and max power ranges for each wavelength, in the format {wavelength: (min_power_range, max_power_range)}
+        self.list_valid_devices = []
+        self.list_all_devices = ()
+        self.profile_cache = profile_cache
+        self.sensor_idn = None
+        self._idn = None        #Identity of the device currently connected
+
+        #Resources opened by list_devices() are kept open for pool_timeout seconds, so that connect_device() can use them
+        #without opening them again. The dictionary _resource_pool has the format {address: [resource, idn, time of last use]}
+        self.pool_timeout = pool_timeout
+        self._resource_pool = {}
+        self._pool_lock = threading.Lock()
+        self._pool_timer = None
 
         #The properties min_wavelength and max_wavelength are defined as 'standard' variables and not
         # via the @property, because they never change once we are connected to a given powermeter, 
         # so we can query the powermeter only once (at connection) and avoid additional queries later.
         self.min_wavelength = None 
         self.max_wavelength = None
+
+        self._lock = threading.RLock()  #Held during each transaction with the device
+        self._depth = 0                 #Number of nested transactions currently open
+        self._publish_state()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # Hold the lock of the device while the code in the with-block is executed. When the outermost transaction
+        # ends, a snapshot of the cached attributes is published (see self.cached_state)
+        with self._lock:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._publish_state()
+
+    def _publish_state(self):
+        self._state = {key: getattr(self, attr) for (key, attr) in STATE_ATTRIBUTES.items()}
+
+    def _query(self, command):
+        # Send a query to the connected device and read its answer, without letting other threads communicate with the device in the meanwhile
+        with self._lock:
+            return self.instrument.query(command)
+
+    def _write(self, command):
+        with self._lock:
+            self.instrument.write(command)
+
+    @property
+    def cached_state(self):
+        '''
+        dict: Snapshot of the cached state of the driver, taken at the end of the last transaction with
+        the device. Keys are ``'connected'``, ``'model'``, ``'being_zeroed'``, ``'wavelength'``,
+        ``'min_wavelength'``, ``'max_wavelength'``, ``'power'``, ``'power_units'``, ``'power_range'``,
+        ``'min_power_range'``, ``'max_power_range'``, ``'auto_power_range'`` and ``'sensor_idn'``.
+
+        Reading this property never communicates with the device, nor waits for other threads: the
+        values are consistent with each other, but a transaction running in another thread might be
+        changing them.
+        '''
+        return dict(self._state)
         
     def list_devices(self):
         '''
@@ -92,6 +245,11 @@ class ThorlabsPM100x:
  
         Serial (``ASRL``) resources are skipped, since Thorlabs powermeter consoles are not accessed
         over a plain serial port.
+
+        The resources of the valid devices are not closed, but kept in a pool for :attr:`pool_timeout`
+        seconds, so that :meth:`connect_device` can use them without opening them and identifying them
+        again. Resources already in the pool are not opened again, but their identity is queried again
+        to make sure that the device is still available.
  
         If :attr:`model_user` was set (i.e. the user requested a specific model when instantiating this
         driver), only devices matching that model are included in the returned list.
@@ -114,30 +272,134 @@ class ThorlabsPM100x:
 
         self.list_all_devices = self.rm.list_resources()
         self.list_valid_devices = [] 
-        for addr in self.list_all_devices:
-            if(not(addr.startswith('ASRL'))):
-                try:
-                    instrument = self.rm.open_resource(addr)
-                    idn = instrument.query('*IDN?').strip()
-                    for model in self.model_identifiers: #sweep over all supported models
-                        if model[1] in idn:              #check if idn is one of the supported models
-                            if self.model_user  and not(self.model_user ==model[0]): #if the user had specified a specific model, we don't consider any other model
-                                break
-                            self.list_valid_devices.append([addr,idn,model[0]])
-                    instrument.before_close()
-                    instrument.close()
-                except self._VisaIOError:
-                    pass
+        with self._pool_lock:
+            for addr in list(self._resource_pool.keys()):   #Close the pooled resources which are not available anymore
+                if addr not in self.list_all_devices:
+                    self._close_pooled_resource(addr)
+            for addr in self.list_all_devices:
+                if(not(addr.startswith('ASRL'))):
+                    device = self._identify_device(addr)
+                    if device:
+                        self.list_valid_devices.append(device)
+        self._schedule_pool_eviction()
         return self.list_valid_devices
+
+    def update_list_devices(self):
+        '''
+        Incrementally update the list of valid devices found by :meth:`list_devices`.
+
+        The list of VISA resources currently visible to the system is compared with the one
+        obtained during the previous scan. Only the resources which appeared since then are opened
+        and identified, while the devices whose resources disappeared are removed from
+        ``list_valid_devices``. Devices already known are not queried at all, so calling this method
+        periodically has a negligible cost when nothing changes.
+
+        Returns
+        -------
+        (added, removed) : (list, list)
+            Lists of the devices (each in the format ``[address, idn, model]``, as in
+            :meth:`list_devices`) which were added to, and removed from, ``list_valid_devices``.
+        '''
+        all_devices = self.rm.list_resources()
+        new_addresses = [addr for addr in all_devices if not(addr in self.list_all_devices)]
+        self.list_all_devices = all_devices
+        added = []
+        removed = [dev for dev in self.list_valid_devices if not(dev[0] in all_devices)]
+        with self._pool_lock:
+            for dev in removed:
+                self.list_valid_devices.remove(dev)
+                if dev[0] in self._resource_pool:
+                    self._close_pooled_resource(dev[0])
+            for addr in new_addresses:
+                if(not(addr.startswith('ASRL'))):
+                    device = self._identify_device(addr)
+                    if device:
+                        added.append(device)
+                        self.list_valid_devices.append(device)
+        self._schedule_pool_eviction()
+        return added, removed
+
+    def _identify_device(self, addr):
+        # Query the identity of the device at address addr, reusing its resource if it is in the pool. If the device is a valid device,
+        # its resource is added to (or kept in) the pool, and the list [address, idn, model] is returned. Otherwise, None is returned.
+        # Must be called while holding self._pool_lock
+        if addr in self._resource_pool:
+            instrument = self._resource_pool[addr][0]
+        else:
+            try:
+                instrument = self.rm.open_resource(addr)
+            except self._VisaIOError:
+                return None
+        try:
+            idn = instrument.query('*IDN?').strip()
+        except self._VisaIOError:
+            idn = ''
+        for model in self.model_identifiers: #sweep over all supported models
+            if model[1] in idn:              #check if idn is one of the supported models
+                if self.model_user  and not(self.model_user ==model[0]): #if the user had specified a specific model, we don't consider any other model
+                    break
+                self._resource_pool[addr] = [instrument, idn, time.monotonic()]
+                return [addr,idn,model[0]]
+        if addr in self._resource_pool:
+            self._close_pooled_resource(addr)
+        else:
+            try:
+                instrument.before_close()
+                instrument.close()
+            except self._VisaIOError:
+                pass
+        return None
+
+    def _close_pooled_resource(self, addr):
+        # Must be called while holding self._pool_lock
+        instrument = self._resource_pool.pop(addr)[0]
+        try:
+            instrument.before_close()
+            instrument.close()
+        except self._VisaIOError:
+            pass
+
+    def close_idle_resources(self, max_idle=None):
+        '''
+        Close the resources opened by :meth:`list_devices` which have not been used by
+        :meth:`connect_device` for more than ``max_idle`` seconds.
+
+        This is done automatically (in a background timer) after :attr:`pool_timeout` seconds.
+
+        Parameters
+        ----------
+        max_idle : float, optional
+            Maximum idle time, in seconds. If not specified, :attr:`pool_timeout` is used.
+            Pass ``0`` to close all the resources in the pool.
+        '''
+        max_idle = self.pool_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._pool_lock:
+            for addr in list(self._resource_pool.keys()):
+                if now - self._resource_pool[addr][2] >= max_idle:
+                    self._close_pooled_resource(addr)
+        self._pool_timer = None
+        self._schedule_pool_eviction()
+
+    def _schedule_pool_eviction(self):
+        if self._pool_timer is None and self._resource_pool:
+            self._pool_timer = threading.Timer(self.pool_timeout, self.close_idle_resources)
+            self._pool_timer.daemon = True
+            self._pool_timer.start()
     
+    @_synchronized
     def connect_device(self,device_addr):
         '''
         Attempt to connect to the device identified by ``device_addr``.
  
         The device address is first validated against the list of currently available, supported
-        devices (obtained via :meth:`list_devices`). Upon successful connection, all relevant
+        devices (obtained via :meth:`list_devices`). If the device was found by a previous call to
+        :meth:`list_devices` less than :attr:`pool_timeout` seconds ago, the resource opened at that
+        time is used, and neither a new scan nor a new ``*IDN?`` query is needed (if the device does not
+        answer through that resource anymore, the resource is closed and opened again). Upon connection, all relevant
         instrument parameters (wavelength, power range, etc.) are read once via
-        :meth:`read_parameters_upon_connection`.
+        :meth:`read_parameters_upon_connection`. The connection is successful (and :attr:`connected` is
+        ``True``) only if reading these parameters succeeds.
  
         Parameters
         ----------
@@ -155,26 +417,61 @@ class ThorlabsPM100x:
         ValueError
             If ``device_addr`` does not correspond to any currently available, supported device.
         '''
-        self.list_devices()
+        with self._pool_lock:
+            in_pool = device_addr in self._resource_pool
+        if not(in_pool):
+            self.list_devices()
         device_addresses = [dev[0] for dev in self.list_valid_devices]
-        if (device_addr in device_addresses):
-            try:         
-                self.instrument = self.rm.open_resource(device_addr)
-                Msg = self.instrument.query('*IDN?')
-                for model in self.model_identifiers:
-                    if model[1] in Msg:
-                        self.model = model[0]
-                ID = 1
-            except self._VisaIOError:
-                Msg = "Error while connecting."
-                ID = 0
-        else:
+        if not(device_addr in device_addresses):
             raise ValueError("The specified address is not a valid device address.")
-        if(ID==1):
-            self.connected = True
+        with self._pool_lock:
+            pooled = self._resource_pool.pop(device_addr, None)
+        if pooled:
+            (self.instrument, Msg, _) = pooled
+            try:
+                self._initialize_connection(Msg)
+                return (Msg,1)
+            except self._VisaIOError:
+                pass    #The device does not answer through the pooled resource anymore (which has been closed): the resource is opened again
+        try:
+            self.instrument = self.rm.open_resource(device_addr)
+        except self._VisaIOError:
+            return ("Error while connecting.",0)
+        try:
+            Msg = self._query('*IDN?')
+        except self._VisaIOError:
+            self._close_instrument()
+            return ("Error while connecting.",0)
+        try:
+            self._initialize_connection(Msg.strip())
+        except self._VisaIOError:
+            return ("Error while connecting.",0)
+        return (Msg,1)
+
+    def _initialize_connection(self, idn):
+        # Store the identity and model of the device opened in self.instrument, and read its parameters.
+        # If an error occurs, the resource is closed, self.connected is set back to False, and the error is raised again
+        self._idn = idn
+        for model in self.model_identifiers:
+            if model[1] in idn:
+                self.model = model[0]
+        self.connected = True   #Required by the properties queried by read_parameters_upon_connection()
+        self._power_range_limits = {}
+        try:
             self.read_parameters_upon_connection()
-        return (Msg,ID)
+        except Exception:
+            self.connected = False
+            self._close_instrument()
+            raise
+
+    def _close_instrument(self):
+        # Close self.instrument, ignoring errors (e.g. if the device is not reachable anymore)
+        try:
+            self.instrument.close()
+        except self._VisaIOError:
+            pass
 
+    @_synchronized
     def read_parameters_upon_connection(self):
         '''
         Query the instrument once for all relevant parameters and cache them in the
@@ -189,16 +486,109 @@ class ThorlabsPM100x:
 
         Parameters queried: power units, wavelength, wavelength range (min/max), power,
         min/max power range, auto power range status, current power range.
+
+        If :attr:`profile_cache` is set, the identity of the sensor head is queried too
+        (``SYST:SENS:IDN?``), and the profile of this console/sensor pair (identified by the serial
+        numbers of both) is looked up in the cache. If found, the wavelength range and the power range
+        limits of the wavelengths already used are taken from the profile, instead of being queried.
+        The sensor identity query also acts as a validation of the profile: if a different sensor head
+        is attached to the console, the profile is not used. The parameters which can be changed by
+        the user (power units, wavelength, auto power range and power range) are always queried.
         '''
         self.power_units
         self.wavelength
-        self.read_min_max_wavelength()
+        profile = self.load_profile() if self.profile_cache else None
+        if profile:
+            (self.min_wavelength, self.max_wavelength) = profile['wavelength_limits']
+            self._power_range_limits.update({int(wl): tuple(limits) for (wl, limits) in profile['power_range_limits'].items()})
+        else:
+            self.read_min_max_wavelength()
         self.power
-        self.min_power_range
-        self.max_power_range
+        if self._wavelength in self._power_range_limits:
+            (self._min_power_range, self._max_power_range) = self._power_range_limits[self._wavelength]
+        else:
+            self.min_power_range
+            self.max_power_range
         self.auto_power_range
         self.power_range
+        if self.profile_cache:
+            self.save_profile()
+
+    def _profile_key(self):
+        # Key of the profile of the connected console/sensor pair, made of the serial numbers of the console and of the sensor
+        console = (self._idn or '').split(',')
+        sensor = (self.sensor_idn or '').split(',')
+        return f"{console[2] if len(console) > 2 else self._idn}|{','.join(sensor[:2])}"
+
+    @_synchronized
+    def read_sensor_idn(self):
+        '''
+        Query the identity of the sensor head attached to the console (``SYST:SENS:IDN?``), and store
+        it in :attr:`sensor_idn`.
+
+        Returns
+        -------
+        str
+            The identity of the sensor, or an empty string if the console does not support the query.
+        '''
+        if not(self.connected):
+            raise RuntimeError("No powermeter is currently connected.")
+        try:
+            self.sensor_idn = self._query('SYST:SENS:IDN?').strip()
+        except self._VisaIOError:
+            self.sensor_idn = ''
+        return self.sensor_idn
+
+    def load_profile(self):
+        '''
+        Read the identity of the sensor head (see :meth:`read_sensor_idn`), and return the profile of
+        the connected console/sensor pair stored in :attr:`profile_cache`.
 
+        Returns
+        -------
+        dict or None
+            Dictionary with keys ``'wavelength_limits'`` (``[min, max]``, in nm) and
+            ``'power_range_limits'`` (``{wavelength: [min, max]}``), or ``None`` if the pair is not in
+            the cache (or the sensor identity cannot be read, or the cache cannot be read).
+        '''
+        if not(self.read_sensor_idn()):
+            return None
+        try:
+            with open(self.profile_cache) as f:
+                return json.load(f).get(self._profile_key())
+        except (OSError, ValueError):
+            return None
+
+    def save_profile(self):
+        '''
+        Store in :attr:`profile_cache` the profile of the connected console/sensor pair, i.e. its
+        wavelength range and the power range limits of all the wavelengths used so far. The profiles
+        of other pairs already in the file are preserved.
+
+        Returns
+        -------
+        bool
+            ``True`` if the profile was saved, ``False`` otherwise (e.g. the sensor identity is not
+            known, or the file cannot be written).
+        '''
+        if not(self.profile_cache and self.sensor_idn and self.min_wavelength is not None):
+            return False
+        try:
+            with open(self.profile_cache) as f:
+                profiles = json.load(f)
+        except (OSError, ValueError):
+            profiles = {}
+        profiles[self._profile_key()] = {'wavelength_limits': [self.min_wavelength, self.max_wavelength],
+                                         'power_range_limits': {str(wl): list(limits) for (wl, limits) in self._power_range_limits.items()}}
+        try:
+            with open(self.profile_cache + '.tmp', 'w') as f:
+                json.dump(profiles, f, indent=1)
+            os.replace(self.profile_cache + '.tmp', self.profile_cache)     #The file is replaced atomically, so it is never left half-written
+        except OSError:
+            return False
+        return True
+
+    @_synchronized
     def disconnect_device(self):
         '''
         Disconnect the currently connected device, disabling its remote-control mode and closing the
@@ -216,6 +606,8 @@ class ThorlabsPM100x:
             If no device is currently connected.
         '''
         if(self.connected == True):
+            if self.profile_cache:
+                self.save_profile()     #Store the power range limits of the wavelengths used during this connection
             try:   
                 self.instrument.control_ren(False)  # Disable remote mode
                 self.instrument.close()
@@ -225,17 +617,20 @@ class ThorlabsPM100x:
                 ID = 0 
                 Msg = e
             self.connected = False
+            self.being_zeroed = 0
             return (Msg,ID)
         else:
             raise RuntimeError("Device is already disconnected.")
 
     @property
+    @_synchronized
     def power(self):
         '''
         (float, str): The power currently measured by the console, and its units.
  
         Querying this property issues a VISA query to the instrument (``measure:power?``). While :attr:`being_zeroed` is set (i.e. while the instrument is performing
         its zeroing routine), no query is sent and ``(None, '')`` is returned instead.
+        The units are not queried: the value cached by :attr:`power_units` (which is read upon connection) is returned.
  
         Raises
         ------
@@ -246,13 +641,15 @@ class ThorlabsPM100x:
             self._power , self._power_units = None , ''
             raise RuntimeError("No powermeter is currently connected.")
         if(self.being_zeroed==0):
-            Msg1 = self.instrument.query('measure:power?')
+            Msg1 = self._query('measure:power?')
             self._power = float(Msg1)
         else:
-            self._power , self._power_units = None , ''
+            self._power = None
+            return (None, '')
         return (self._power , self._power_units)
 
     @property
+    @_synchronized
     def power_units(self):
         '''
         str: The units of the power readings, as reported by the instrument (``power:dc:unit?``).
@@ -268,11 +665,12 @@ class ThorlabsPM100x:
         '''
         if not(self.connected):
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('power:dc:unit?')
+        Msg = self._query('power:dc:unit?')
         self._power_units = str(Msg).strip('\n') 
         return  self._power_units
 
     @property
+    @_synchronized
     def wavelength(self):
         '''
         int: The operating (calibration) wavelength of the console, in nanometers.
@@ -296,11 +694,12 @@ class ThorlabsPM100x:
         if not(self.connected):
             self._wavelength = None
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('SENS:CORR:WAV?')
+        Msg = self._query('SENS:CORR:WAV?')
         self._wavelength = int(float(Msg))
         return self._wavelength
 
     @wavelength.setter
+    @_synchronized
     def wavelength(self, wl):
         #Input variable wl can be either a string or a float or an int
         if not(self.connected):
@@ -314,9 +713,10 @@ class ThorlabsPM100x:
             raise ValueError("Wavelength must be a positive number.")
         if wl<self.min_wavelength or wl>self.max_wavelength:
             raise ValueError(f"Wavelength must be between {self.min_wavelength} and {self.max_wavelength}.")
-        self.instrument.write('SENS:CORR:WAV ' + str(wl))
+        self._write('SENS:CORR:WAV ' + str(wl))
         self._wavelength = wl
 
+    @_synchronized
     def read_min_max_wavelength(self):
         '''
         Query the instrument for the minimum and maximum operating wavelengths supported by the
@@ -338,13 +738,14 @@ class ThorlabsPM100x:
         '''
         if not(self.connected):
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('SENS:CORR:WAV? MIN')
+        Msg = self._query('SENS:CORR:WAV? MIN')
         self.min_wavelength = int(float(Msg))
-        Msg = self.instrument.query('SENS:CORR:WAV? MAX')
+        Msg = self._query('SENS:CORR:WAV? MAX')
         self.max_wavelength = int(float(Msg))
         return self.min_wavelength, self.max_wavelength
 
     @property
+    @_synchronized
     def min_power_range(self):
         '''
         float: The minimum power range available for the current wavelength, defined as the maximum
@@ -361,11 +762,13 @@ class ThorlabsPM100x:
         if not(self.connected):
             self._min_power_range = None
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('POW:DC:RANG? MIN')
+        Msg = self._query('POW:DC:RANG? MIN')
         self._min_power_range = float(Msg)
+        self._cache_power_range_limits()
         return self._min_power_range
 
     @property
+    @_synchronized
     def max_power_range(self):
         '''
         float: The maximum power range available for the current wavelength, defined as the maximum
@@ -382,11 +785,17 @@ class ThorlabsPM100x:
         if not(self.connected):
             self._max_power_range = None
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('POW:DC:RANG? MAX')
+        Msg = self._query('POW:DC:RANG? MAX')
         self._max_power_range = float(Msg)
+        self._cache_power_range_limits()
         return self._max_power_range
 
+    def _cache_power_range_limits(self):
+        if self._wavelength is not None and self._min_power_range is not None and self._max_power_range is not None:
+            self._power_range_limits[self._wavelength] = (self._min_power_range, self._max_power_range)
+
     @property
+    @_synchronized
     def auto_power_range(self):
         '''
         bool: Whether the console's automatic power-ranging mode is currently enabled.
@@ -405,21 +814,23 @@ class ThorlabsPM100x:
         if not(self.connected):
             self._auto_power_range = None
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('POW:DC:RANG:AUTO?')
+        Msg = self._query('POW:DC:RANG:AUTO?')
         self._auto_power_range = bool(int(Msg))         
         return self._auto_power_range
 
     @auto_power_range.setter
+    @_synchronized
     def auto_power_range(self, status):
         if not(self.connected):
             raise RuntimeError("No powermeter is currently connected.")
         if not(type(status)==bool):
             raise TypeError("Value of auto_power_range must be either True or False.")
         string = 'ON' if status else 'OFF'
-        self.instrument.write('POW:DC:RANG:AUTO ' + string)
+        self._write('POW:DC:RANG:AUTO ' + string)
         self._auto_power_range = status
 
     @property
+    @_synchronized
     def power_range(self):
         '''
         float: The current power range, defined as the maximum power measurable within
@@ -442,11 +853,12 @@ class ThorlabsPM100x:
         if not(self.connected):
             self._power_range = None
             raise RuntimeError("No powermeter is currently connected.")
-        Msg = self.instrument.query('POW:DC:RANG?')
+        Msg = self._query('POW:DC:RANG?')
         self._power_range = float(Msg)
         return self._power_range
 
     @power_range.setter
+    @_synchronized
     def power_range(self, power):
         if not(self.connected):
             raise RuntimeError("No powermeter is currently connected.")
@@ -454,36 +866,109 @@ class ThorlabsPM100x:
             raise TypeError("Value of power_range must be a number.")
         if power<0:
             raise ValueError("Power must be a positive number.")
-        self.instrument.write('POW:DC:RANG ' + str(power))
+        self._write('POW:DC:RANG ' + str(power))
         self._power_range = power
 
 
-    def set_zero(self):
+    @_synchronized
+    def start_zero(self):
         '''
-        Trigger the zeroing routine of the console (``sense:correction:collect:zero``).
- 
+        Start the zeroing routine of the console (``sense:correction:collect:zero``), and return
+        immediately.
+
+        :attr:`being_zeroed` is set to 1, and reading :attr:`power` returns ``(None, '')`` instead of
+        querying the instrument, until :meth:`read_zero_state` reports that the routine is completed.
+
+        Raises
+        ------
+        RuntimeError
+            If no device is currently connected.
+        '''
+        if not(self.connected):
+            raise RuntimeError("No powermeter is currently connected.")
+        self._write('sense:correction:collect:zero')
+        self.being_zeroed = 1
+
+    @_synchronized
+    def read_zero_state(self):
+        '''
+        Query whether the zeroing routine is still running (``sense:correction:collect:zero:state?``),
+        and update :attr:`being_zeroed` accordingly.
+
+        Returns
+        -------
+        bool
+            ``True`` if the zeroing routine is still running, ``False`` otherwise.
+
+        Raises
+        ------
+        RuntimeError
+            If no device is currently connected.
+        '''
+        if not(self.connected):
+            self.being_zeroed = 0
+            raise RuntimeError("No powermeter is currently connected.")
+        try:
+            running = bool(int(float(self._query('sense:correction:collect:zero:state?'))))
+        except (self._VisaIOError, ValueError):
+            self.being_zeroed = 0   #We do not know the state of the device, readings are resumed anyway
+            raise
+        self.being_zeroed = 1 if running else 0
+        return running
+
+    def set_zero_async(self, poll_interval=0.1, timeout=60):
+        '''
+        Start the zeroing routine of the console (see :meth:`start_zero`), and poll its state (see
+        :meth:`read_zero_state`) on a background thread, without blocking the caller.
+
+        Since the lock of the driver is only held while each command is sent, other threads can
+        keep using the driver while the console is being zeroed (reading :attr:`power` returns
+        ``(None, '')`` until the routine is completed).
+
+        Parameters
+        ----------
+        poll_interval : float, optional
+            Time (in seconds) between two queries of the zeroing state. Default is 0.1.
+        timeout : float, optional
+            Maximum duration (in seconds) of the zeroing routine. Default is 60.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future which receives the duration of the zeroing routine (in seconds) once it is
+            completed, or the exception raised while starting it or while polling its state.
+        '''
+        return zero_async(self, poll_interval, timeout)
+
+    def set_zero(self, poll_interval=0.1, timeout=60):
+        '''
+        Perform the zeroing routine of the console, and wait until it is completed
+        (see :meth:`set_zero_async`).
+
         While the zeroing routine is running, :attr:`being_zeroed` is set to 1, and reading
         :attr:`power` will return ``(None, '')`` instead of querying the instrument.
- 
+
+        Parameters
+        ----------
+        poll_interval : float, optional
+            See :meth:`set_zero_async`. Default is 0.1.
+        timeout : float, optional
+            See :meth:`set_zero_async`. Default is 60.
+
         Returns
         -------
         ID : int
-            1 if the command was sent successfully, 0 if a VISA error occurred.
+            1 if the zeroing was completed successfully, 0 if no device is connected, or if a
+            VISA error (or a timeout) occurred.
         '''
-        ID = 0
-        if(self.connected):
-            self.being_zeroed = 1
-            try:
-                self.instrument.write('sense:correction:collect:zero')
-                self.being_zeroed = 0
-                ID = 1
-            except self._VisaIOError:
-                ID = 0
-                self.being_zeroed = 0
-                pass
-        return ID
+        try:
+            self.set_zero_async(poll_interval, timeout).result()
+            return 1
+        except (self._VisaIOError, RuntimeError, ValueError):
+            return 0
 
     
+    @_synchronized
     def move_to_next_power_range(self,direction,LastPowerRange = None):
         '''
         Increase or decrease the power range of the console by one step.
@@ -534,4 +1019,75 @@ class ThorlabsPM100x:
         self.power_range = self.TargetPowerRange    #Try updating the power range to the new value. The value stored in self.power_range (when retrieving it) will actually be one of the valid power ranges
                                                     #allowed by the specific powermeter.
         if self.power_range == self.old_powerRange: #if after setting the desired power, the power range of the powermeters is unchanged, we call again this function
-            self.move_to_next_power_range(direction,self.TargetPowerRange)
\ No newline at end of file
+            self.move_to_next_power_range(direction,self.TargetPowerRange)
+
+    def sweep_wavelength(self, wavelengths, samples_per_point=1, settle_time=0):
+        '''
+        Measure the power at each wavelength in ``wavelengths``, taking ``samples_per_point``
+        readings per wavelength.
+
+        Compared to setting :attr:`wavelength` and reading :attr:`power` in a loop, this method
+        avoids any query which is not strictly needed: the wavelength is written only when it
+        differs from the current one, and the minimum and maximum power ranges of each wavelength
+        are queried only the first time that wavelength is used (they are cached afterwards, and
+        the cache is kept until the next connection). The current power range is queried again
+        only if it falls outside the limits of the new wavelength.
+
+        This method requires ``numpy``.
+
+        Parameters
+        ----------
+        wavelengths : sequence of int
+            Wavelengths (in nm) at which the power is measured. All of them must be between
+            :attr:`min_wavelength` and :attr:`max_wavelength`.
+        samples_per_point : int, optional
+            Number of readings taken at each wavelength. Default is 1.
+        settle_time : float, optional
+            Time (in seconds) to wait after changing the wavelength and before taking the readings.
+            Default is 0.
+
+        Returns
+        -------
+        (timestamps, powers) : (numpy.ndarray, numpy.ndarray)
+            Two arrays of shape ``(len(wavelengths), samples_per_point)``, containing the time (given
+            by :attr:`clock`, by default in seconds since the epoch) of each reading, and the power read. Readings taken while the
+            device was being zeroed are ``NaN``.
+
+        Raises
+        ------
+        RuntimeError
+            If no device is currently connected.
+        ValueError
+            If any wavelength is outside the range ``[min_wavelength, max_wavelength]``, or if
+            ``samples_per_point`` is smaller than 1.
+        '''
+        import numpy as np
+        if not(self.connected):
+            raise RuntimeError("No powermeter is currently connected.")
+        wavelengths = [int(wl) for wl in wavelengths]
+        for wl in wavelengths:
+            if wl<self.min_wavelength or wl>self.max_wavelength:
+                raise ValueError(f"Wavelength must be between {self.min_wavelength} and {self.max_wavelength}.")
+        if samples_per_point < 1:
+            raise ValueError("samples_per_point must be a positive integer.")
+        timestamps = np.empty((len(wavelengths), samples_per_point))
+        powers = np.empty((len(wavelengths), samples_per_point))
+        for i, wl in enumerate(wavelengths):
+            with self._transaction():   #Each wavelength is measured atomically, but other threads can communicate with the device between two wavelengths
+                if wl != self._wavelength:
+                    self._write('SENS:CORR:WAV ' + str(wl))
+                    self._wavelength = wl
+                    if wl in self._power_range_limits:
+                        (self._min_power_range, self._max_power_range) = self._power_range_limits[wl]
+                    else:
+                        self.min_power_range
+                        self.max_power_range
+                    if self._power_range is None or not(self._min_power_range <= self._power_range <= self._max_power_range):
+                        self.power_range
+                    if settle_time > 0:
+                        self.clock.sleep(settle_time)
+                for j in range(samples_per_point):
+                    timestamps[i, j] = self.clock.time()
+                    power, _ = self.power
+                    powers[i, j] = math.nan if power is None else power
+        return timestamps, powers
@@ -0,0 +1,112 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Export of the acquired data to CSV, NPY or NPZ files.
+
+The function :func:`export_data` writes the data in chunks, and reports the progress via
+a callback. It is meant to be run on a background thread (see
+:meth:`~pyThorlabsPM100x.main.interface.export_data`), with the data passed as views of the
+acquisition buffer: since stored samples are never modified, the views are a consistent
+snapshot of the data even while the acquisition continues.
+"""
+
+import os
+
+import numpy as np
+
+import pyThorlabsPM100x.units
+
+FORMATS = ('csv', 'npy', 'npz')
+CHUNK_SIZE = 100000     # Number of samples converted and written at a time
+
+
+def export_format(path):
+    '''
+    Return the export format (one of :data:`FORMATS`) corresponding to the extension of ``path``.
+
+    Raises
+    ------
+    ValueError
+        If the extension does not correspond to any supported format.
+    '''
+    fmt = os.path.splitext(path)[1].lower().lstrip('.')
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported file extension {fmt!r}. Supported formats are " + ", ".join(FORMATS))
+    return fmt
+
+
+def export_data(path, timestamps, values, units='W', events=None, progress=None, raw_values=None):
+    '''
+    Write timestamps and power values to a file.
+
+    The format is chosen from the extension of ``path``:
+
+    * ``.csv``: a text file with a header line and two columns, ``timestamp`` (seconds since the
+      epoch) and the power.
+    * ``.npy``: a NumPy array with shape ``(N, 2)``, whose columns are the timestamps and the powers.
+    * ``.npz``: a NumPy archive with arrays ``timestamps``, ``values`` and ``units``, and, if
+      ``events`` is given, ``event_index``, ``event_time``, ``event_kind`` and ``event_value``
+      (and ``raw_values``, if ``raw_values`` is given).
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to create (it is overwritten if it exists).
+    timestamps : numpy.ndarray
+        Acquisition times, in seconds since the epoch.
+    values : numpy.ndarray
+        Power values, in W.
+    units : str, optional
+        Units in which the powers are written (one of :data:`pyThorlabsPM100x.units.UNITS`).
+        Default is ``'W'``.
+    events : list of tuple, optional
+        Events in the format ``(index, timestamp, kind, value)`` (see
+        :attr:`~pyThorlabsPM100x.main.interface.stored_events`). Only written in NPZ files.
+    progress : callable, optional
+        Called with a float between 0 and 1 after each chunk is written.
+    raw_values : numpy.ndarray, optional
+        Power values before the calibration, in W (see
+        :attr:`~pyThorlabsPM100x.main.interface.stored_raw_data`). Only written in NPZ files.
+
+    Raises
+    ------
+    ValueError
+        If the extension of ``path`` or ``units`` are not supported.
+    OSError
+        If the file cannot be written.
+    '''
+    fmt = export_format(path)
+    units = pyThorlabsPM100x.units.normalize_units(units)
+    n = len(values)
+    progress = progress or (lambda fraction: None)
+    if fmt == 'npz':
+        events = events or []
+        event_values = [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for (_, _, _, v) in events]
+        extra = {} if raw_values is None else {'raw_values': pyThorlabsPM100x.units.from_watts(raw_values, units)}
+        np.savez(path, timestamps=timestamps, values=pyThorlabsPM100x.units.from_watts(values, units), units=units, **extra,
+                 event_index=np.array([e[0] for e in events], dtype=int), event_time=np.array([e[1] for e in events], dtype=float),
+                 event_kind=np.array([e[2] for e in events], dtype=str), event_value=np.array(event_values, dtype=float))
+        progress(1.0)
+        return
+    if fmt == 'npy':
+        output = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(n, 2))
+    else:
+        output = open(path, 'w')
+        output.write(f"timestamp,power [{units}]\n")
+    try:
+        for start in range(0, n, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, n)
+            chunk = pyThorlabsPM100x.units.from_watts(values[start:stop], units)
+            if fmt == 'npy':
+                output[start:stop, 0] = timestamps[start:stop]
+                output[start:stop, 1] = chunk
+            else:
+                np.savetxt(output, np.column_stack((timestamps[start:stop], chunk)), delimiter=',', fmt=('%.6f', '%.9e'))
+            progress(stop/n)
+    finally:
+        if fmt == 'npy':
+            output.flush()
+            del output
+        else:
+            output.close()
+    progress(1.0)
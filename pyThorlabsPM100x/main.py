@@ -11,10 +11,28 @@ import PyQt5.QtCore as QtCore
 import logging
 import sys
 import argparse
+import functools
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
 
 import abstract_instrument_interface
 import pyThorlabsPM100x.driver
-from pyThorlabsPM100x.plots import PlotObject
+from pyThorlabsPM100x.plots import PlotObject, AnalysisPlotObject, VisibilityWatcher
+from pyThorlabsPM100x.analysis import NoiseAnalyzer
+from pyThorlabsPM100x.buffer import AcquisitionBuffer
+from pyThorlabsPM100x.pyramid import MinMaxPyramid
+from pyThorlabsPM100x.autorange import SoftwareAutoRange
+import pyThorlabsPM100x.units
+from pyThorlabsPM100x.streaming import StreamServer, PENDING
+from pyThorlabsPM100x.capture import TriggeredCapture
+import pyThorlabsPM100x.export
+from pyThorlabsPM100x.checkpoint import SessionCheckpoint, load_session
+from pyThorlabsPM100x.scheduler import CommandScheduler, PRIORITY_USER, PRIORITY_BACKGROUND, PRIORITY_POLL
+from pyThorlabsPM100x.pipeline import Pipeline
+from pyThorlabsPM100x.calibration import CalibrationTable
 
 graphics_dir = os.path.join(os.path.dirname(__file__), 'graphics')
 
@@ -42,6 +60,9 @@ class interface(abstract_instrument_interface.abstract_interface):
     sig_list_devices_updated : pyqtSignal(list)
         Emitted when the list of available devices is refreshed. Carries the list of
         device name strings shown in the GUI combo box.
+    sig_devices_changed : pyqtSignal(list, list)
+        Emitted by :meth:`check_list_devices` when devices are plugged in or removed. Carries the
+        lists of added and removed devices, each device in the format ``[address, idn, model]``.
     sig_reading : pyqtSignal(int)
         Emitted when the reading status changes. Parameter is one of
         ``SIG_READING_START``, ``SIG_READING_PAUSE``, or ``SIG_READING_STOP``.
@@ -58,6 +79,26 @@ class interface(abstract_instrument_interface.abstract_interface):
         Emitted when the power range changes. Carries the new power range value.
     sig_auto_power_range : pyqtSignal(bool)
         Emitted when the auto power range status changes. Carries the new boolean status.
+    sig_software_auto_power_range : pyqtSignal(bool)
+        Emitted when the software auto power range status changes. Carries the new boolean status.
+    sig_display_units : pyqtSignal(str)
+        Emitted when the units used to display the power change. Carries the new units.
+    sig_stream_command : pyqtSignal(object)
+        Emitted (from a thread of the streaming server) when a client of the streaming server
+        sends a command. Used internally to execute the command in the main thread.
+    sig_capture_event : pyqtSignal(object)
+        Emitted when a triggered capture is completed (see :meth:`start_triggered_capture`).
+        Carries the :class:`~pyThorlabsPM100x.capture.CaptureEvent`.
+    sig_export_progress : pyqtSignal(float)
+        Emitted (from the export thread) while data are exported by :meth:`export_data`.
+        Carries the fraction of data written, between 0 and 1.
+    sig_export_finished : pyqtSignal(str, str)
+        Emitted when an export started by :meth:`export_data` is finished. Carries the path of the
+        file, and an error message (empty if the export was successful).
+    sig_command_done : pyqtSignal(object)
+        Emitted (from the thread of :attr:`scheduler`) when a command submitted via
+        :meth:`submit_command` is executed. Used internally to run the callback of the command in
+        the main thread.
 
     Status codes
     ------------
@@ -70,26 +111,108 @@ class interface(abstract_instrument_interface.abstract_interface):
 
     Instance attributes
     -------------------
-    instrument : ThorlabsPM100x
-        The low-level driver instance used to communicate with the device.
+    instrument : ThorlabsPM100x or ProcessDriver
+        The low-level driver instance used to communicate with the device. If the interface
+        was created with ``isolated=True``, this is a
+        :class:`~pyThorlabsPM100x.worker.ProcessDriver`, which runs the driver in a child process.
+    isolated : bool
+        ``True`` if the driver runs in a child process (see :mod:`pyThorlabsPM100x.worker`).
+    scheduler : CommandScheduler
+        The :class:`~pyThorlabsPM100x.scheduler.CommandScheduler` through which all the commands
+        sent to :attr:`instrument` are executed, one at a time. Commands requested by the user
+        (wavelength, power range, zero, ...) are executed before the periodic power readings, and
+        a new wavelength, power range or auto-ranging status supersedes any older one which was
+        not sent to the device yet.
     connected_device_name : str
         VISA address of the currently connected device, or empty string if disconnected.
+    connected_device_idn : str
+        Identity (answer to ``*IDN?``) of the currently connected device. Used to find the same
+        device again (by its serial number) when the connection is lost.
+    reconnecting : bool
+        ``True`` while the interface is trying to reconnect to a device whose connection was lost
+        during the acquisition (see :meth:`handle_acquisition_error`).
+    zeroing : bool
+        Read-only property. ``True`` while the device is performing its zeroing routine (see
+        :meth:`set_zero_powermeter`).
     continuous_read : bool
         When ``True``, :meth:`update` reads power continuously at the rate set by
         ``settings['refresh_time']``.
-    stored_data : list of float
-        Power values accumulated since the last :meth:`start_reading` or
-        :meth:`stop_reading`.
+    read_timer : QtCore.QTimer
+        Single-shot timer used by :meth:`update` to schedule the next reading. It is stopped when
+        the acquisition is paused or stopped, and while the interface is reconnecting.
+    buffer : AcquisitionBuffer
+        :class:`~pyThorlabsPM100x.buffer.AcquisitionBuffer` containing the timestamps and
+        the power values accumulated since the last :meth:`stop_reading`.
+    pyramid : MinMaxPyramid
+        :class:`~pyThorlabsPM100x.pyramid.MinMaxPyramid` of the data in :attr:`buffer`, updated
+        as new data are acquired. Use ``pyramid.get_range(t0, t1, max_points)`` to get a decimated
+        (but spike-preserving) version of any time range of the acquired data.
+    stored_data : numpy.ndarray
+        Read-only property. View of the power values stored in :attr:`buffer`.
+    stored_raw_data : numpy.ndarray
+        Read-only property. View of the power values stored in :attr:`buffer`, before the
+        correction of :attr:`calibration` (the same as :attr:`stored_data` if no calibration was
+        ever applied).
+    stored_timestamps : numpy.ndarray
+        Read-only property. View of the timestamps (in seconds since the epoch) stored in :attr:`buffer`.
+    stored_events : list of tuple
+        Events which occurred during the acquisition (e.g. power range changes performed by the
+        software auto-ranging), in the format ``(index, timestamp, kind, value)``, where ``index``
+        is the index in :attr:`buffer` of the first sample acquired after the event.
+    pipeline : Pipeline
+        The :class:`~pyThorlabsPM100x.pipeline.Pipeline` of processing stages applied to each block
+        of readings before it is stored and distributed (see :meth:`set_pipeline`).
+    calibration : CalibrationTable or None
+        The :class:`~pyThorlabsPM100x.calibration.CalibrationTable` of wavelength-dependent correction
+        factors applied to the readings (see :meth:`set_calibration`), or ``None``.
+    autorange : SoftwareAutoRange
+        The :class:`~pyThorlabsPM100x.autorange.SoftwareAutoRange` engine used when
+        ``settings['software_auto_power_range']`` is ``True``.
     power_units : str
-        Power units reported by the device (e.g. ``'W'``). Set upon connection.
+        Units of all acquired data, always ``'W'``. Readings of devices set to other units
+        are converted to watts as soon as they are acquired.
+    instrument_power_units : str or None
+        Power units of the device (e.g. ``'W'`` or ``'dBm'``), read once upon connection.
     wavelength : int
         Most recently read operating wavelength, in nm.
     power_range : float
         Most recently read power range value.
     min_max_wls : (int, int)
         Cached ``(min_wavelength, max_wavelength)`` tuple, in nm.
+    capture : TriggeredCapture or None
+        The :class:`~pyThorlabsPM100x.capture.TriggeredCapture` started by
+        :meth:`start_triggered_capture`, or ``None`` if the triggered capture is off.
+    capture_events : list of CaptureEvent
+        Captures completed since the last :meth:`stop_reading`.
+    keep_continuous_data : bool
+        If ``False``, readings are not stored in :attr:`buffer` while the triggered capture is on,
+        so that only the captures (in :attr:`capture_events`) are kept.
+    checkpoint : SessionCheckpoint or None
+        The :class:`~pyThorlabsPM100x.checkpoint.SessionCheckpoint` used to save the session
+        periodically, or ``None`` if checkpointing is off (see :meth:`start_checkpointing`).
+    checkpoint_timer : QtCore.QTimer
+        Timer which calls :meth:`write_checkpoint` every ``settings['checkpoint_time']`` seconds.
+    export_thread : threading.Thread or None
+        The thread running the last export started by :meth:`export_data`.
+    stream_server : StreamServer or None
+        The :class:`~pyThorlabsPM100x.streaming.StreamServer` started by
+        :meth:`start_streaming_server`, or ``None`` if no server is running.
     settings : dict
-        ``'refresh_time'`` (float, seconds) and ``'auto_power_range'`` (bool).
+        ``'refresh_time'`` (float, seconds), ``'auto_power_range'`` (bool),
+        ``'software_auto_power_range'`` (bool), ``'display_units'`` (str, one of
+        :data:`pyThorlabsPM100x.units.UNITS`), ``'device_watch_time'`` (float, seconds
+        between two checks of the list of devices, ``0`` to disable the checks),
+        ``'auto_reconnect'`` (bool, whether to reconnect automatically when the connection is lost),
+        ``'plot_time_window'`` (float, seconds of data shown in the plot of the GUI, ``0`` to
+        show all data), ``'analysis_samples'`` (int, number of most recent readings analyzed by the
+        analysis panel of the GUI), ``'display_refresh_time'`` (float, minimum time in seconds between
+        two updates of the power display and of the plot of the GUI), ``'analysis_refresh_time'`` (float, seconds between two updates
+        of the analysis panel), ``'checkpoint_time'`` (float, seconds between two checkpoints of the
+        session, see :meth:`start_checkpointing`), ``'pipeline'`` (list of dict, description of the
+        processing stages applied to the readings, see :meth:`set_pipeline`) and ``'calibration_file'``
+        (str, path of the calibration table applied to the readings, see :meth:`set_calibration`).
+    device_watcher : QtCore.QTimer
+        Timer which calls :meth:`check_list_devices` every ``settings['device_watch_time']`` seconds.
     """
 
     output = {'Power':0}  #We define this also as class variable. This makes it possible to see which data is produced by this interface without having to create an object
@@ -98,6 +221,7 @@ class interface(abstract_instrument_interface.abstract_interface):
     #                                                           | Triggered when ...                                        | Parameter(s) Sent     
     #                                                       #   -----------------------------------------------------------------------------------------------------------------------         
     sig_list_devices_updated = QtCore.pyqtSignal(list)      #   | List of devices is updated                                | List of devices   
+    sig_devices_changed = QtCore.pyqtSignal(list,list)      #   | Devices are plugged in or removed                         | Lists of added and removed devices
     sig_reading = QtCore.pyqtSignal(int)                    #   | Reading status changes                                    | 1 = Started Reading, 2 = Paused Reading, 3 Stopped Reading
     sig_updated_data = QtCore.pyqtSignal(object)            #   | Data is read from instrument                              | Acquired data 
     sig_wavelength = QtCore.pyqtSignal(int)                 #   | Wavelength is changed                                     | Current Wavelength
@@ -105,12 +229,27 @@ class interface(abstract_instrument_interface.abstract_interface):
     sig_refreshtime = QtCore.pyqtSignal(float)              #   | Refresh time is changed                                   | Current Refresh time 
     sig_power_range = QtCore.pyqtSignal(float)              #   | Power range is changed                                    | Current Power range
     sig_auto_power_range = QtCore.pyqtSignal(bool)          #   | Auto power range setting is changed                       | Current Status of auto power range (true/false)
+    sig_software_auto_power_range = QtCore.pyqtSignal(bool) #   | Software auto power range setting is changed              | Current Status of software auto power range (true/false)
+    sig_display_units = QtCore.pyqtSignal(str)              #   | Units used to display power are changed                   | Current display units
+    sig_stream_command = QtCore.pyqtSignal(object)          #   | A client of the streaming server sent a command           | Dictionary describing the command
+    sig_capture_event = QtCore.pyqtSignal(object)           #   | A triggered capture is completed                          | CaptureEvent object
+    sig_export_progress = QtCore.pyqtSignal(float)          #   | Part of the data is exported                              | Fraction of data exported
+    sig_export_finished = QtCore.pyqtSignal(str,str)        #   | Export of data is finished                                | Path of file, error message (empty if successful)
+    sig_command_done = QtCore.pyqtSignal(object)            #   | A command submitted to the scheduler is executed          | (callback, future, key)
     ##
     # Identifier codes used for view-model communication. Other general-purpose codes are specified in abstract_instrument_interface
     SIG_READING_START = 1
     SIG_READING_PAUSE = 2
     SIG_READING_STOP = 3
 
+    VI_ERROR_TMO = -1073807339  # VISA error code of timeouts, which are considered transient errors
+    MAX_TIMEOUT_RETRIES = 2     # Number of times a reading is retried, after a timeout, before considering the connection lost
+    RECONNECT_MIN_DELAY = 0.5   # Delay (in s) before the first reconnection attempt. The delay is doubled after each failed attempt...
+    RECONNECT_MAX_DELAY = 30    # ...up to this value
+    ZERO_POLL_INTERVAL = 0.1    # Time (in s) between two queries of the state of the zeroing routine
+    ZERO_TIMEOUT = 60           # Maximum duration (in s) of the zeroing routine
+    STREAM_COMMAND_TIMEOUT = 5  # Maximum time (in s) a client of the streaming server waits for a command to be executed, before being told that it is pending
+
     def __init__(self, **kwargs):
         '''
         Parameters
@@ -118,25 +257,103 @@ class interface(abstract_instrument_interface.abstract_interface):
         **kwargs
             Forwarded to :class:`~abstract_instrument_interface.abstract_interface`.
             Required key: ``app`` (``Qt.QApplication``). Optional keys include
-            ``name_logger`` (str), ``config_dict`` (dict), and ``virtual`` (bool).
+            ``name_logger`` (str), ``config_dict`` (dict), ``virtual`` (bool), ``isolated`` (bool)
+            ``profile_cache`` (str or ``None``) and ``clock``.
             Pass ``virtual=True`` to use the simulated driver instead of real hardware.
+            Pass ``isolated=True`` to run the driver, and the acquisition, in a separate process
+            (see :mod:`pyThorlabsPM100x.worker`).
+            ``profile_cache`` is the path of the file where the fixed properties of each console/sensor
+            pair are stored, to speed up the following connections (see
+            :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.read_parameters_upon_connection`). By default,
+            the file ``profiles.json`` in the same folder as ``config.json`` is used. Pass ``None`` to
+            disable the cache.
+            ``clock`` is the clock used to timestamp the readings and the events (see
+            :mod:`pyThorlabsPM100x.clock`; by default, the system time). In virtual mode, the simulated
+            devices follow the same clock. It is ignored if ``isolated=True``.
         '''
         self.output = {'Power':0} 
         ### Default values of settings (might be overwritten by settings saved in .json files later)
         self.settings = {   'refresh_time': 0.2,
-                            'auto_power_range': True
+                            'auto_power_range': True,
+                            'software_auto_power_range': False,
+                            'display_units': 'W',
+                            'device_watch_time': 0,
+                            'auto_reconnect': True,
+                            'plot_time_window': 0,
+                            'analysis_samples': 4096,
+                            'display_refresh_time': 0.05,
+                            'analysis_refresh_time': 1,
+                            'checkpoint_time': 10,
+                            'pipeline': [],
+                            'calibration_file': ''
                             }
         
         self.list_devices = []          #list of devices found 
         self.connected_device_name = ''
+        self.connected_device_idn = ''
+        self.reconnecting = False
+        self._reconnection = None       # State of the current reconnection (if any). Dictionary created by self.handle_acquisition_error()
+        self._zeroing = None            # State of the zeroing in progress (if any). Dictionary created by self.set_zero_powermeter()
+        self.power_units = 'W'          # Units of all data stored by this interface
+        self.instrument_power_units = None
         self.continuous_read = False    # When this is set to True, the data from device are acquired continuously at the rate set by self.refresh_time
-        self.stored_data = []           # List used to store data acquired by device
+        self.read_timer = QtCore.QTimer()   # Single-shot timer which calls self.update(). Restarting it (rather than creating a new timer at each call) ensures that a single acquisition loop is running
+        self.read_timer.setSingleShot(True)
+        self.read_timer.timeout.connect(self.update)
+        self.buffer = AcquisitionBuffer()   # Buffer used to store data acquired by device
+        self.pyramid = MinMaxPyramid(self.buffer)   # Multi-resolution summary of self.buffer, used to plot long acquisitions
+        self.stored_events = []         # List of events (e.g. changes of power range) which occurred while acquiring data
+        self.pipeline = Pipeline()      # Processing stages applied to the readings, created from self.settings['pipeline'] by self.set_pipeline()
+        self.calibration = None         # CalibrationTable object, loaded from self.settings['calibration_file'] by self.set_calibration()
+        self.autorange = SoftwareAutoRange()
+        self._autorange_future = None   # Future of the power range change requested by self.check_software_auto_power_range(), until its result is processed
+        self.capture = None             # TriggeredCapture object, created by self.start_triggered_capture()
+        self.capture_events = []        # List of captures completed by self.capture
+        self.keep_continuous_data = True
+        self.checkpoint = None          # SessionCheckpoint object, created by self.start_checkpointing()
+        self.export_thread = None       # Thread used to export data in background, created by self.export_data()
+        self.stream_server = None       # StreamServer object used to send data to other processes, created by self.start_streaming_server()
         ###
         virtual = kwargs.get('virtual', False)
-        self.instrument = pyThorlabsPM100x.driver.ThorlabsPM100x(virtual=virtual)
+        self.isolated = kwargs.get('isolated', False)
+        profile_cache = kwargs.get('profile_cache', os.path.join(os.path.dirname(__file__), 'profiles.json'))
+        if self.isolated:
+            from pyThorlabsPM100x.worker import ProcessDriver
+            self.instrument = ProcessDriver(virtual=virtual, profile_cache=profile_cache)
+        else:
+            self.instrument = pyThorlabsPM100x.driver.ThorlabsPM100x(virtual=virtual, profile_cache=profile_cache, clock=kwargs.get('clock'))
+        ###
+        self.scheduler = CommandScheduler(name='PM100x commands')
+        self._latest_commands = {}      # Most recent future submitted with each key, see self.submit_command()
         ###
         super().__init__(**kwargs)
+        self.sig_stream_command.connect(self.execute_stream_command)
+        self.sig_command_done.connect(self._on_command_done)
         self.refresh_list_devices()   
+        self.device_watcher = QtCore.QTimer()
+        self.device_watcher.timeout.connect(self.check_list_devices)
+        self.set_device_watch_time(self.settings['device_watch_time'])
+        self.checkpoint_timer = QtCore.QTimer()
+        self.checkpoint_timer.timeout.connect(self.write_checkpoint)
+        self.set_pipeline(self.settings['pipeline'])
+        if self.settings['calibration_file'] and not self.set_calibration(self.settings['calibration_file']):
+            self.settings['calibration_file'] = ''
+
+    @property
+    def zeroing(self):
+        return self._zeroing is not None
+
+    @property
+    def stored_data(self):
+        return self.buffer.values
+
+    @property
+    def stored_raw_data(self):
+        return self.buffer.raw_values
+
+    @property
+    def stored_timestamps(self):
+        return self.buffer.timestamps
         
     def refresh_list_devices(self):
         '''
@@ -144,11 +361,63 @@ class interface(abstract_instrument_interface.abstract_interface):
         emit :attr:`sig_list_devices_updated` to refresh the GUI combo box.
         '''     
         self.logger.info(f"Looking for devices...") 
-        list_valid_devices = self.instrument.list_devices() #Then we read the list of devices
+        list_valid_devices = self.scheduler.call(self.instrument.list_devices) #Then we read the list of devices
         self.logger.info(f"Found {len(list_valid_devices)} devices.") 
         self.list_devices = list_valid_devices
         self.send_list_devices()
 
+    def check_list_devices(self):
+        '''
+        Check whether devices were plugged in or removed since the last scan, via the driver's
+        :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.update_list_devices` (which only identifies
+        the new resources). If anything changed, update :attr:`list_devices`, emit
+        :attr:`sig_devices_changed` and :attr:`sig_list_devices_updated`.
+
+        The scan is submitted to :attr:`scheduler` with a background priority, and this method returns
+        immediately; the result is handled in the main thread once the scan is done. A new scan is not
+        submitted while the previous one is still pending.
+
+        Called periodically by :attr:`device_watcher`.
+        '''
+        if self.scheduler.is_pending('device_watch'):
+            return
+        self.submit_command(self.instrument.update_list_devices, priority=PRIORITY_BACKGROUND, key='device_watch',
+                            callback=self._on_list_devices_checked)
+
+    def _on_list_devices_checked(self, future):
+        try:
+            (added, removed) = future.result()
+        except Exception as e:
+            self.logger.error(f"An error occurred while checking the list of devices: {e}")
+            return
+        if not(added or removed):
+            return
+        for dev in added:
+            self.logger.info(f"Device {dev[1]} found at address {dev[0]}.")
+        for dev in removed:
+            self.logger.info(f"Device {dev[1]} at address {dev[0]} was removed.")
+        self.list_devices = list(self.instrument.list_valid_devices)
+        self.sig_devices_changed.emit(added, removed)
+        self.send_list_devices()
+
+    def set_device_watch_time(self, watch_time):
+        '''
+        Set how often the list of devices is checked for devices plugged in or removed
+        (see :meth:`check_list_devices`).
+
+        Parameters
+        ----------
+        watch_time : float
+            Time between two checks, in seconds. ``0`` (the default value of
+            ``settings['device_watch_time']``) disables the checks.
+        '''
+        watch_time = float(watch_time)
+        self.settings['device_watch_time'] = watch_time
+        if watch_time > 0:
+            self.device_watcher.start(int(watch_time*1e3))
+        else:
+            self.device_watcher.stop()
+
     def send_list_devices(self):
         '''
         Emit :attr:`sig_list_devices_updated` with the current device list formatted
@@ -192,10 +461,11 @@ class interface(abstract_instrument_interface.abstract_interface):
             return
         self.logger.info(f"Connecting to device {device_name}...")
         try:
-            (Msg,ID) = self.instrument.connect_device(device_name)      # Try to connect by using the method connect_device of the device driver
+            (Msg,ID) = self.scheduler.call(self.instrument.connect_device, device_name)      # Try to connect by using the method connect_device of the device driver
             if(ID==1):  #If connection was successful
                 self.logger.info(f"Connected to device {device_name}.")
                 self.connected_device_name = device_name
+                self.connected_device_idn = str(Msg).strip()
                 self.set_connected_state()
             else: #If connection was not successful
                 self.logger.error(f"Error: {Msg}")
@@ -212,13 +482,25 @@ class interface(abstract_instrument_interface.abstract_interface):
         stops continuous reading, and emits :attr:`sig_connected` with
         :attr:`~abstract_instrument_interface.abstract_interface.SIG_DISCONNECTED`.
         If disconnection fails (e.g. the device was already physically unplugged), the
-        disconnected state is still set so the GUI resets correctly.
-        '''
+        disconnected state is still set so the GUI resets correctly. If the interface is
+        trying to reconnect to a device (see :meth:`handle_acquisition_error`), the
+        reconnection is cancelled.
+        '''
+        if self.reconnecting:
+            self.logger.info(f"Reconnection to device {self.connected_device_idn} cancelled.")
+            self.reconnecting = False
+            self.continuous_read = False
+            self.sig_reading.emit(self.SIG_READING_PAUSE)
+            self.set_disconnected_state()
+            return
+        if self._zeroing:
+            self._zeroing['handle'].cancel()
+            self._zeroing = None
         self.logger.info(f"Disconnecting from device {self.connected_device_name}...")
-        (Msg,ID) = self.instrument.disconnect_device()
+        (Msg,ID) = self.scheduler.call(self.instrument.disconnect_device)
+        self.continuous_read = False # We set this variable to False so that the continuous reading from the powermeter will stop
         if(ID==1): # If disconnection was successful
             self.logger.info(f"Disconnected from device {self.connected_device_name}.")
-            self.continuous_read = False # We set this variable to False so that the continuous reading from the powermeter will stop
             self.set_disconnected_state()
         else: #If disconnection was not successful
             self.logger.error(f"Error: {Msg}")
@@ -226,12 +508,23 @@ class interface(abstract_instrument_interface.abstract_interface):
                                           #for some reason. In this case, it is still useful to have all widgets reset to disconnected state      
     def close(self,**kwargs):
         '''
-        Close this interface. Delegates entirely to the parent class
-        :meth:`~abstract_instrument_interface.abstract_interface.close`, which emits
+        Close this interface. Stops the streaming server (if running), writes a last checkpoint of
+        the session (if checkpointing is on), then delegates to the
+        parent class :meth:`~abstract_instrument_interface.abstract_interface.close`, which emits
         :attr:`~abstract_instrument_interface.abstract_interface.sig_close`, saves
-        settings, and disconnects the device if connected.
-        '''
+        settings, and disconnects the device if connected. Finally, stops :attr:`scheduler` (commands
+        not executed yet are discarded). If the driver runs in a child process, the process is terminated.
+        '''
+        if self.stream_server:
+            self.stop_streaming_server()
+        if self.checkpoint:
+            self.stop_checkpointing()
+        self.device_watcher.stop()
+        self.reconnecting = False
         super().close(**kwargs)           
+        self.scheduler.close()
+        if self.isolated:
+            self.instrument.close()
 
     def set_connected_state(self):
         '''
@@ -240,16 +533,30 @@ class interface(abstract_instrument_interface.abstract_interface):
         to perform PM100x-specific initialization after a successful connection.
 
         In addition to emitting :attr:`sig_connected` with ``SIG_CONNECTED``, this
-        method caches the power units, reads and emits the wavelength range and current
+        method stores the power units of the device, emits the wavelength range and current
         wavelength, applies the auto power range setting from :attr:`settings`, and
-        starts continuous reading via :meth:`start_reading`.
+        starts continuous reading via :meth:`start_reading`. All these parameters were already
+        read by the driver upon connection, so no query is sent to the device, unless the auto
+        power range setting differs from the status of the device.
         '''
         super().set_connected_state()
-        self.power_units = self.instrument.power_units
+        state = self.instrument.cached_state
+        try:
+            self.instrument_power_units = pyThorlabsPM100x.units.normalize_units(state['power_units'])
+        except ValueError as e:
+            self.logger.error(f"{e} Readings will be treated as W.")
+            self.instrument_power_units = 'W'
         self.read_min_max_wavelength()
-        self.read_wavelength()
+        self.wavelength = state['wavelength']
+        self.sig_wavelength.emit(self.wavelength)
         #self.read_status_power_autorange()
-        self.set_auto_power_range(self.settings['auto_power_range'])
+        if state['auto_power_range'] == self.settings['auto_power_range']:
+            self.sig_auto_power_range.emit(self.settings['auto_power_range'])
+            self.power_range = state['power_range']
+            self.sig_power_range.emit(self.power_range)
+        else:
+            self.set_auto_power_range(self.settings['auto_power_range'])
+        self.sig_software_auto_power_range.emit(self.settings['software_auto_power_range'])
         #self.read_power_range()
         self.start_reading()
 
@@ -284,13 +591,63 @@ class interface(abstract_instrument_interface.abstract_interface):
             return False
         self.logger.info(f"The refresh time is now {refresh_time} s.")
         self.settings['refresh_time'] = refresh_time
+        if self.isolated and self.instrument.sampling:
+            self.scheduler.call(self.instrument.start_sampling, refresh_time)
         self.sig_refreshtime.emit(self.settings['refresh_time'])
         return True
 
+    def submit_command(self, function, *args, priority=PRIORITY_USER, key=None, callback=None, latest_only=False):
+        '''
+        Submit a command to :attr:`scheduler`, i.e. queue the call ``function(*args)`` to be
+        executed on the thread of the scheduler (see
+        :meth:`~pyThorlabsPM100x.scheduler.CommandScheduler.submit`).
+
+        Parameters
+        ----------
+        function : callable
+            The function to call. It is executed on the thread of the scheduler, so it must not
+            interact with the GUI, nor emit signals which are not thread-safe.
+        *args
+            Arguments passed to ``function``.
+        priority : int, optional
+            Priority of the command. Default is ``PRIORITY_USER``.
+        key : hashable, optional
+            If specified, any command submitted earlier with the same key, and not executed yet,
+            is dropped.
+        callback : callable, optional
+            If specified, ``callback(future)`` is called in the main thread once the command has
+            been executed (but not if the command is dropped).
+        latest_only : bool, optional
+            If ``True``, ``callback`` is not called if another command with the same ``key`` was
+            submitted after this one (e.g. so that the result of a command already superseded is
+            not shown). Default is ``False``.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future which receives the return value of ``function``.
+        '''
+        future = self.scheduler.submit(function, *args, priority=priority, key=key)
+        if latest_only:
+            self._latest_commands[key] = future
+        if callback:
+            future.add_done_callback(lambda f: None if f.cancelled() else self.sig_command_done.emit((callback, f, key if latest_only else None)))
+        return future
+
+    def _on_command_done(self, item):
+        # Slot connected to sig_command_done. Runs (in the main thread) the callback of a command executed by self.scheduler
+        (callback, future, key) = item
+        if key is not None and self._latest_commands.get(key) is not future:
+            return
+        callback(future)
+
     def set_wavelength(self, wl):
         '''
         Validate and set the operating wavelength of the connected device.
 
+        The new wavelength is written by :attr:`scheduler`, before any pending power reading. If
+        several wavelengths are set before the device is available, only the last one is written.
+
         Parameters
         ----------
         wl : str, int, or float
@@ -306,26 +663,44 @@ class interface(abstract_instrument_interface.abstract_interface):
 
         Notes
         -----
-        After a successful wavelength change, :meth:`read_power_range` is called
-        because the available power ranges may change with wavelength.
+        After the wavelength is changed, the power range is read again (because the available
+        power ranges may change with wavelength), and :attr:`sig_wavelength` and
+        :attr:`sig_power_range` are emitted.
         '''
+        if not self.instrument.connected:
+            self.logger.error(f"No device is connected.")
+            return False
         try:
-            if int(self.instrument.wavelength) == int(float(wl)): #in this case the number in the refresh time edit box is the same as the wavelength currently set
-                    return True
-            self.logger.info(f"Setting the wavelength to {wl} for the device {self.connected_device_name}...")
+            wl = int(float(wl))
         except (ValueError,TypeError) as e:
             self.logger.error(f"The wavelength must be a valid number.")
-            self.sig_wavelength.emit(self.instrument.wavelength)
+            self.sig_wavelength.emit(self.wavelength)
             return False
-        try: 
-            self.instrument.wavelength = int(float(wl))
-            self.logger.info(f"Wavelength set correctly.")
-        except Exception as e:
-            self.logger.error(f"An error occurred while setting the wavelength: {e}")
-            self.sig_wavelength.emit(self.instrument.wavelength)
+        if wl == self.wavelength and not self.scheduler.is_pending('wavelength'): #in this case the number in the wavelength edit box is the same as the wavelength currently set
+            return True
+        if wl < self.min_max_wls[0] or wl > self.min_max_wls[1]:
+            self.logger.error(f"Wavelength must be between {self.min_max_wls[0]} and {self.min_max_wls[1]}.")
+            self.sig_wavelength.emit(self.wavelength)
             return False
-        self.read_power_range() #The boundaries of the power ranges might change when the wavelength is changed, so we need to update it after changing the wavelength
+        self.logger.info(f"Setting the wavelength to {wl} for the device {self.connected_device_name}...")
+        self.submit_command(self._write_wavelength, wl, key='wavelength', callback=self._on_wavelength_written, latest_only=True)
         return True
+
+    def _write_wavelength(self, wl):
+        # Executed by self.scheduler. The boundaries of the power ranges might change when the wavelength is changed, so the power range is read again
+        self.instrument.wavelength = wl
+        return wl, self.instrument.power_range
+
+    def _on_wavelength_written(self, future):
+        try:
+            (self.wavelength, power_range) = future.result()
+        except Exception as e:
+            self.logger.error(f"An error occurred while setting the wavelength: {e}")
+            self.sig_wavelength.emit(self.wavelength)
+            return
+        self.logger.info(f"Wavelength set correctly.")
+        self.sig_wavelength.emit(self.wavelength)
+        self._on_power_range_read(power_range)
   
     def read_wavelength(self):
         '''
@@ -337,12 +712,12 @@ class interface(abstract_instrument_interface.abstract_interface):
         '''
         self.logger.info(f"Reading current wavelength from device {self.connected_device_name}...")
         try:
-            wl = self.instrument.wavelength
+            wl = self.scheduler.call(getattr, self.instrument, 'wavelength')
         except RuntimeError as e:
             self.logger.error(f"An error occurred while reading the wavelength from this device: {e}")
             return
         self.wavelength = int(wl)
-        self.sig_wavelength.emit(self.instrument.wavelength)
+        self.sig_wavelength.emit(self.wavelength)
         self.logger.info(f"Current wavelength is {self.wavelength}.") 
         return
       
@@ -364,6 +739,7 @@ class interface(abstract_instrument_interface.abstract_interface):
     def change_power_range(self,direction):
         '''
         Increase or decrease the power range by one step, then read and emit the new range.
+        The command is executed by :attr:`scheduler`, before any pending power reading.
 
         Parameters
         ----------
@@ -377,10 +753,55 @@ class interface(abstract_instrument_interface.abstract_interface):
         else: 
             string = 'decrease'
         self.logger.info(f"Trying to {string} the power range...")
-        self.instrument.move_to_next_power_range(direction)
-        self.read_power_range()
+        self.submit_command(self._step_power_range, direction, callback=self._on_power_range_written)
         return
 
+    def set_power_range(self, power_range):
+        '''
+        Set the power range of the device to the smallest range which allows to measure
+        ``power_range`` (see :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.power_range`), then read
+        and emit the actual range. If several ranges are set before the device is available, only
+        the last one is written.
+
+        Parameters
+        ----------
+        power_range : float
+            Desired power range, in W.
+
+        Returns
+        -------
+        bool
+            ``True`` if the value was accepted, ``False`` otherwise.
+        '''
+        if not(type(power_range) in (int, float)) or power_range < 0:
+            self.logger.error(f"The power range must be a positive number.")
+            return False
+        self.logger.info(f"Setting the power range to {power_range} for the device {self.connected_device_name}...")
+        self.submit_command(self._step_power_range, 0, power_range, key='power_range', callback=self._on_power_range_written, latest_only=True)
+        return True
+
+    def _step_power_range(self, direction, target=None):
+        # Executed by self.scheduler. Either moves to the next power range in the given direction, or (if target is not None) sets the power range to target.
+        # Returns the power range read from the device afterwards
+        if target is None:
+            self.instrument.move_to_next_power_range(direction)
+        else:
+            self.instrument.power_range = target
+        return self.instrument.power_range
+
+    def _on_power_range_written(self, future):
+        try:
+            power_range = future.result()
+        except Exception as e:
+            self.logger.error(f"An error occurred while changing the power range: {e}")
+            return
+        self._on_power_range_read(power_range)
+
+    def _on_power_range_read(self, power_range):
+        self.power_range = power_range
+        self.sig_power_range.emit(self.power_range)
+        self.logger.info(f"Current power range is {self.power_range}.") 
+
     def read_power_range(self):
         '''
         Read the current power range from the device, cache it in :attr:`power_range`,
@@ -391,17 +812,16 @@ class interface(abstract_instrument_interface.abstract_interface):
         '''
         self.logger.info(f"Reading current power range from device {self.connected_device_name}...")
         try:
-            pow_range = self.instrument.power_range
+            pow_range = self.scheduler.call(getattr, self.instrument, 'power_range')
         except RuntimeError as e:
             self.logger.error(f"An error occurred while reading the power range from this device: {e}")
             return
-        self.power_range = pow_range
-        self.sig_power_range.emit(self.power_range)
-        self.logger.info(f"Current power range is {self.power_range}.") 
+        self._on_power_range_read(pow_range)
 
     def set_auto_power_range(self,auto_power_range):
         '''
         Enable or disable the automatic power-ranging mode of the connected device.
+        The command is executed by :attr:`scheduler`, before any pending power reading.
 
         Parameters
         ----------
@@ -411,21 +831,148 @@ class interface(abstract_instrument_interface.abstract_interface):
         Notes
         -----
         On success, updates ``settings['auto_power_range']`` and emits
-        :attr:`sig_auto_power_range`. Regardless of success, :meth:`read_power_range`
-        is called afterwards to update the displayed power range value.
+        :attr:`sig_auto_power_range`. The power range is read again afterwards, to update the
+        displayed power range value. Enabling the
+        auto-ranging of the device disables the software auto-ranging (see
+        :meth:`set_software_auto_power_range`).
         '''
         auto_power_range = bool(auto_power_range)
+        if auto_power_range and self.settings['software_auto_power_range']:
+            self.set_software_auto_power_range(False)
         status_string = 'ON' if auto_power_range else 'OFF'
         self.logger.info(f"Setting the auto-ranging function to {status_string} for the device {self.connected_device_name}...")    
+        self.submit_command(self._write_auto_power_range, auto_power_range, key='auto_power_range', callback=self._on_auto_power_range_written, latest_only=True)
+
+    def _write_auto_power_range(self, auto_power_range):
+        # Executed by self.scheduler
+        try:
+            self.instrument.auto_power_range = auto_power_range
+            error = None
+        except Exception as e:
+            error = e
+        return auto_power_range, error, self.instrument.power_range
+
+    def _on_auto_power_range_written(self, future):
         try:
-            self.instrument.auto_power_range  = auto_power_range
+            (auto_power_range, error, power_range) = future.result()
+        except Exception as e:
+            self.logger.error(f"An error occurred while setting the auto-ranging status: {e}")
+            return
+        if error:
+            self.logger.error(f"An error occurred while setting the auto-ranging status: {error}")
+        else:
             self.sig_auto_power_range.emit(auto_power_range)
             self.logger.info(f"Setting changed successfully.")
             self.settings['auto_power_range'] = auto_power_range
+        self._on_power_range_read(power_range)
+
+    def set_software_auto_power_range(self, status):
+        '''
+        Enable or disable the software auto-ranging.
+
+        When enabled, the power range is changed by this interface (rather than by the device)
+        according to the readings, as decided by :attr:`autorange` (see
+        :class:`~pyThorlabsPM100x.autorange.SoftwareAutoRange`). Each range change is recorded
+        in :attr:`stored_events`. Enabling the software auto-ranging disables the auto-ranging
+        of the device.
+
+        Parameters
+        ----------
+        status : bool
+            ``True`` to enable the software auto-ranging, ``False`` to disable it.
+        '''
+        status = bool(status)
+        status_string = 'ON' if status else 'OFF'
+        self.logger.info(f"Setting the software auto-ranging function to {status_string}...")
+        self.settings['software_auto_power_range'] = status
+        self.autorange.reset()
+        if status and self.instrument.connected and self.settings['auto_power_range']:
+            self.set_auto_power_range(False)
+        self.sig_software_auto_power_range.emit(status)
+
+    def check_software_auto_power_range(self, values):
+        '''
+        Pass new readings to the software auto-ranging engine (:attr:`autorange`), and change
+        the power range by one step if required. The change is recorded in :attr:`stored_events`
+        as a ``'power_range'`` event.
+
+        If the same range change was already performed before (at the same wavelength), the new
+        range is set directly with a single write to the device. Otherwise, the change is performed
+        with :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.move_to_next_power_range`, and its
+        result is stored in the ladder of :attr:`autorange`. The change is submitted to :attr:`scheduler`
+        (with a priority lower than the commands requested by the user), and its result is processed
+        once it has been executed: this method does not wait for the device. No other change is
+        requested until then, nor while a power range set by the user is waiting to be written.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            New readings, in W.
+        '''
+        if self.settings['auto_power_range']:
+            return
+        if self._autorange_future is not None and not self._autorange_future.cancelled():   # The previous change is not completed yet
+            return
+        if self.scheduler.is_pending('power_range'):
+            return
+        direction = self.autorange.check(values, self.power_range)
+        if direction == 0:
+            return
+        wavelength = self.instrument.cached_state['wavelength']
+        old_range = self.power_range
+        new_range = self.autorange.next_range(wavelength, old_range, direction)
+        if new_range == old_range: #We already know that the power range cannot be changed in this direction
+            self.autorange.reset()
+            return
+        self._autorange_future = self.submit_command(self._step_power_range, direction, new_range, priority=PRIORITY_BACKGROUND, key='power_range',
+                                                     callback=functools.partial(self._on_software_auto_power_range_step, wavelength, old_range, direction))
+
+    def _on_software_auto_power_range_step(self, wavelength, old_range, direction, future):
+        self._autorange_future = None
+        try:
+            power_range = future.result()
         except Exception as e:
-            self.logger.error(f"An error occurred while setting the auto-ranging status: {e}")
-        #self.read_auto_power_range()
-        self.read_power_range()
+            self.logger.error(f"An error occurred while changing the power range: {e}")
+            return
+        self._on_power_range_read(power_range)
+        self.autorange.record_step(wavelength, old_range, direction, self.power_range)
+        if self.power_range != old_range:
+            self.record_event('power_range', self.power_range)
+
+    def record_gap(self, kind, duration):
+        '''
+        Append a gap marker to the acquired data, e.g. after the device was zeroed or reconnected: a
+        ``NaN`` sample, passed to all the consumers of the readings via :meth:`distribute_block`
+        (and also sent to the clients of the streaming server, which otherwise do not receive ``NaN``
+        readings), followed by an event in :attr:`stored_events`.
+
+        Parameters
+        ----------
+        kind : str
+            Type of the event (e.g. ``'zero'`` or ``'gap'``).
+        duration : float
+            Duration of the gap, in seconds, stored as the value of the event.
+        '''
+        now = self.instrument.clock.time()
+        (timestamps, values) = (np.array([now]), np.array([np.nan]))
+        self.distribute_block(timestamps, values)
+        if self.stream_server:
+            self.stream_server.publish(timestamps, values)
+        self.record_event(kind, duration)
+
+    def record_event(self, kind, value=None):
+        '''
+        Append an event to :attr:`stored_events`, with the current time and the index of the
+        next sample that will be stored in :attr:`buffer`.
+
+        Parameters
+        ----------
+        kind : str
+            Type of event (e.g. ``'power_range'``).
+        value : object, optional
+            Value associated to the event (e.g. the new power range).
+        '''
+        self.stored_events.append((len(self.buffer), self.instrument.clock.time(), kind, value))
 
     def read_auto_power_range(self):
         '''
@@ -439,7 +986,7 @@ class interface(abstract_instrument_interface.abstract_interface):
         '''
         self.logger.info(f"Reading the status of the auto-ranging function for the device {self.connected_device_name}...")   
         try:
-            auto_power_range = self.instrument.auto_power_range
+            auto_power_range = self.scheduler.call(getattr, self.instrument, 'auto_power_range')
             status_string = 'ON' if auto_power_range else 'OFF'
             self.sig_auto_power_range.emit(auto_power_range)
             self.logger.info(f"The auto-ranging function is currently set to {status_string}.")
@@ -450,23 +997,78 @@ class interface(abstract_instrument_interface.abstract_interface):
 
     def set_zero_powermeter(self):
         '''
-        Trigger the zeroing routine of the connected device via the driver's
-        :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.set_zero`. Logs success or
-        failure. During zeroing,
-        :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.being_zeroed` is set, which
-        causes :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.power` to return
-        ``(None, '')`` rather than querying the instrument.
-        '''
-        try: 
-            ID = self.instrument.set_zero()
-            self.logger.info(f"Zero-ing the device {self.connected_device_name}...")
-            if ID == 1:
-                self.logger.info(f"Device was successfully zeroed.")
-            else:
-                self.logger.error(f"An error occurred while zero-ing this device.")
+        Start the zeroing routine of the connected device, without waiting for its completion.
+
+        The routine is started via the driver's
+        :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.start_zero`, executed by :attr:`scheduler`
+        before any pending power reading. Its state is then polled every :attr:`ZERO_POLL_INTERVAL`
+        seconds (via :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.read_zero_state`), while the
+        acquisition goes on: readings acquired while the device is being zeroed are not available,
+        and are stored as ``NaN``. Once the routine is completed, a gap marker (a ``NaN`` sample, and a
+        ``'zero'`` event in :attr:`stored_events`, whose value is the duration of the zeroing in seconds)
+        is appended to the acquired data, and the readings resume automatically.
+
+        Since each interface has its own :attr:`scheduler`, zeroing one device does not slow down the
+        acquisition of the other devices.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future which receives the duration of the zeroing (in seconds) once it is completed, or the
+            exception raised while starting it or while waiting for it. It is cancelled if the device
+            is disconnected before the zeroing is completed.
+        '''
+        handle = Future()
+        if self._zeroing:
+            self.logger.error(f"The device {self.connected_device_name} is already being zeroed.")
+            handle.set_exception(RuntimeError("The device is already being zeroed."))
+            return handle
+        self.logger.info(f"Zero-ing the device {self.connected_device_name}...")
+        self._zeroing = {'time_start': None, 'handle': handle}
+        self.submit_command(self.instrument.start_zero, callback=functools.partial(self._on_zero_started, handle))
+        return handle
+
+    def _on_zero_started(self, handle, future):
+        if self._zeroing is None or self._zeroing['handle'] is not handle:   # The device was disconnected in the meanwhile
+            return
+        try:
+            future.result()
         except Exception as e:
-            self.logger.error(f"An error occurred while zero-ing this device: {e}")
-        return
+            self._finish_zero(e)
+            return
+        self._zeroing['time_start'] = self.instrument.clock.time()
+        QtCore.QTimer.singleShot(int(self.ZERO_POLL_INTERVAL*1e3), self._poll_zero_state)
+
+    def _poll_zero_state(self):
+        if self._zeroing:
+            self.submit_command(self.instrument.read_zero_state, key='zero_state', callback=self._on_zero_state_read)
+
+    def _on_zero_state_read(self, future):
+        if self._zeroing is None:   # The device was disconnected in the meanwhile
+            return
+        try:
+            running = future.result()
+        except Exception as e:
+            self._finish_zero(e)
+            return
+        if not running:
+            self._finish_zero()
+        elif self.instrument.clock.time() - self._zeroing['time_start'] > self.ZERO_TIMEOUT:
+            self._finish_zero(RuntimeError(f"The zeroing routine did not complete within {self.ZERO_TIMEOUT} s."))
+        else:
+            QtCore.QTimer.singleShot(int(self.ZERO_POLL_INTERVAL*1e3), self._poll_zero_state)
+
+    def _finish_zero(self, error=None):
+        (zeroing, self._zeroing) = (self._zeroing, None)
+        if error:
+            self.logger.error(f"An error occurred while zero-ing this device: {error}")
+            zeroing['handle'].set_exception(error)
+            return
+        duration = self.instrument.clock.time() - zeroing['time_start']
+        if self.continuous_read:
+            self.record_gap('zero', duration)
+        self.logger.info(f"Device was successfully zeroed ({duration:.2f} s).")
+        zeroing['handle'].set_result(duration)
 
     def start_reading(self):
         '''
@@ -474,9 +1076,10 @@ class interface(abstract_instrument_interface.abstract_interface):
 
         Sets :attr:`continuous_read` to ``True`` and emits :attr:`sig_reading` with
         :attr:`SIG_READING_START`, then calls :meth:`update` which reschedules itself
-        via ``QTimer.singleShot`` at the interval set by ``settings['refresh_time']``
+        via :attr:`read_timer` at the interval set by ``settings['refresh_time']``
         until :attr:`continuous_read` becomes ``False``. Has no effect if no device
-        is connected.
+        is connected. If the driver runs in a child process, the child process is asked
+        to start sampling at the same rate.
         '''
         if(self.instrument.connected == False):
             self.logger.error(f"No device is connected.")
@@ -485,6 +1088,8 @@ class interface(abstract_instrument_interface.abstract_interface):
         self.sig_reading.emit(self.SIG_READING_START) # This signal will be caught by the GUI
         self.continuous_read = True #Until this variable is set to True, the function UpdatePower will be repeated continuously 
         self.logger.info(f"Starting reading from device {self.connected_device_name}...")
+        if self.isolated:
+            self.scheduler.call(self.instrument.start_sampling, self.settings['refresh_time'])
         # Call the function self.update(), which will read the power, store it in a global variable, and then call itself continuously until the variable self.continuous_read is set to False
         self.update()
         return
@@ -499,6 +1104,9 @@ class interface(abstract_instrument_interface.abstract_interface):
         '''
         #Sets self.continuous_read to False (this will force the function update() to stop calling itself)
         self.continuous_read = False
+        self.read_timer.stop()
+        if self.isolated and self.instrument.sampling:
+            self.scheduler.call(self.instrument.stop_sampling)
         self.logger.info(f"Paused reading from device {self.connected_device_name}.")
         self.sig_reading.emit(self.SIG_READING_PAUSE) # This signal will be caught by the GUI
         return
@@ -507,13 +1115,26 @@ class interface(abstract_instrument_interface.abstract_interface):
         '''
         Stop continuous power acquisition and clear all accumulated data.
 
-        Sets :attr:`continuous_read` to ``False``, clears :attr:`stored_data`, calls
+        Sets :attr:`continuous_read` to ``False``, clears :attr:`buffer`, :attr:`stored_events` and
+        :attr:`capture_events` (and empties the pre-trigger buffer of :attr:`capture`), calls
         :meth:`update` once more to push an empty dataset to the plot (so the plot is
         visually cleared), then emits :attr:`sig_reading` with :attr:`SIG_READING_PAUSE`.
         '''
         #Sets self.continuous_read to False (this will force the function update() to stop calling itself) and delete all accumulated data
         self.continuous_read = False
-        self.stored_data = []
+        self.read_timer.stop()
+        if self.isolated and self.instrument.sampling:
+            self.scheduler.call(self.instrument.stop_sampling)
+            self.scheduler.call(self.instrument.read_block)    #Discard samples acquired in the meanwhile
+        self.buffer.clear()
+        self.pyramid.clear()
+        self.stored_events = []
+        self.capture_events = []
+        self.submit_command(self.pipeline.reset)
+        if self.capture:
+            self.capture.reset()
+        if self.checkpoint:
+            self.write_checkpoint()     # Records in the checkpoint file that the data were discarded
         self.update() #We call one more time the self.update() function to make sure plots is cleared. Since self.continuous_read is already set to False, update() will not acquire data anymore
         self.logger.info(f"Stopped reading from device {self.connected_device_name}. All stored data have been deleted.")
         self.sig_reading.emit(self.SIG_READING_PAUSE) # This signal will be caught by the GUI
@@ -522,37 +1143,761 @@ class interface(abstract_instrument_interface.abstract_interface):
         
     def update(self):
         '''
-        Read power from the device and reschedule itself.
+        Request a power reading and reschedule itself.
 
         If :attr:`continuous_read` is ``True``, this method:
 
-        1. Reads ``(power, units)`` from the instrument and stores the power value in
-           ``self.output['Power']`` and appends it to :attr:`stored_data`.
-        2. Calls ``super().update()`` (defined in
-           :class:`~abstract_instrument_interface.abstract_interface`), which fires any
-           configured trigger via :meth:`~abstract_instrument_interface.abstract_interface.send_trigger`.
-        3. Emits :attr:`sig_updated_data` with ``[power, units]`` (intercepted by the
-           GUI to update the power display and live plot).
-        4. Schedules another call to :meth:`update` after ``settings['refresh_time']``
-           seconds via ``QTimer.singleShot``.
+        1. Submits a reading to :attr:`scheduler`, with the lowest priority (so that commands
+           requested by the user are executed first). The reading returns ``(power, units)`` from
+           the instrument (or, if the driver runs in a child process, the block of all samples
+           acquired by the child process since the previous reading), which is then processed by
+           :meth:`prepare_block`, still in the thread of the scheduler. When it is done, the processed
+           readings are passed to :meth:`distribute_block`, in the main thread. A reading which is still waiting
+           to be executed when the next one is requested is dropped.
+        2. Schedules another call to :meth:`update` after ``settings['refresh_time']``
+           seconds via :attr:`read_timer`. If a call was already scheduled (e.g. because
+           :meth:`start_reading` was called while reading), it is replaced by this one, so
+           that a single acquisition loop is ever running.
 
         If :attr:`continuous_read` is ``False``, the method returns immediately without
         querying the instrument or rescheduling itself. It is still safe to call in this
         state (e.g. :meth:`stop_reading` calls it once to trigger a final plot refresh).
-        '''
-        if(self.continuous_read == True):
-            (currentPower,power_units) = self.instrument.power
-            self.output['Power'] = currentPower
-            self.power_units = power_units
-            self.stored_data.append(currentPower)
-            #self.output['PowerUnits'] = power_units
-
-            super().update()    
 
-            self.sig_updated_data.emit([currentPower, power_units])
-            QtCore.QTimer.singleShot(int(self.settings['refresh_time']*1e3), self.update)
+        Errors raised while reading are passed to :meth:`handle_acquisition_error`, which
+        decides whether the reading should be retried, skipped, or whether the connection
+        was lost.
+        '''
+        if(self.continuous_read == True and self.reconnecting == False):
+            self._submit_reading(retries_left = self.MAX_TIMEOUT_RETRIES)
+            self.read_timer.start(int(self.settings['refresh_time']*1e3))
            
         return
+
+    def _submit_reading(self, retries_left):
+        self.submit_command(self._read_new_samples, priority=PRIORITY_POLL, key='reading',
+                            callback=functools.partial(self._on_reading_done, retries_left))
+
+    def _read_new_samples(self):
+        # Executed by self.scheduler. The readings are also processed here, so that the processing does not slow down the GUI thread
+        if self.isolated:
+            (timestamps, values) = self.instrument.read_block()
+        else:
+            (currentPower,_) = self.instrument.power
+            (timestamps, values) = ([self.instrument.clock.time()], [currentPower])
+        # The wavelength is read in the same command as the readings, so that a wavelength change written just before is taken into account
+        return self.prepare_block(timestamps, values, wavelength=self.instrument.cached_state['wavelength'])
+
+    def _on_reading_done(self, retries_left, future):
+        if not(self.continuous_read) or self.reconnecting:
+            return
+        try:
+            block = future.result()
+        except Exception as e:
+            if self.handle_acquisition_error(e, retries_left = retries_left) and self.is_timeout(e):
+                self._submit_reading(retries_left - 1)
+            return
+        self._distribute_prepared_block(block)
+
+    def handle_acquisition_error(self, error, retries_left=0):
+        '''
+        Classify an error raised while reading from the device, and react accordingly.
+
+        * Timeouts (``VisaIOError`` with error code ``VI_ERROR_TMO``) are considered transient:
+          the reading is retried immediately, up to :attr:`MAX_TIMEOUT_RETRIES` times.
+        * Invalid answers (``ValueError``) are logged, and the reading is skipped (it is not retried).
+        * Any other error (or a timeout after all retries failed) is considered a loss of connection.
+          If ``settings['auto_reconnect']`` is ``True``, the interface starts trying to reconnect
+          to the same device (identified by its serial number), with an exponentially increasing
+          delay between attempts (see :meth:`attempt_reconnection`). Otherwise, the device is
+          disconnected.
+
+        Parameters
+        ----------
+        error : Exception
+            The error raised while reading.
+        retries_left : int, optional
+            Number of retries still available for the current reading. Default is 0.
+
+        Returns
+        -------
+        bool
+            ``True`` if the acquisition goes on (the reading should be retried if ``error`` is a timeout,
+            see :meth:`is_timeout`, and skipped otherwise), ``False`` if the acquisition was interrupted.
+        '''
+        if not self.instrument.connected:
+            return False
+        if self.is_timeout(error) and retries_left > 0:
+            self.logger.info(f"Timeout while reading from device {self.connected_device_name}, retrying...")
+            return True
+        if isinstance(error, ValueError):
+            self.logger.error(f"Invalid reading from device {self.connected_device_name}: {error}")
+            return True
+        self.logger.error(f"Connection to device {self.connected_device_name} lost: {error}")
+        if not self.settings['auto_reconnect']:
+            self.disconnect_device()
+            return False
+        state = self.instrument.cached_state
+        self._reconnection = {  'time_lost': self.instrument.clock.time(),
+                                'delay': self.RECONNECT_MIN_DELAY,
+                                'wavelength': state['wavelength'],
+                                'power_range': state['power_range'],
+                                'auto_power_range': self.settings['auto_power_range']}
+        self.read_timer.stop()
+        self.submit_command(self.instrument.disconnect_device)  # Errors are ignored, since the device is most likely gone
+        self.reconnecting = True
+        self.set_connecting_state()
+        QtCore.QTimer.singleShot(int(self._reconnection['delay']*1e3), self.attempt_reconnection)
+        return False
+
+    def is_timeout(self, error):
+        '''Return ``True`` if ``error`` is a VISA timeout (``VisaIOError`` with error code ``VI_ERROR_TMO``).'''
+        return isinstance(error, self.instrument._VisaIOError) and getattr(error, 'error_code', None) == self.VI_ERROR_TMO
+
+    def attempt_reconnection(self):
+        '''
+        Try to reconnect to the device whose connection was lost (see :meth:`handle_acquisition_error`).
+
+        The device is looked for by its serial number (third field of its identity), since its
+        address might have changed. On success, the wavelength and the power range used before
+        the connection was lost are restored, a gap marker (a ``NaN`` sample, and a ``'gap'`` event
+        in :attr:`stored_events`, whose value is the duration of the gap in seconds) is appended to
+        the acquired data, and the acquisition is resumed. On failure, a new attempt is scheduled
+        after twice the previous delay (up to :attr:`RECONNECT_MAX_DELAY` seconds).
+
+        The search, the connection and the restoring of the settings are executed by :attr:`scheduler`,
+        and this method returns immediately; the reconnection is completed (or a new attempt is
+        scheduled) once they are done.
+        '''
+        if not self.reconnecting:
+            return
+        idn_fields = self.connected_device_idn.split(',')
+        serial = idn_fields[2] if len(idn_fields) > 2 else self.connected_device_idn
+        self.submit_command(self._reconnect_device, serial, self._reconnection['wavelength'], self._reconnection['auto_power_range'],
+                            self._reconnection['power_range'], key='reconnection', callback=self._on_reconnection_attempt_done)
+
+    def _on_reconnection_attempt_done(self, future):
+        try:
+            (device_addr, restore_error) = future.result()
+        except Exception as e:
+            self.logger.error(f"An error occurred while reconnecting: {e}")
+            (device_addr, restore_error) = (None, None)
+        if not self.reconnecting:   # The reconnection was cancelled in the meanwhile
+            if device_addr is not None:
+                self.submit_command(self.instrument.disconnect_device)
+            return
+        if device_addr is None:
+            delay = self._reconnection['delay']
+            self._reconnection['delay'] = min(2*delay, self.RECONNECT_MAX_DELAY)
+            self.logger.info(f"Could not reconnect to device {self.connected_device_idn}. Next attempt in {self._reconnection['delay']} s.")
+            QtCore.QTimer.singleShot(int(self._reconnection['delay']*1e3), self.attempt_reconnection)
+            return
+        self.reconnecting = False
+        self.connected_device_name = device_addr
+        self.logger.info(f"Reconnected to device {self.connected_device_idn} at address {device_addr}.")
+        if restore_error:
+            self.logger.error(f"An error occurred while restoring the settings of the device: {restore_error}")
+        self.record_gap('gap', self.instrument.clock.time() - self._reconnection['time_lost'])
+        self.autorange.reset()
+        self.set_connected_state()
+
+    def _find_and_connect_device(self, serial):
+        # Executed by self.scheduler. Look for the device with the given serial number and connect to it. Returns its address, or None if the connection failed
+        for dev in self.instrument.list_devices():
+            dev_fields = dev[1].split(',')
+            if (dev_fields[2] if len(dev_fields) > 2 else dev[1]) == serial:
+                (Msg,ID) = self.instrument.connect_device(dev[0])
+                return dev[0] if ID == 1 else None
+        return None
+
+    def _reconnect_device(self, serial, wavelength, auto_power_range, power_range):
+        # Executed by self.scheduler. Look for the device with the given serial number, connect to it and restore its settings.
+        # Returns (address, error), where address is None if the connection failed, and error is the exception raised while restoring the settings (if any)
+        device_addr = self._find_and_connect_device(serial)
+        if device_addr is None:
+            return (None, None)
+        try:
+            self._restore_device_settings(wavelength, auto_power_range, power_range)
+        except Exception as e:
+            return (device_addr, e)
+        return (device_addr, None)
+
+    def _restore_device_settings(self, wavelength, auto_power_range, power_range):
+        # Executed by self.scheduler
+        if wavelength is not None:
+            self.instrument.wavelength = wavelength
+        if not(auto_power_range) and power_range is not None:
+            self.instrument.auto_power_range = False
+            self.instrument.power_range = power_range
+
+    def set_pipeline(self, config):
+        '''
+        Set the processing stages applied to each block of readings, before it is stored in
+        :attr:`buffer` and distributed (see :mod:`pyThorlabsPM100x.pipeline`), and store their
+        description in ``settings['pipeline']``.
+
+        Parameters
+        ----------
+        config : list of dict
+            Description of the stages, e.g. ``[{'stage': 'median', 'window': 5}, {'stage': 'decimate', 'factor': 10}]``
+            (see :meth:`~pyThorlabsPM100x.pipeline.Pipeline.from_config`). An empty list disables the processing.
+
+        Returns
+        -------
+        bool
+            ``True`` if the pipeline was set, ``False`` if ``config`` is not valid (in which case the
+            current pipeline is kept).
+
+        Notes
+        -----
+        All the consumers of the readings (buffer, plot, triggered capture, streaming server) receive
+        the processed readings, except the software auto-ranging, which is based on the readings
+        measured by the device (so that, e.g., a ``scale`` or ``threshold`` stage does not hide an overrange).
+        '''
+        try:
+            pipeline = Pipeline.from_config(config)
+        except (ValueError, TypeError) as e:
+            self.logger.error(f"Invalid processing pipeline: {e}")
+            return False
+        self.pipeline = pipeline    # The pipeline in use is replaced at once, so this is safe even while a block is being processed
+        self.settings['pipeline'] = pipeline.config
+        if pipeline.stages:
+            self.logger.info("Processing pipeline set to: " + " -> ".join(stage.name for stage in pipeline.stages))
+        return True
+
+    def set_calibration(self, path):
+        '''
+        Load a table of wavelength-dependent correction factors (see
+        :mod:`pyThorlabsPM100x.calibration`), and apply it to all the following readings, and store
+        its path in ``settings['calibration_file']``. The change is recorded in :attr:`stored_events`
+        as a ``'calibration'`` event, whose value is the path of the table (or ``None``).
+
+        Each reading is multiplied by the factor of the table at the current wavelength. The
+        readings before the correction are also stored in :attr:`buffer` (see :attr:`stored_raw_data`).
+
+        Parameters
+        ----------
+        path : str or None
+            Path of the calibration file. ``None`` or an empty string disables the correction.
+
+        Returns
+        -------
+        bool
+            ``True`` if the calibration was set, ``False`` if the file could not be loaded (in which
+            case the current calibration is kept).
+
+        Notes
+        -----
+        The wavelength correction of the console itself (``SENS:CORR:WAV``) is not affected: the
+        table only corrects for the rest of the setup (e.g. fiber coupling, beam splitters).
+        '''
+        if not path:
+            calibration = None
+        else:
+            try:
+                calibration = CalibrationTable.load(path)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Could not load the calibration file {path}: {e}")
+                return False
+        self.calibration = calibration  # Replaced at once, so this is safe even while a block is being processed
+        self.settings['calibration_file'] = path or ''
+        self.record_event('calibration', path or None)
+        if calibration is None:
+            self.logger.info("Calibration disabled.")
+            return True
+        self.logger.info(f"Calibration loaded from the file {path} ({len(calibration.wavelengths)} wavelengths "
+                         f"between {calibration.wavelengths[0]:g} and {calibration.wavelengths[-1]:g} nm).")
+        wavelength = getattr(self, 'wavelength', None)
+        if wavelength is not None and not calibration.covers(wavelength):
+            self.logger.warning(f"The current wavelength ({wavelength} nm) is outside the range of the calibration table.")
+        return True
+
+    def prepare_block(self, timestamps, values, wavelength=None):
+        '''
+        Convert a block of readings to watts (if the device is set to different units), pass it
+        through :attr:`pipeline`, and correct it with :attr:`calibration` (if any) at the current
+        wavelength. Readings which are not available (e.g. acquired while the device was being
+        zeroed) are converted to ``NaN``.
+
+        This method only uses NumPy and does not touch any Qt object, so it can be (and, during the
+        acquisition, is) executed by the thread of :attr:`scheduler`.
+
+        Parameters
+        ----------
+        timestamps : array_like of float
+            Acquisition time of each reading, in seconds since the epoch.
+        values : array_like of float
+            Power values, in the units of the device.
+        wavelength : float, optional
+            Wavelength (in nm) at which the readings were acquired, used by the calibration. Default
+            is ``None``, i.e. the wavelength currently set in the driver
+            (``instrument.cached_state['wavelength']``).
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray or None, numpy.ndarray)
+            Timestamps, processed values (in W), processed values before the calibration (``None``
+            if no calibration is set), and values measured by the device (in W, before the pipeline
+            and the calibration, used by the software auto-ranging). The length of the first three
+            can differ from the input one (e.g. if the pipeline contains a decimation stage).
+        '''
+        timestamps = np.asarray(timestamps, dtype=float).ravel()
+        values = np.asarray(values, dtype=float).ravel()
+        if self.instrument_power_units != 'W':
+            values = pyThorlabsPM100x.units.to_watts(values, self.instrument_power_units)
+        measured_values = values
+        (timestamps, values) = self.pipeline.process(timestamps, values)
+        calibration = self.calibration
+        if calibration is None:
+            return timestamps, values, None, measured_values
+        if wavelength is None:
+            wavelength = self.instrument.cached_state['wavelength']
+        return timestamps, calibration.apply(values, wavelength), values, measured_values
+
+    def process_block(self, timestamps, values):
+        '''
+        Process a block of new readings (see :meth:`prepare_block`), then store and distribute
+        the result (see :meth:`distribute_block`).
+
+        Parameters
+        ----------
+        timestamps : array_like of float
+            Acquisition time of each reading, in seconds since the epoch.
+        values : array_like of float
+            Power values, in the units of the device.
+        '''
+        self._distribute_prepared_block(self.prepare_block(timestamps, values))
+
+    def _distribute_prepared_block(self, block):
+        # Distribute a block returned by self.prepare_block()
+        (timestamps, values, raw_values, measured_values) = block
+        if len(values) > 0:
+            self.distribute_block(timestamps, values, raw_values, measured_values)
+        elif self.settings['software_auto_power_range'] and len(measured_values) > 0:
+            self.check_software_auto_power_range(measured_values)   # All readings were dropped by the pipeline, but the power range must still follow them
+
+    def distribute_block(self, timestamps, values, raw_values=None, measured_values=None):
+        '''
+        Store and distribute a block of readings already processed by :meth:`prepare_block`.
+
+        This method:
+
+        1. Appends the readings (and the raw readings, if given) to :attr:`buffer` (unless the
+           triggered capture is on and :attr:`keep_continuous_data` is ``False``), and stores the
+           most recent power value in ``self.output['Power']``.
+        2. If the triggered capture is on, passes the readings to :attr:`capture`. Each completed
+           capture is appended to :attr:`capture_events` (and to the file of :attr:`capture`, if any),
+           recorded in :attr:`stored_events` as a ``'capture'`` event, and emitted via :attr:`sig_capture_event`.
+        3. If the software auto-ranging is enabled, checks whether the power range needs to
+           be changed (see :meth:`check_software_auto_power_range`), based on the readings measured
+           by the device (before the pipeline and the calibration).
+        4. If a streaming server is running, sends the readings to all its clients.
+        5. Calls ``super().update()`` (defined in
+           :class:`~abstract_instrument_interface.abstract_interface`), which fires any
+           configured trigger via :meth:`~abstract_instrument_interface.abstract_interface.send_trigger`.
+        6. Emits :attr:`sig_updated_data` with ``[power, units]``, where ``power`` is the most
+           recent reading (intercepted by the GUI to update the power display and live plot).
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            Acquisition time of each reading, in seconds since the epoch.
+        values : numpy.ndarray
+            Power values, in W (not empty).
+        raw_values : numpy.ndarray, optional
+            Power values before the calibration, in W. Default is ``None`` (no calibration).
+        measured_values : numpy.ndarray, optional
+            Power values measured by the device, in W, before the pipeline and the calibration (their
+            length can differ from the one of ``values``). Default is ``None``, in which case
+            ``raw_values`` (or ``values``) are used.
+        '''
+        if self.keep_continuous_data or not(self.capture):
+            self.buffer.append(timestamps, values, raw_values)
+            self.pyramid.update()
+        if self.capture:
+            for event in self.capture.process(timestamps, values):
+                self.capture_events.append(event)
+                try:
+                    self.capture.save(event)
+                except OSError as e:
+                    self.logger.error(f"Could not save the capture to {self.capture.path}: {e}")
+                self.record_event('capture', event.trigger_time)
+                self.sig_capture_event.emit(event)
+        if self.settings['software_auto_power_range']:
+            if measured_values is None:
+                measured_values = values if raw_values is None else raw_values
+            self.check_software_auto_power_range(measured_values)   # The power range applies to the power measured by the device, not to the processed one
+        currentPower = float(values[-1])
+        self.output['Power'] = currentPower
+        #self.output['PowerUnits'] = power_units
+        if self.stream_server:
+            valid = ~np.isnan(values)
+            self.stream_server.publish(timestamps[valid], values[valid])
+
+        super().update()    
+
+        self.sig_updated_data.emit([currentPower, self.power_units])
+
+    def start_triggered_capture(self, condition='level', threshold=None, low=None, high=None, slope='either',
+                                pre_samples=100, post_samples=100, keep_continuous_data=True, path=None):
+        '''
+        Start the triggered capture. While the acquisition is running, the readings are checked
+        against a trigger condition, and each time the condition is met the ``pre_samples``
+        readings before the trigger and the ``post_samples`` readings after it are stored in
+        :attr:`capture_events` (see :class:`~pyThorlabsPM100x.capture.TriggeredCapture`). If ``path``
+        is specified, each capture is also appended to that file as soon as it is completed, so that
+        the captures are not lost if the program is closed or crashes.
+
+        Parameters
+        ----------
+        condition : str, optional
+            ``'level'``, ``'slope'`` or ``'window'``. Default is ``'level'``.
+        threshold : float, optional
+            Power level (in W) for the ``'level'`` condition, or power derivative (in W/s) for the
+            ``'slope'`` condition.
+        low, high : float, optional
+            Bounds (in W) of the ``'window'`` condition: the capture is triggered when the power
+            leaves the interval ``[low, high]``.
+        slope : str, optional
+            ``'rising'``, ``'falling'`` or ``'either'``. Default is ``'either'``.
+        pre_samples : int, optional
+            Number of readings stored before each trigger. Default is 100.
+        post_samples : int, optional
+            Number of readings stored after each trigger. Default is 100.
+        keep_continuous_data : bool, optional
+            If ``False``, the readings are not stored in :attr:`buffer` while the triggered capture
+            is on, so that memory usage scales with the number of captures rather than with the
+            duration of the acquisition. Default is ``True``.
+        path : str, optional
+            File to which the captures are appended, one JSON object per line (they can be read
+            back with :func:`~pyThorlabsPM100x.capture.load_captures`). Default is ``None`` (the
+            captures are only kept in memory).
+
+        Returns
+        -------
+        bool
+            ``True`` if the triggered capture was started, ``False`` if the parameters are not valid
+            or ``path`` cannot be written.
+        '''
+        try:
+            capture = TriggeredCapture(condition=condition, threshold=threshold, low=low, high=high, slope=slope,
+                                       pre_samples=pre_samples, post_samples=post_samples, path=path)
+        except (ValueError, OSError) as e:
+            self.logger.error(f"Could not start the triggered capture: {e}")
+            return False
+        self.capture = capture
+        self.keep_continuous_data = bool(keep_continuous_data)
+        self.logger.info(f"Triggered capture started (condition: {condition}).")
+        return True
+
+    def stop_triggered_capture(self):
+        '''
+        Stop the triggered capture. Captures already completed are kept in :attr:`capture_events`,
+        while a capture in progress is discarded. Readings are stored again in :attr:`buffer`.
+        '''
+        if self.capture is None:
+            return
+        self.capture = None
+        self.keep_continuous_data = True
+        self.logger.info(f"Triggered capture stopped.")
+
+    def set_display_units(self, units):
+        '''
+        Set the units used to display (and export) the acquired power. Data are always acquired
+        and stored in watts, so changing the display units does not require any communication
+        with the device.
+
+        Parameters
+        ----------
+        units : str
+            One of :data:`pyThorlabsPM100x.units.UNITS`.
+
+        Returns
+        -------
+        bool
+            ``True`` if the units were accepted, ``False`` otherwise.
+        '''
+        try:
+            units = pyThorlabsPM100x.units.normalize_units(units)
+        except ValueError as e:
+            self.logger.error(f"{e}")
+            self.sig_display_units.emit(self.settings['display_units'])
+            return False
+        self.settings['display_units'] = units
+        self.sig_display_units.emit(units)
+        return True
+
+    def convert_to_display_units(self, values):
+        '''
+        Convert power values (in watts) to the display units set in ``settings['display_units']``.
+
+        Parameters
+        ----------
+        values : float or array_like of float
+            Power values, in watts.
+
+        Returns
+        -------
+        numpy.ndarray
+            The power values in the display units.
+        '''
+        return pyThorlabsPM100x.units.from_watts(values, self.settings['display_units'])
+
+    def start_streaming_server(self, address=('127.0.0.1', 0), queue_size=256):
+        '''
+        Start a :class:`~pyThorlabsPM100x.streaming.StreamServer`, which sends every power
+        reading acquired by :meth:`update` to all clients connected to it, and accepts commands
+        (wavelength, power range, auto power range, zero) from them.
+
+        Parameters
+        ----------
+        address : (str, int) or str, optional
+            Either a ``(host, port)`` tuple for a TCP server, or a filesystem path for a Unix
+            domain socket. Default is ``('127.0.0.1', 0)``, i.e. a TCP server on localhost on a
+            port chosen by the operating system.
+        queue_size : int, optional
+            Maximum number of frames queued for each client. When a client is too slow, its
+            oldest frames are discarded. Default is 256.
+
+        Returns
+        -------
+        (str, int) or str or None
+            The address the server is listening on, or ``None`` if the server could not be started.
+        '''
+        if self.stream_server:
+            self.logger.error(f"A streaming server is already running at {self.stream_server.address}.")
+            return self.stream_server.address
+        try:
+            self.stream_server = StreamServer(address=address, queue_size=queue_size, command_handler=self._on_stream_command_received)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"An error occurred while starting the streaming server: {e}")
+            return None
+        self.logger.info(f"Streaming server listening at {self.stream_server.address}.")
+        return self.stream_server.address
+
+    def stop_streaming_server(self):
+        '''
+        Stop the streaming server started by :meth:`start_streaming_server` and disconnect all its clients.
+        '''
+        if not self.stream_server:
+            self.logger.error(f"No streaming server is running.")
+            return
+        self.stream_server.close()
+        self.logger.info(f"Streaming server at {self.stream_server.address} stopped.")
+        self.stream_server = None
+
+    def export_data(self, path, units=None):
+        '''
+        Export all acquired data (and events) to a file, on a background thread.
+
+        The data are not copied: the export thread receives views of :attr:`buffer`, which keep
+        showing the data acquired up to the call of this method even while the acquisition
+        continues (see :class:`~pyThorlabsPM100x.buffer.AcquisitionBuffer`). The progress is
+        reported via :attr:`sig_export_progress`, and the end of the export via
+        :attr:`sig_export_finished`. The format (CSV, NPY or NPZ) is chosen from the extension of
+        ``path`` (see :func:`pyThorlabsPM100x.export.export_data`).
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to create.
+        units : str, optional
+            Units of the exported powers. Default is ``settings['display_units']``.
+
+        Returns
+        -------
+        bool
+            ``True`` if the export was started, ``False`` if the format or the units are not
+            valid, or if another export is still running.
+        '''
+        units = units or self.settings['display_units']
+        try:
+            pyThorlabsPM100x.export.export_format(path)
+            pyThorlabsPM100x.units.normalize_units(units)
+        except ValueError as e:
+            self.logger.error(f"Could not export data: {e}")
+            return False
+        if self.export_thread and self.export_thread.is_alive():
+            self.logger.error(f"Could not export data: another export is in progress.")
+            return False
+        (timestamps, values, events) = (self.buffer.timestamps, self.buffer.values, list(self.stored_events))
+        raw_values = self.buffer.raw_values if self.buffer.has_raw_values else None
+        self.logger.info(f"Exporting {len(values)} data points to the file {path}...")
+        self.export_thread = threading.Thread(target=self._export_data_worker, args=(path, timestamps, values, units, events, raw_values), daemon=True)
+        self.export_thread.start()
+        return True
+
+    def _export_data_worker(self, path, timestamps, values, units, events, raw_values):
+        # Runs in self.export_thread
+        try:
+            pyThorlabsPM100x.export.export_data(path, timestamps, values, units=units, events=events, progress=self.sig_export_progress.emit,
+                                                raw_values=raw_values)
+        except Exception as e:
+            self.logger.error(f"An error occurred while exporting data to the file {path}: {e}")
+            self.sig_export_finished.emit(path, str(e))
+            return
+        self.logger.info(f"Data exported to the file {path}.")
+        self.sig_export_finished.emit(path, '')
+
+    def start_checkpointing(self, path, resume=False):
+        '''
+        Start saving the session (acquired data, events and settings) to a checkpoint file, every
+        ``settings['checkpoint_time']`` seconds. Each checkpoint only appends the data acquired since
+        the previous one, so its cost does not grow with the length of the session (see
+        :class:`~pyThorlabsPM100x.checkpoint.SessionCheckpoint`). A saved session can be reloaded
+        with :meth:`resume_session`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the checkpoint file. It is overwritten, unless ``resume`` is ``True``.
+        resume : bool, optional
+            Used internally by :meth:`resume_session`. Default is ``False``.
+
+        Returns
+        -------
+        bool
+            ``True`` if checkpointing was started, ``False`` if the file could not be opened.
+        '''
+        if self.checkpoint:
+            self.stop_checkpointing()
+        try:
+            self.checkpoint = SessionCheckpoint(path, resume=resume)
+        except OSError as e:
+            self.logger.error(f"Could not open the checkpoint file {path}: {e}")
+            return False
+        self.logger.info(f"Saving the session to the checkpoint file {path} every {self.settings['checkpoint_time']} s.")
+        self.write_checkpoint()
+        self.checkpoint_timer.start(int(self.settings['checkpoint_time']*1e3))
+        return True
+
+    def write_checkpoint(self):
+        '''
+        Append to the checkpoint file the data and events acquired since the last checkpoint, and the
+        current settings if they changed. Called periodically by :attr:`checkpoint_timer`.
+        '''
+        if not self.checkpoint:
+            return
+        try:
+            self.checkpoint.write(self.buffer, self.stored_events, self.settings)
+        except OSError as e:
+            self.logger.error(f"An error occurred while writing the checkpoint file {self.checkpoint.path}: {e}")
+
+    def stop_checkpointing(self):
+        '''Write a last checkpoint, and stop saving the session.'''
+        if not self.checkpoint:
+            return
+        self.checkpoint_timer.stop()
+        self.write_checkpoint()
+        self.checkpoint.close()
+        self.logger.info(f"Stopped saving the session to the checkpoint file {self.checkpoint.path}.")
+        self.checkpoint = None
+
+    def resume_session(self, path):
+        '''
+        Reload a session saved by :meth:`start_checkpointing` (e.g. after a crash), and keep saving
+        it to the same file.
+
+        The acquired data and events replace those currently stored in :attr:`buffer` and
+        :attr:`stored_events`, and the saved settings are applied. When the reading is started again,
+        new data are appended to the reloaded ones. An incomplete checkpoint at the end of the file
+        (left by a crash) is discarded.
+
+        Parameters
+        ----------
+        path : str
+            Path of the checkpoint file.
+
+        Returns
+        -------
+        bool
+            ``True`` if the session was reloaded, ``False`` otherwise (e.g. if data are being acquired,
+            or the file cannot be read).
+        '''
+        if self.continuous_read:
+            self.logger.error(f"Cannot resume a session while reading data. Pause or stop the reading first.")
+            return False
+        try:
+            session = load_session(path)
+        except OSError as e:
+            self.logger.error(f"Could not read the checkpoint file {path}: {e}")
+            return False
+        if self.checkpoint:
+            self.stop_checkpointing()
+        self.buffer.clear()
+        self.buffer.append(session['timestamps'], session['values'], session['raw_values'])
+        self.pyramid.clear()
+        self.pyramid.update()
+        self.stored_events = session['events']
+        if session['settings']:
+            settings = {key: value for (key, value) in session['settings'].items() if key in self.settings}
+            # The pipeline and the calibration are applied via their own methods, which only update the settings if they succeed
+            (pipeline, calibration_file) = (settings.pop('pipeline', None), settings.pop('calibration_file', None))
+            self.settings.update(settings)
+            self.set_display_units(self.settings['display_units'])
+            self.sig_refreshtime.emit(self.settings['refresh_time'])
+            if pipeline is not None:
+                self.set_pipeline(pipeline)
+            if calibration_file is not None and calibration_file != self.settings['calibration_file']:
+                self.set_calibration(calibration_file)
+        self.logger.info(f"Reloaded {len(self.buffer)} data points and {len(self.stored_events)} events from the checkpoint file {path}.")
+        if len(self.buffer) > 0:
+            self.sig_updated_data.emit([float(self.buffer.values[-1]), self.power_units])
+        return self.start_checkpointing(path, resume=True)
+
+    def _on_stream_command_received(self, name, argument):
+        # This method is called by a thread of the streaming server. The command is forwarded to the main thread
+        # (via the signal sig_stream_command) and executed there by execute_stream_command, while this thread waits for the result.
+        # If the command is not executed after STREAM_COMMAND_TIMEOUT seconds (e.g. because the device is busy), it stays queued,
+        # and the client is told that it is pending. request['error'] is only read once request['done'] is set by the main thread
+        request = {'name': name, 'argument': argument, 'error': None, 'done': threading.Event()}
+        self.sig_stream_command.emit(request)
+        if not request['done'].wait(self.STREAM_COMMAND_TIMEOUT):
+            return PENDING
+        return request['error']
+
+    def execute_stream_command(self, request):
+        '''
+        Event slot connected to :attr:`sig_stream_command`. Execute a command received by the
+        streaming server, and store the outcome in ``request['error']`` (``None`` on success,
+        an error message otherwise). Since commands are executed by :attr:`scheduler`,
+        ``request['done']`` is set only after all the commands submitted so far with the same priority
+        have been executed.
+
+        Parameters
+        ----------
+        request : dict
+            Dictionary with keys ``'name'`` and ``'argument'`` (see
+            :func:`~pyThorlabsPM100x.streaming.parse_command`), ``'error'`` and ``'done'``
+            (a ``threading.Event`` which is set once the command has been executed).
+        '''
+        name, argument = request['name'], request['argument']
+        error = None
+        self.logger.info(f"Received command {name} {'' if argument is None else argument} from a client of the streaming server.")
+        if not self.instrument.connected:
+            error = "No device is connected."
+        elif name == 'WAV':
+            if not self.set_wavelength(argument):
+                error = "Invalid wavelength."
+        elif name == 'RANGE' and type(argument) == int:     # RANGE UP or RANGE DOWN
+            self.change_power_range(argument)
+        elif name == 'RANGE':
+            if not self.set_power_range(argument):
+                error = "Invalid power range."
+        elif name == 'AUTO':
+            self.set_auto_power_range(argument)
+        elif name == 'ZERO':
+            self.set_zero_powermeter()
+        request['error'] = error
+        if error:
+            request['done'].set()
+        else:
+            self.submit_command(lambda: None, callback=functools.partial(self._on_stream_command_done, request))
+
+    def _on_stream_command_done(self, request, future):
+        # Called once the commands submitted by self.execute_stream_command (and the callbacks of these commands) have been executed
+        if request['name'] == 'AUTO' and self.settings['auto_power_range'] != request['argument']:
+            request['error'] = "Could not change the auto power range setting."
+        request['done'].set()
     
     
 class gui(abstract_instrument_interface.abstract_gui):
@@ -573,6 +1918,23 @@ class gui(abstract_instrument_interface.abstract_gui):
     plot_object : PlotObject or None
         The :class:`~pyThorlabsPM100x.plots.PlotObject` instance used for live
         plotting, or ``None`` if ``plot=False``.
+    plot_watcher : VisibilityWatcher or None
+        The :class:`~pyThorlabsPM100x.plots.VisibilityWatcher` of :attr:`plot_window`. The plot is
+        only updated while the window is visible, and redrawn as soon as it is shown again.
+    display_timer : QtCore.QTimer
+        Single-shot timer which renders the most recent reading (see :meth:`render_data`), when
+        readings arrive faster than ``interface.settings['display_refresh_time']``.
+    analysis_window : Qt.QWidget or None
+        Floating widget that contains the analysis panel (spectrum and histogram of the most
+        recent readings). Created the first time the "Analysis" button is pressed.
+    analysis_object : AnalysisPlotObject or None
+        The :class:`~pyThorlabsPM100x.plots.AnalysisPlotObject` shown in :attr:`analysis_window`.
+    analyzer : NoiseAnalyzer or None
+        The :class:`~pyThorlabsPM100x.analysis.NoiseAnalyzer` which computes the content of the
+        analysis panel on a worker thread.
+    analysis_timer : QtCore.QTimer or None
+        Timer which requests a new analysis every ``interface.settings['analysis_refresh_time']``
+        seconds, while the analysis panel is visible.
     widgets_enabled_when_connected : list of Qt.QWidget
         Widgets enabled only while a device is connected (zero button, wavelength
         edit, power range controls, start/stop buttons).
@@ -597,6 +1959,17 @@ class gui(abstract_instrument_interface.abstract_gui):
         super().__init__(interface,parent)
         self.plot_window = None # QWidget object of the widget (i.e. floating window) that will contain the plot
         self.plot_object = None # PlotObject object of the plot where self.store_powers is plotted
+        self.analysis_window = None # QWidget object of the floating window that will contain the analysis panel (created when needed)
+        self.analysis_object = None
+        self.analyzer = None
+        self.analysis_timer = None
+        self.plot_watcher = None
+        self._display_data = None   # Most recent data received by self.on_data_change() and not rendered yet
+        self._last_render = 0       # Time (time.monotonic()) of the last call to self.render_data()
+        self._plot_outdated = False # True if the plot was not updated because its window was hidden
+        self.display_timer = QtCore.QTimer()
+        self.display_timer.setSingleShot(True)
+        self.display_timer.timeout.connect(self.render_data)
 
         if plot:        # Create a plot object
             self.create_plot() 
@@ -632,11 +2005,16 @@ class gui(abstract_instrument_interface.abstract_gui):
         self.interface.sig_wavelength.connect(self.on_wavelength_change)
         self.interface.sig_min_max_wavelength.connect(self.on_min_max_wavelength_update)
         self.interface.sig_auto_power_range.connect(self.on_auto_power_range_change)
+        self.interface.sig_software_auto_power_range.connect(self.on_software_auto_power_range_change)
+        self.interface.sig_display_units.connect(self.on_display_units_change)
         self.interface.sig_power_range.connect(self.on_power_range_change)
+        self.interface.sig_export_progress.connect(self.on_export_progress)
+        self.interface.sig_export_finished.connect(self.on_export_finished)
         self.interface.sig_close.connect(self.on_close)
 
         ### SET INITIAL STATE OF WIDGETS
         self.edit_RefreshTime.setText(f"{self.interface.settings['refresh_time']:.3f}")
+        self.on_display_units_change(self.interface.settings['display_units'])
         self.interface.send_list_devices()  
         self.on_connection_status_change(self.interface.SIG_DISCONNECTED) #When GUI is created, all widgets are set to the "Disconnected" state              
         ###
@@ -674,12 +2052,19 @@ class gui(abstract_instrument_interface.abstract_gui):
         self.edit_Power.setFont(font)
         self.edit_Power.setAlignment(QtCore.Qt.AlignRight)
         self.edit_Power.setReadOnly(True)
+        self.combo_PowerUnits = Qt.QComboBox()
+        self.combo_PowerUnits.addItems(pyThorlabsPM100x.units.UNITS)
+        self.combo_PowerUnits.setToolTip('Units used to display the power. Data are always acquired in W.')
         #self.edit_Power.setMaximumWidth(150)    
         self.button_SetZeroPowermeter = Qt.QPushButton("Set Zero")  
         self.button_ShowHidePlot = Qt.QPushButton("Show/Hide Plot")
         self.button_ShowHidePlot.setToolTip('Show/Hide Plot.')
+        self.button_ShowHideAnalysis = Qt.QPushButton("Analysis")
+        self.button_ShowHideAnalysis.setToolTip('Show/Hide the spectrum and the histogram of the most recent readings.')
+        self.button_ExportData = Qt.QPushButton("Export")
+        self.button_ExportData.setToolTip('Export all acquired data to a CSV, NPY or NPZ file, in the current display units.')
 
-        widgets_row2 = [self.button_StartPauseReading,self.button_StopReading,self.button_SetZeroPowermeter,self.label_RefreshTime,self.edit_RefreshTime,self.label_Power,self.edit_Power,self.button_ShowHidePlot]
+        widgets_row2 = [self.button_StartPauseReading,self.button_StopReading,self.button_SetZeroPowermeter,self.label_RefreshTime,self.edit_RefreshTime,self.label_Power,self.edit_Power,self.combo_PowerUnits,self.button_ShowHidePlot,self.button_ShowHideAnalysis,self.button_ExportData]
         widgets_row2_stretches = [0]*len(widgets_row2)
         for w,s in zip(widgets_row2,widgets_row2_stretches):
             hbox2.addWidget(w,stretch=s)
@@ -687,6 +2072,7 @@ class gui(abstract_instrument_interface.abstract_gui):
 
         if not self.plot_object:
             self.button_ShowHidePlot.hide()
+            self.button_ShowHideAnalysis.hide()
             self.button_StopReading.hide()
 
         hbox3 = Qt.QHBoxLayout()
@@ -709,8 +2095,10 @@ class gui(abstract_instrument_interface.abstract_gui):
         self.button_IncreasePowerRange.setMaximumWidth(25)
         self.box_PowerRangeAuto = Qt.QCheckBox("Auto")
         self.box_PowerRangeAuto.setToolTip('Set the power range of the powermeter to Automatic.')
+        self.box_PowerRangeSoftwareAuto = Qt.QCheckBox("Auto (SW)")
+        self.box_PowerRangeSoftwareAuto.setToolTip('Let this software change the power range automatically, before the powermeter saturates.')
         widgets_row3 = [self.label_Wavelength,self.edit_Wavelength,self.label_WavelengthUnits,self.label_PowerRange,
-                        self.button_DecreasePowerRange,self.edit_PowerRange,self.button_IncreasePowerRange,self.box_PowerRangeAuto]
+                        self.button_DecreasePowerRange,self.edit_PowerRange,self.button_IncreasePowerRange,self.box_PowerRangeAuto,self.box_PowerRangeSoftwareAuto]
         widgets_row3_stretches = [0]*len(widgets_row3)
         for w,s in zip(widgets_row3,widgets_row3_stretches):
             hbox3.addWidget(w,stretch=s)
@@ -721,11 +2109,11 @@ class gui(abstract_instrument_interface.abstract_gui):
         self.container.addStretch(1)
 
         # Widgets for which we want to constraint the width by using sizeHint()
-        widget_list = [self.button_StopReading,self.label_RefreshTime,self.label_Power,self.button_SetZeroPowermeter,self.label_WavelengthUnits,self.label_PowerRange,self.box_PowerRangeAuto]
+        widget_list = [self.button_StopReading,self.label_RefreshTime,self.label_Power,self.button_SetZeroPowermeter,self.label_WavelengthUnits,self.label_PowerRange,self.box_PowerRangeAuto,self.box_PowerRangeSoftwareAuto]
         for w in widget_list:
             w.setMaximumSize(w.sizeHint())
 
-        self.widgets_enabled_when_connected = [self.button_SetZeroPowermeter,self.edit_Wavelength,self.edit_PowerRange,self.box_PowerRangeAuto, 
+        self.widgets_enabled_when_connected = [self.button_SetZeroPowermeter,self.edit_Wavelength,self.edit_PowerRange,self.box_PowerRangeAuto,self.box_PowerRangeSoftwareAuto, 
                                                self.button_IncreasePowerRange,self.button_DecreasePowerRange,self.button_StartPauseReading,self.button_StopReading]
         self.widgets_enabled_when_disconnected = [self.combo_Devices,self.button_RefreshDeviceList]
 
@@ -741,12 +2129,16 @@ class gui(abstract_instrument_interface.abstract_gui):
         self.button_DecreasePowerRange.clicked.connect(lambda x:self.click_button_change_power_range(-1))
         self.button_IncreasePowerRange.clicked.connect(lambda x:self.click_button_change_power_range(+1))
         self.box_PowerRangeAuto.stateChanged.connect(self.click_box_PowerRangeAuto)
+        self.box_PowerRangeSoftwareAuto.stateChanged.connect(self.click_box_PowerRangeSoftwareAuto)
         self.button_StartPauseReading.clicked.connect(self.click_button_StartPauseReading)
         self.button_StopReading.clicked.connect(self.click_button_StopReading)
         self.edit_RefreshTime.returnPressed.connect(self.press_enter_refresh_time)
+        self.combo_PowerUnits.currentTextChanged.connect(self.change_combo_PowerUnits)
+        self.button_ExportData.clicked.connect(self.click_button_ExportData)
 
         if self.plot_object:
             self.button_ShowHidePlot.clicked.connect(self.click_button_ShowHidePlot)
+            self.button_ShowHideAnalysis.clicked.connect(self.click_button_ShowHideAnalysis)
 
 ###########################################################################################################
 ### Event Slots. They are normally triggered by signals from the model, and change the GUI accordingly  ###
@@ -773,6 +2165,8 @@ class gui(abstract_instrument_interface.abstract_gui):
             self.edit_Wavelength.setText('')
             self.label_Wavelength.setText(f"Wavelength: ")
             self.button_ConnectDevice.setText("Connect")
+            self.display_timer.stop()
+            self._display_data = None
             self.edit_Power.setText('')
         if status == self.interface.SIG_DISCONNECTING:
             self.disable_widget(self.widgets_enabled_when_connected)
@@ -788,7 +2182,7 @@ class gui(abstract_instrument_interface.abstract_gui):
             self.button_ConnectDevice.setText("Disconnect")
             #If a self.plot_object was created, update window title with powermeter name and vertical axis of plot with current Power units
             if self.plot_object: 
-                self.plot_object.graphWidget.setLabel("left", f"Power [{self.interface.power_units}]")
+                self.plot_object.graphWidget.setLabel("left", f"Power [{self.interface.settings['display_units']}]")
                 self.plot_window.setWindowTitle(f"Powermeter: {self.interface.connected_device_name}")
 
     def on_reading_status_change(self,status):
@@ -815,33 +2209,101 @@ class gui(abstract_instrument_interface.abstract_gui):
         Event slot connected to :attr:`interface.sig_list_devices_updated`.
 
         Clears and repopulates the device combo box with the new list of device strings.
+        The currently selected device stays selected, if it is still in the list.
 
         Parameters
         ----------
         list_devices : list of str
             Device name strings in the format ``"<idn> --> <address>"``.
         '''
+        current_device = self.combo_Devices.currentText()
         self.combo_Devices.clear()  #First we empty the combobox  
         self.combo_Devices.addItems(list_devices) 
+        if current_device in list_devices:
+            self.combo_Devices.setCurrentText(current_device)
 
     def on_data_change(self,data):
         '''
         Event slot connected to :attr:`interface.sig_updated_data`.
 
-        Updates the power display text box and, if a plot exists, updates the live
-        plot with the full contents of :attr:`interface.stored_data`.
+        The data are rendered (see :meth:`render_data`) at most once every
+        ``interface.settings['display_refresh_time']`` seconds: if the previous rendering is more
+        recent, only the most recent data are rendered when :attr:`display_timer` expires, and
+        the data received in the meanwhile are skipped (they are still stored by the interface).
 
         Parameters
         ----------
         data : list
             ``[power, units]`` as emitted by :attr:`interface.sig_updated_data`.
         '''
+        self._display_data = data
+        if self.display_timer.isActive():
+            return
+        delay = self._last_render + self.interface.settings['display_refresh_time'] - time.monotonic()
+        if delay > 0:
+            self.display_timer.start(int(delay*1e3) + 1)
+        else:
+            self.render_data()
+
+    def render_data(self):
+        '''
+        Show the most recent data received by :meth:`on_data_change`: update the power display text box
+        (only if its text changed) and, if a plot exists, the live plot (see :meth:`refresh_plot`).
+        Power values are converted to the display units set in the interface.
+        '''
+        data = self._display_data
+        if data is None:
+            return
+        self._display_data = None
+        self._last_render = time.monotonic()
         #Data is (in this case) a list [power, units]
-        current_power_string = f"{data[0]:.2e}" + ' ' +  data[1]
-        self.edit_Power.setText(current_power_string)
+        units = self.interface.settings['display_units']
+        power = float(self.interface.convert_to_display_units(data[0]))
+        current_power_string = (f"{power:.2f}" if units == 'dBm' else f"{power:.2e}") + ' ' + units
+        if current_power_string != self.edit_Power.text():
+            self.edit_Power.setText(current_power_string)
         if self.plot_object:
-            self.plot_object.data.setData(list(range(1, len(self.interface.stored_data)+1)), self.interface.stored_data) #This line is executed even when self.continuous_read == False, to make sure that plot gets cleared when user press the stop button
+            self.refresh_plot() #This line is executed even when self.continuous_read == False, to make sure that plot gets cleared when user press the stop button
+
+    def refresh_plot(self):
+        '''
+        Update the plot (see :meth:`update_plot`) if :attr:`plot_window` is visible. Otherwise, the plot
+        is only marked as outdated, and it is updated as soon as the window is shown again
+        (see :meth:`on_plot_window_shown`).
+        '''
+        if self.plot_watcher.is_visible():
+            self._plot_outdated = False
+            self.update_plot()
+        else:
+            self._plot_outdated = True
+
+    def on_plot_window_shown(self):
+        '''
+        Slot connected to :attr:`plot_watcher`. Updates the plot if it became outdated while its
+        window was hidden or minimized.
+        '''
+        if self._plot_outdated:
+            self._plot_outdated = False
+            self.update_plot()
         
+    def on_display_units_change(self,units):
+        '''
+        Event slot connected to :attr:`interface.sig_display_units`.
+
+        Updates the units combo box and, if a plot exists, the label of its vertical axis and
+        its content.
+
+        Parameters
+        ----------
+        units : str
+            New display units.
+        '''
+        self.combo_PowerUnits.setCurrentText(units)
+        if self.plot_object:
+            self.plot_object.graphWidget.setLabel("left", f"Power [{units}]")
+            self.plot_object.reset_range()
+            self.refresh_plot()
+
     def on_refreshtime_change(self,value):
         '''
         Event slot connected to :attr:`interface.sig_refreshtime`.
@@ -911,33 +2373,67 @@ class gui(abstract_instrument_interface.abstract_gui):
         value : bool
             ``True`` if auto power ranging is now enabled, ``False`` otherwise.
         '''
-        self.set_auto_power_range_state(value)
         self.box_PowerRangeAuto.setChecked(value)
+        self.set_auto_power_range_state(value)
+
+    def on_software_auto_power_range_change(self,value):
+        '''
+        Event slot connected to :attr:`interface.sig_software_auto_power_range`.
+
+        Updates the software auto-range checkbox state and enables/disables the manual power
+        range controls accordingly via :meth:`set_auto_power_range_state`.
+
+        Parameters
+        ----------
+        value : bool
+            ``True`` if the software auto power ranging is now enabled, ``False`` otherwise.
+        '''
+        self.box_PowerRangeSoftwareAuto.setChecked(value)
+        self.set_auto_power_range_state(value)
+
+    def on_export_progress(self,fraction):
+        '''
+        Event slot connected to :attr:`interface.sig_export_progress`. Shows the progress of the export in the "Export" button.
+        '''
+        self.button_ExportData.setEnabled(False)
+        self.button_ExportData.setText(f"Export ({100*fraction:.0f}%)")
+
+    def on_export_finished(self,path,error):
+        '''
+        Event slot connected to :attr:`interface.sig_export_finished`. Restores the "Export" button.
+        '''
+        self.button_ExportData.setEnabled(True)
+        self.button_ExportData.setText("Export")
 
     def on_close(self):
         '''
         Event slot connected to :attr:`interface.sig_close`.
 
-        Closes the floating plot window (if one exists) when the interface is closed.
+        Closes the floating plot and analysis windows (if they exist) when the interface is closed.
         '''
+        self.display_timer.stop()
         if hasattr(self,'plot_window'):
             if self.plot_window:
                 self.plot_window.close()
+        if self.analysis_timer:
+            self.analysis_timer.stop()
+        if self.analysis_window:
+            self.analysis_window.close()
 
     def set_auto_power_range_state(self,auto_power_range):
         '''
         Enable or disable the manual power range widgets based on the auto-ranging state.
 
-        When ``auto_power_range`` is ``True``, the power range text box and the
-        increase/decrease buttons are disabled (since the instrument controls the range
-        automatically). When ``False``, they are re-enabled.
+        When ``auto_power_range`` is ``True``, or when either auto-range checkbox is checked,
+        the power range text box and the increase/decrease buttons are disabled (since the
+        range is controlled automatically). Otherwise, they are re-enabled.
 
         Parameters
         ----------
         auto_power_range : bool
-            ``True`` if auto power ranging is active, ``False`` otherwise.
+            ``True`` if auto power ranging (of the device or of the software) is active, ``False`` otherwise.
         '''
-        if auto_power_range:
+        if auto_power_range or self.box_PowerRangeAuto.isChecked() or self.box_PowerRangeSoftwareAuto.isChecked():
             self.disable_widget([self.edit_PowerRange,self.button_IncreasePowerRange, self.button_DecreasePowerRange])
         else:
             self.enable_widget([self.edit_PowerRange,self.button_IncreasePowerRange, self.button_DecreasePowerRange])
@@ -963,7 +2459,9 @@ class gui(abstract_instrument_interface.abstract_gui):
         from the combo box and calls :meth:`interface.connect_device`. If currently
         connected, calls :meth:`interface.disconnect_device`.
         '''
-        if(self.interface.instrument.connected == False): # We attempt connection   
+        if self.interface.reconnecting: # We cancel the reconnection
+            self.interface.disconnect_device()
+        elif(self.interface.instrument.connected == False): # We attempt connection   
             device_full_name = self.combo_Devices.currentText() # Get the device name from the combobox
             self.interface.connect_device(device_full_name)
         elif(self.interface.instrument.connected == True): # We attempt disconnection
@@ -987,6 +2485,18 @@ class gui(abstract_instrument_interface.abstract_gui):
             status_bool = False
         self.interface.set_auto_power_range(status_bool)
 
+    def click_box_PowerRangeSoftwareAuto(self, state):
+        '''
+        Handler for the "Auto (SW)" power range checkbox state change. Calls
+        :meth:`interface.set_software_auto_power_range`.
+
+        Parameters
+        ----------
+        state : Qt.CheckState
+            The new state of the checkbox (``Qt.Checked`` or ``Qt.Unchecked``).
+        '''
+        self.interface.set_software_auto_power_range(state == QtCore.Qt.Checked)
+
     def click_button_set_zero_powermeter(self):
         '''Handler for the "Set Zero" button. Calls :meth:`interface.set_zero_powermeter`.'''
         self.interface.set_zero_powermeter()
@@ -1050,6 +2560,10 @@ class gui(abstract_instrument_interface.abstract_gui):
         '''
         return self.interface.set_refresh_time(self.edit_RefreshTime.text())
 
+    def change_combo_PowerUnits(self, units):
+        '''Handler for the power units combo box. Calls :meth:`interface.set_display_units`.'''
+        self.interface.set_display_units(units)
+
     def click_button_ShowHidePlot(self):
         '''Handler for the "Show/Hide Plot" button. Toggles the visibility of the plot window.'''
         self.plot_window.setHidden(not self.plot_window.isHidden())
@@ -1058,23 +2572,130 @@ class gui(abstract_instrument_interface.abstract_gui):
 ### END GUI Events Functions ####
 #################################
 
+    def click_button_ExportData(self):
+        '''Handler for the "Export" button. Asks for a file name, and exports all acquired data in background via :meth:`interface.export_data`.'''
+        (path, _) = Qt.QFileDialog.getSaveFileName(self.parent, "Export data", "", "CSV file (*.csv);;NumPy array (*.npy);;NumPy archive (*.npz)")
+        if path:
+            self.interface.export_data(path)
+
+    def click_button_ShowHideAnalysis(self):
+        '''Handler for the "Analysis" button. Toggles the visibility of the analysis panel (creating it the first time).'''
+        if self.analysis_window is None:
+            self.create_analysis_panel()
+        if self.analysis_window.isHidden():
+            self.analysis_window.show()
+            self.analysis_timer.start(int(self.interface.settings['analysis_refresh_time']*1e3))
+            self.request_analysis()
+        else:
+            self.analysis_window.hide()
+            self.analysis_timer.stop()
+
     def create_plot(self):
         '''
         Create a separate floating window containing a live pyqtgraph plot of
-        :attr:`interface.stored_data` (power vs. acquisition number).
+        :attr:`interface.stored_data` versus the time elapsed since the first reading. If
+        ``interface.settings['plot_time_window']`` is larger than zero, only the readings of the
+        last ``plot_time_window`` seconds are shown.
 
         The window is created hidden; call ``plot_window.setHidden(False)`` or use
-        :meth:`click_button_ShowHidePlot` to show it. The plot axis label and window
+        :meth:`click_button_ShowHidePlot` to show it. While the window is hidden or minimized, the
+        plot is not updated (see :meth:`refresh_plot`). The plot axis label and window
         title are updated after connection via :meth:`on_connection_status_change`.
         '''
         self.plot_window = Qt.QWidget() #This is the widget that will contain the plot. Since it does not have a parent, the plot will be in a floating (separated) window
-        self.plot_object = PlotObject(self.interface.app, self.plot_window)
+        self.plot_object = PlotObject(self.interface.app, self.plot_window, time_window=self.interface.settings['plot_time_window'] or None)
         styles = {"color": "#fff", "font-size": "20px"}
         self.plot_object.graphWidget.setLabel("left", "Power", **styles)
-        self.plot_object.graphWidget.setLabel("bottom", "Acquisition #", **styles)
+        self.plot_object.graphWidget.setLabel("bottom", "Time [s]", **styles)
         self.plot_window.setWindowTitle(f"Powermeter: {self.interface.connected_device_name}")
+        self.plot_object.graphWidget.getViewBox().sigXRangeChanged.connect(self.on_plot_range_changed)
+        self.plot_watcher = VisibilityWatcher(self.plot_window)
+        self.plot_watcher.sig_shown.connect(self.on_plot_window_shown)
         self.plot_window.show()
         self.plot_window.setHidden(True)
+
+    def update_plot(self):
+        '''
+        Pass the data stored in the interface to the plot, converted to the display units. The
+        horizontal axis is the time (in seconds) elapsed since the first stored reading.
+
+        Only the visible time range (the whole acquisition, or the rolling time window, or the range
+        chosen by the user by zooming) is passed to the plot, decimated by
+        :attr:`interface.pyramid` to about two points per horizontal pixel. The cost of each update
+        therefore does not depend on the length of the acquisition.
+        '''
+        timestamps = self.interface.stored_timestamps
+        if len(timestamps) == 0:
+            self.plot_object.set_data(timestamps, self.interface.stored_data)
+            return
+        t_first = timestamps[0]
+        if not self.plot_object.autoscale:
+            (x0, x1) = self.plot_object.graphWidget.viewRange()[0]
+            (t0, t1) = (t_first + x0, t_first + x1)
+        elif self.plot_object.time_window:
+            (t0, t1) = (timestamps[-1] - self.plot_object.time_window, timestamps[-1])
+        else:
+            (t0, t1) = (t_first, timestamps[-1])
+        max_points = 2*max(self.plot_object.graphWidget.width(), 500)
+        (t, values) = self.interface.pyramid.get_range(t0, t1, max_points)
+        self.plot_object.set_data(t - t_first, self.interface.convert_to_display_units(values), appended=False)
+
+    def create_analysis_panel(self):
+        '''
+        Create a separate floating window containing the spectrum and the histogram of the most
+        recent readings (see :class:`~pyThorlabsPM100x.plots.AnalysisPlotObject`), together with the
+        :class:`~pyThorlabsPM100x.analysis.NoiseAnalyzer` which computes them on a worker thread, and
+        the timer which periodically requests a new analysis.
+        '''
+        self.analysis_window = Qt.QWidget()
+        self.analysis_object = AnalysisPlotObject(self.interface.app, self.analysis_window)
+        self.analysis_window.setWindowTitle(f"Powermeter: {self.interface.connected_device_name} - Analysis")
+        self.analyzer = NoiseAnalyzer()
+        self.analyzer.sig_result.connect(self.on_analysis_result)
+        self.analyzer.sig_error.connect(self.on_analysis_error)
+        self.analysis_timer = QtCore.QTimer()
+        self.analysis_timer.timeout.connect(self.request_analysis)
+
+    def request_analysis(self):
+        '''
+        Called periodically by :attr:`analysis_timer`. If the analysis panel is visible, send the most
+        recent ``interface.settings['analysis_samples']`` readings (in W) to :attr:`analyzer`. The request
+        is dropped if the previous analysis is still running.
+        '''
+        if self.analysis_window.isHidden() or self.analyzer.busy:
+            return
+        n = int(self.interface.settings['analysis_samples'])
+        values = self.interface.stored_data[-n:]
+        if len(values) < 2:
+            return
+        self.analyzer.request(self.interface.stored_timestamps[-n:], values)
+
+    def on_analysis_result(self, result):
+        '''
+        Slot connected to :attr:`analyzer`'s ``sig_result``. Shows the results in the analysis panel,
+        converted from W to the display units. Since the spectrum and the histogram of logarithmic
+        values have no meaning, they are shown in W when the display units are dBm.
+        '''
+        units = self.interface.settings['display_units']
+        if units == 'dBm':
+            units = 'W'
+        factor = float(pyThorlabsPM100x.units.from_watts(1.0, units))
+        result = dict(result, psd=result['psd']*factor**2, edges=result['edges']*factor)
+        self.analysis_object.set_results(result, units)
+
+    def on_analysis_error(self, message):
+        '''
+        Slot connected to :attr:`analyzer`'s ``sig_error``. Logs the error.
+        '''
+        self.interface.logger.error(f"An error occurred during the noise analysis: {message}")
+
+    def on_plot_range_changed(self, *args):
+        '''
+        Slot connected to the x range of the plot. When the user zooms or pans the plot, the data
+        of the new visible range are requested to :attr:`interface.pyramid`, with the appropriate resolution.
+        '''
+        if not self.plot_object.autoscale:
+            self.update_plot()
             
 #################################################################################################
 
@@ -1111,16 +2732,19 @@ def main():
         Suppress informational log output (sets ``Interface.verbose = False``).
     ``-virtual``
         Use the virtual driver (simulated devices) instead of real hardware.
+    ``-isolated``
+        Run the driver, and the acquisition, in a separate process.
     '''
     parser = argparse.ArgumentParser(description = "",epilog = "")
     parser.add_argument("-s", "--decrease_verbose", help="Decrease verbosity.", action="store_true")
     parser.add_argument('-virtual', help=f"Initialize the virtual driver", action="store_true")
+    parser.add_argument('-isolated', help=f"Run the driver in a separate process", action="store_true")
     args = parser.parse_args()
     virtual = args.virtual
     
     app = Qt.QApplication(sys.argv)
     window = MainWindow()
-    Interface = interface(app=app,virtual=virtual) 
+    Interface = interface(app=app,virtual=virtual,isolated=args.isolated) 
     Interface.verbose = not(args.decrease_verbose)
     app.aboutToQuit.connect(Interface.close) 
     view = gui(interface = Interface, parent=window,plot=True) #In this case window is the parent of the gui
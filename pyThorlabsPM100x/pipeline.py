@@ -0,0 +1,370 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Processing pipeline applied to the blocks of readings acquired by the interface.
+
+A :class:`Pipeline` is a sequence of stages, each of which receives a block of readings (two
+NumPy arrays, with the timestamps and the power values) and returns the processed block. Stages
+keep whatever state they need between blocks (e.g. the last readings, for a moving average), so
+that processing a stream block by block gives the same result as processing it all at once.
+
+Available stages (see :data:`STAGES`):
+
+==================  ==========================  ===================================================
+Name                Class                       Description
+==================  ==========================  ===================================================
+``moving_average``  :class:`MovingAverage`      Mean of the last ``window`` readings.
+``median``          :class:`MedianDespike`      Median filter, or replacement of the spikes only.
+``decimate``        :class:`Decimate`           One reading every ``factor`` readings.
+``scale``           :class:`Scale`              Linear correction ``factor*value + offset``.
+``threshold``       :class:`Threshold`          Readings outside ``[low, high]`` are clipped,
+                                                replaced by ``NaN`` or dropped.
+==================  ==========================  ===================================================
+
+Pipelines can be described by a list of dictionaries (e.g. stored in the settings of the interface),
+each with the name of the stage under the key ``'stage'`` and its parameters under the other keys::
+
+    [{'stage': 'median', 'window': 5, 'threshold': 1e-3}, {'stage': 'decimate', 'factor': 10}]
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class Stage:
+    """
+    Base class of the stages of a :class:`Pipeline`.
+
+    Subclasses define the class attribute ``name`` (the name used in the configuration of a
+    pipeline), and override :meth:`process`, and :meth:`reset` if they keep a state between blocks.
+    """
+    name = None
+
+    def process(self, timestamps, values):
+        '''
+        Process a block of readings.
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            Acquisition time of each reading.
+        values : numpy.ndarray
+            Power values, in W. Readings which are not available are ``NaN``.
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            Timestamps and values of the processed block (possibly with a different length).
+        '''
+        return timestamps, values
+
+    def reset(self):
+        '''Forget the readings processed so far (e.g. when a new acquisition is started).'''
+        pass
+
+    @property
+    def config(self):
+        '''dict: Configuration of this stage, as accepted by :meth:`Pipeline.from_config`.'''
+        return {'stage': self.name}
+
+
+def _check_positive_integer(value, name):
+    if int(value) != value or value < 1:
+        raise ValueError(f"The {name} must be a positive integer.")
+    return int(value)
+
+
+class _RollingStage(Stage):
+    # Base class of the stages which apply a function to the last `window` readings (including the current one)
+
+    def __init__(self, window):
+        self.window = _check_positive_integer(window, 'window')
+        self._history = np.empty(0)
+
+    def reset(self):
+        self._history = np.empty(0)
+
+    def _rolling(self, values, function):
+        # Apply function (a numpy reduction accepting the argument axis) to the last self.window readings, for each reading
+        data = np.concatenate((self._history, values))
+        offset = len(self._history)
+        result = np.empty(len(values))
+        partial = max(0, min(len(values), self.window - 1 - offset))  # Readings preceded by less than window-1 readings
+        for i in range(partial):
+            result[i] = function(data[:offset + i + 1], axis=0)
+        if len(data) >= self.window and partial < len(values):
+            windows = sliding_window_view(data, self.window)
+            result[partial:] = function(windows[offset + partial - self.window + 1:], axis=1)
+        self._history = data[-(self.window - 1):].copy() if self.window > 1 else np.empty(0)
+        return result
+
+
+class MovingAverage(_RollingStage):
+    """
+    Replace each reading by the mean of the last ``window`` readings (including itself).
+    A missing reading (``NaN``) makes the following ``window`` averages ``NaN`` as well.
+    """
+    name = 'moving_average'
+
+    def __init__(self, window=10):
+        '''
+        Parameters
+        ----------
+        window : int, optional
+            Number of readings averaged. Default is 10.
+        '''
+        super().__init__(window)
+
+    def process(self, timestamps, values):
+        return timestamps, self._rolling(values, np.mean)
+
+    @property
+    def config(self):
+        return {'stage': self.name, 'window': self.window}
+
+
+class MedianDespike(_RollingStage):
+    """
+    Median filter over the last ``window`` readings, used to remove isolated spikes.
+
+    If ``threshold`` is ``None``, each reading is replaced by the median of the last ``window``
+    readings. Otherwise, only the readings which differ from that median by more than ``threshold``
+    are replaced, and all other readings are left untouched.
+    """
+    name = 'median'
+
+    def __init__(self, window=5, threshold=None):
+        '''
+        Parameters
+        ----------
+        window : int, optional
+            Number of readings of which the median is taken. Default is 5.
+        threshold : float, optional
+            Maximum difference (in W) between a reading and the median, above which the reading is
+            considered a spike. Default is ``None`` (all readings are replaced by the median).
+        '''
+        super().__init__(window)
+        self.threshold = threshold
+
+    def process(self, timestamps, values):
+        median = self._rolling(values, np.median)
+        if self.threshold is None:
+            return timestamps, median
+        return timestamps, np.where(np.abs(values - median) > self.threshold, median, values)
+
+    @property
+    def config(self):
+        return {'stage': self.name, 'window': self.window, 'threshold': self.threshold}
+
+
+class Decimate(Stage):
+    """
+    Reduce the number of readings by a factor ``factor``.
+
+    Readings are grouped in consecutive groups of ``factor`` readings (groups can span several
+    blocks), and each group is replaced by a single reading, whose timestamp is the one of the last
+    reading of the group.
+    """
+    name = 'decimate'
+    METHODS = {'mean': np.mean, 'min': np.min, 'max': np.max, 'last': lambda a, axis: a[:, -1]}
+
+    def __init__(self, factor=10, method='mean'):
+        '''
+        Parameters
+        ----------
+        factor : int, optional
+            Number of readings in each group. Default is 10.
+        method : str, optional
+            How the value of each group is computed: ``'mean'`` (default), ``'min'``, ``'max'`` or
+            ``'last'``.
+
+        Raises
+        ------
+        ValueError
+            If ``factor`` is not a positive integer, or if ``method`` is not valid.
+        '''
+        self.factor = _check_positive_integer(factor, 'factor')
+        if method not in self.METHODS:
+            raise ValueError("The method must be one of " + ", ".join(self.METHODS))
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        self._timestamps = np.empty(0)
+        self._values = np.empty(0)
+
+    def process(self, timestamps, values):
+        timestamps = np.concatenate((self._timestamps, timestamps))
+        values = np.concatenate((self._values, values))
+        n = len(values) - len(values) % self.factor
+        (self._timestamps, self._values) = (timestamps[n:].copy(), values[n:].copy())  # Incomplete group, completed by the next block
+        return (timestamps[self.factor - 1:n:self.factor],
+                self.METHODS[self.method](values[:n].reshape(-1, self.factor), axis=1))
+
+    @property
+    def config(self):
+        return {'stage': self.name, 'factor': self.factor, 'method': self.method}
+
+
+class Scale(Stage):
+    """
+    Apply a linear correction ``factor*value + offset`` to each reading (e.g. a constant calibration factor).
+    """
+    name = 'scale'
+
+    def __init__(self, factor=1.0, offset=0.0):
+        '''
+        Parameters
+        ----------
+        factor : float, optional
+            Multiplicative factor. Default is 1.
+        offset : float, optional
+            Offset (in W) added after the multiplication. Default is 0.
+        '''
+        self.factor = float(factor)
+        self.offset = float(offset)
+
+    def process(self, timestamps, values):
+        return timestamps, values*self.factor + self.offset
+
+    @property
+    def config(self):
+        return {'stage': self.name, 'factor': self.factor, 'offset': self.offset}
+
+
+class Threshold(Stage):
+    """
+    Handle the readings outside the interval ``[low, high]``: they are either clipped to the interval,
+    replaced by ``NaN``, or removed from the block.
+    """
+    name = 'threshold'
+    ACTIONS = ('clip', 'nan', 'drop')
+
+    def __init__(self, low=None, high=None, action='clip'):
+        '''
+        Parameters
+        ----------
+        low : float, optional
+            Lower limit, in W. Default is ``None`` (no lower limit).
+        high : float, optional
+            Upper limit, in W. Default is ``None`` (no upper limit).
+        action : str, optional
+            ``'clip'`` (default), ``'nan'`` or ``'drop'``.
+
+        Raises
+        ------
+        ValueError
+            If ``action`` is not valid, or if ``low`` is larger than ``high``.
+        '''
+        if action not in self.ACTIONS:
+            raise ValueError("The action must be one of " + ", ".join(self.ACTIONS))
+        if low is not None and high is not None and low > high:
+            raise ValueError("The lower limit must be smaller than the upper limit.")
+        (self.low, self.high, self.action) = (low, high, action)
+
+    def process(self, timestamps, values):
+        if self.action == 'clip':
+            return timestamps, np.clip(values, self.low, self.high)
+        outside = np.zeros(len(values), dtype=bool)
+        if self.low is not None:
+            outside |= values < self.low
+        if self.high is not None:
+            outside |= values > self.high
+        if self.action == 'nan':
+            return timestamps, np.where(outside, np.nan, values)
+        return timestamps[~outside], values[~outside]
+
+    @property
+    def config(self):
+        return {'stage': self.name, 'low': self.low, 'high': self.high, 'action': self.action}
+
+
+# Stages which can be used in the configuration of a pipeline, indexed by name
+STAGES = {stage.name: stage for stage in (MovingAverage, MedianDespike, Decimate, Scale, Threshold)}
+
+
+class Pipeline:
+    """
+    Sequence of stages applied, in order, to each block of readings.
+
+    Attributes
+    ----------
+    stages : list of Stage
+        The stages of the pipeline. An empty pipeline returns the readings unchanged.
+    """
+
+    def __init__(self, stages=()):
+        '''
+        Parameters
+        ----------
+        stages : iterable of Stage, optional
+            The stages of the pipeline. Default is no stage.
+        '''
+        self.stages = list(stages)
+
+    @classmethod
+    def from_config(cls, config):
+        '''
+        Create a pipeline from its description.
+
+        Parameters
+        ----------
+        config : list of dict
+            One dictionary per stage, with the name of the stage (one of the keys of :data:`STAGES`)
+            under the key ``'stage'``, and the parameters of the stage under the other keys.
+
+        Returns
+        -------
+        Pipeline
+
+        Raises
+        ------
+        ValueError
+            If a stage is unknown, or if its parameters are not valid.
+        '''
+        stages = []
+        for item in config:
+            params = dict(item)
+            name = params.pop('stage', None)
+            if name not in STAGES:
+                raise ValueError(f"Unknown stage {name!r}. Available stages are " + ", ".join(STAGES))
+            try:
+                stages.append(STAGES[name](**params))
+            except TypeError as e:
+                raise ValueError(f"Invalid parameters for the stage {name!r}: {e}") from None
+        return cls(stages)
+
+    @property
+    def config(self):
+        '''list of dict: Description of this pipeline, as accepted by :meth:`from_config`.'''
+        return [stage.config for stage in self.stages]
+
+    def process(self, timestamps, values):
+        '''
+        Pass a block of readings through all the stages.
+
+        Parameters
+        ----------
+        timestamps : array_like of float
+            Acquisition time of each reading.
+        values : array_like of float
+            Power values, in W.
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            Timestamps and values of the processed block. They can be empty (e.g. if a decimation
+            stage is still waiting for the readings needed to complete a group).
+        '''
+        timestamps = np.asarray(timestamps, dtype=float).ravel()
+        values = np.asarray(values, dtype=float).ravel()
+        for stage in self.stages:
+            if len(values) == 0:
+                break
+            (timestamps, values) = stage.process(timestamps, values)
+        return timestamps, values
+
+    def reset(self):
+        '''Reset the state of all the stages.'''
+        for stage in self.stages:
+            stage.reset()
@@ -9,7 +9,11 @@ power readings in real time.
 """
 # v0.1 (2022-02-15)
 
+import time
+
+import numpy as np
 import PyQt5.QtWidgets as Qt
+import PyQt5.QtCore as QtCore
 import pyqtgraph as pg
 
 
@@ -19,7 +23,15 @@ class PlotObject:
 
     Creates a ``PlotWidget`` with a grid, sets it as the layout of ``parent``,
     and exposes a single ``data`` curve that the GUI updates on each acquisition
-    by calling ``self.data.setData(x, y)``.
+    by calling :meth:`set_data`.
+
+    The cost of each update depends on the visible data, and not on the total amount of data
+    acquired: only the points within :attr:`time_window` (if set) are passed to the curve,
+    the curve only renders the points within the visible x range (clip-to-view) and
+    downsamples them with pyqtgraph's ``'peak'`` method (which preserves spikes and dropouts),
+    and the y range is computed from minimum and maximum values which are updated incrementally,
+    so the data already plotted are never scanned again. The axes are rescaled at most once
+    every :attr:`autoscale_interval` seconds.
 
     Attributes
     ----------
@@ -32,13 +44,25 @@ class PlotObject:
         The pyqtgraph plot widget. Use this to set axis labels, titles, or any
         other plot properties after construction.
     data : pg.PlotDataItem
-        The plot curve. Call ``data.setData(x, y)`` to update the displayed data.
+        The plot curve. Updated via :meth:`set_data`.
+    time_window : float or None
+        If set, only the last ``time_window`` units of the x axis (e.g. seconds) are shown.
+        If ``None``, the whole history is shown.
+    autoscale : bool
+        If ``True``, the axes are rescaled automatically to show all the data. It is set to
+        ``False`` when the user pans or zooms the plot, and set back to ``True`` when the user
+        presses the "auto-range" button of the plot.
+    autoscale_interval : float
+        Minimum time (in seconds) between two automatic rescalings of the axes.
+    Max, Min : float or None
+        Maximum and minimum (finite) values among the points plotted so far (or among the
+        points within :attr:`time_window`, if set).
     ConfigPopupOpen : int
         Flag (0/1) indicating whether a configuration popup is currently open.
         Reserved for future use.
     """
 
-    def __init__(self,  app, parent):
+    def __init__(self,  app, parent, time_window=None, autoscale_interval=0.5):
         """
         Parameters
         ----------
@@ -47,21 +71,31 @@ class PlotObject:
         parent : Qt.QWidget
             The Qt widget that will host the plot. Its layout is replaced with a
             ``QVBoxLayout`` containing the ``PlotWidget``.
+        time_window : float, optional
+            See :attr:`time_window`. Default is ``None``.
+        autoscale_interval : float, optional
+            See :attr:`autoscale_interval`. Default is 0.5.
         """
         self.app = app
         self.parent = parent
-        
+
         self.ConfigPopupOpen = 0 #This variable is 1 when the popup for plot configuration is open, and 0 otherwise
 
-        self.Max = 0 #Keep track of the maximum and minimum values plotted in this plot (among all possible curves). It is used for resizing purposes
-        self.Min = 0
+        self.Max = None #Keep track of the maximum and minimum values plotted in this plot. It is used for resizing purposes
+        self.Min = None
+        self._scanned = 0 #Number of points already taken into account in self.Max and self.Min
+        self._last_autoscale = 0
+        self._autoscale_pending = False
+        self.time_window = time_window
+        self.autoscale = True
+        self.autoscale_interval = autoscale_interval
 
         #Create the figure
         self.graphWidget = pg.PlotWidget()
         self.graphWidget.showGrid(x=True, y=True)
         #self.graphWidget.setMenuEnabled(False)
         vbox = Qt.QVBoxLayout()
-        vbox.addWidget(self.graphWidget) 
+        vbox.addWidget(self.graphWidget)
         #vbox.addStretch(1)
 
         self.parent.setLayout(vbox)
@@ -70,4 +104,196 @@ class PlotObject:
         Y = []
 
         ## plot data: x, y values
-        self.data = self.graphWidget.plot(X,Y)
\ No newline at end of file
+        self.data = self.graphWidget.plot(X,Y,connect="finite") #NaN values (e.g. gaps in the acquisition) are not connected
+        self.data.setClipToView(True)
+        self.data.setDownsampling(auto=True, method='peak')
+
+        # The axes are rescaled by this object (see self.set_data), instead of by pyqtgraph, which would scan all data at each update
+        self.graphWidget.disableAutoRange()
+        self.graphWidget.getViewBox().sigRangeChangedManually.connect(self._on_range_changed_manually)
+        self.graphWidget.getPlotItem().autoBtn.clicked.connect(self._on_autoscale_button_clicked)
+
+    def set_time_window(self, time_window):
+        '''
+        Set :attr:`time_window`. Pass ``None`` (or 0) to show the whole history.
+        '''
+        self.time_window = time_window if time_window else None
+        self.reset_range()
+
+    def reset_range(self):
+        '''
+        Forget the minimum and maximum values plotted so far. Must be called when data already
+        plotted change (e.g. when the units of the data change), since :attr:`Max` and
+        :attr:`Min` are only updated with new points.
+        '''
+        self.Max = None
+        self.Min = None
+        self._scanned = 0
+        self._last_autoscale = 0
+
+    def set_data(self, x, y, appended=True):
+        '''
+        Update the plotted curve.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Values on the x axis. Must be sorted (e.g. acquisition times).
+        y : numpy.ndarray
+            Values on the y axis.
+        appended : bool, optional
+            If ``True`` (default), ``x`` and ``y`` must contain the points passed in the previous call
+            followed by the new ones (or be shorter than in the previous call, in which case the data
+            are considered reset), and :attr:`Max` and :attr:`Min` are updated with the new points only.
+            If ``False`` (e.g. for data decimated differently at each call), all points are scanned.
+        '''
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if len(y) < self._scanned or not appended:
+            (self.Max, self.Min, self._scanned) = (None, None, 0)
+        if self.time_window and len(x) > 0:
+            start = int(np.searchsorted(x, x[-1] - self.time_window))
+            (x, y) = (x[start:], y[start:])
+            # Points which left the window might have been the max or min, so the window is always rescanned
+            (self.Max, self.Min, self._scanned) = (None, None, 0)
+        else:
+            start = 0
+        new = y[self._scanned - start:] if self._scanned else y
+        new = new[np.isfinite(new)]
+        if len(new) > 0:
+            (new_min, new_max) = (float(new.min()), float(new.max()))
+            self.Min = new_min if self.Min is None else min(self.Min, new_min)
+            self.Max = new_max if self.Max is None else max(self.Max, new_max)
+        self._scanned = start + len(y)
+        self.data.setData(x, y)
+        self._rescale()
+
+    def _rescale(self):
+        # Rescale the axes to show all the data, at most once every self.autoscale_interval seconds.
+        # If the last rescaling is too recent, a new one is scheduled, so that the plot is rescaled even if no new data arrive
+        if not self.autoscale or self.data.xData is None or len(self.data.xData) == 0:
+            return
+        delay = self._last_autoscale + self.autoscale_interval - time.monotonic()
+        if delay > 0:
+            if not self._autoscale_pending:
+                self._autoscale_pending = True
+                QtCore.QTimer.singleShot(int(delay*1e3) + 1, self._rescale_if_pending)
+            return
+        self._last_autoscale = time.monotonic()
+        x = self.data.xData
+        x_min = x[-1] - self.time_window if self.time_window else x[0]
+        self.graphWidget.setXRange(x_min, x[-1], padding=0.02)
+        if self.Min is not None:
+            self.graphWidget.setYRange(self.Min, self.Max, padding=0.05)
+
+    def _rescale_if_pending(self):
+        if self._autoscale_pending:
+            self._autoscale_pending = False
+            self._rescale()
+
+    def _on_range_changed_manually(self, *args):
+        self.autoscale = False
+
+    def _on_autoscale_button_clicked(self, *args):
+        self.autoscale = True
+        self._last_autoscale = 0
+        self.graphWidget.disableAutoRange()
+
+
+class VisibilityWatcher(QtCore.QObject):
+    """
+    Event filter which emits :attr:`sig_shown` whenever a window becomes visible again, i.e. when
+    it is shown after being hidden, or restored after being minimized.
+
+    Used by the GUI to skip the updates of the plot window while it cannot be seen, and to redraw it
+    as soon as it can.
+    """
+    sig_shown = QtCore.pyqtSignal()
+
+    def __init__(self, window):
+        """
+        Parameters
+        ----------
+        window : Qt.QWidget
+            The (top-level) window to watch. The filter is installed on it by the constructor.
+        """
+        super().__init__(window)
+        self.window = window
+        window.installEventFilter(self)
+
+    def is_visible(self):
+        '''Return ``True`` if the window is visible and not minimized.'''
+        return self.window.isVisible() and not self.window.isMinimized()
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() in (QtCore.QEvent.Show, QtCore.QEvent.WindowStateChange) and self.is_visible():
+            self.sig_shown.emit()
+        return False    # The event is not consumed
+
+
+class AnalysisPlotObject:
+    """
+    Two pyqtgraph plots embedded inside a parent Qt widget, showing the power spectral
+    density (log-log axes) and the histogram of the most recent readings.
+
+    Attributes
+    ----------
+    app : Qt.QApplication
+        The shared PyQt5 application object.
+    parent : Qt.QWidget
+        The widget that hosts the plots.
+    psdWidget : pg.PlotWidget
+        Plot of the power spectral density.
+    histogramWidget : pg.PlotWidget
+        Plot of the histogram.
+    psd : pg.PlotDataItem
+        The spectrum curve.
+    histogram : pg.PlotDataItem
+        The histogram curve (drawn with ``stepMode='center'``).
+    """
+
+    def __init__(self, app, parent):
+        """
+        Parameters
+        ----------
+        app : Qt.QApplication
+            The shared PyQt5 application object.
+        parent : Qt.QWidget
+            The Qt widget that will host the plots. Its layout is replaced with a
+            ``QHBoxLayout`` containing the two ``PlotWidget`` objects.
+        """
+        self.app = app
+        self.parent = parent
+
+        self.psdWidget = pg.PlotWidget()
+        self.psdWidget.showGrid(x=True, y=True)
+        self.psdWidget.setLogMode(x=True, y=True)
+        self.histogramWidget = pg.PlotWidget()
+        self.histogramWidget.showGrid(x=True, y=True)
+        hbox = Qt.QHBoxLayout()
+        hbox.addWidget(self.psdWidget)
+        hbox.addWidget(self.histogramWidget)
+        self.parent.setLayout(hbox)
+
+        self.psd = self.psdWidget.plot([], [])
+        self.histogram = self.histogramWidget.plot([0, 1], [0], stepMode='center', fillLevel=0, brush=(100, 100, 255, 150))
+
+    def set_results(self, result, units):
+        '''
+        Display the results of a :class:`~pyThorlabsPM100x.analysis.NoiseAnalyzer`.
+
+        Parameters
+        ----------
+        result : dict
+            The dictionary emitted by :attr:`~pyThorlabsPM100x.analysis.NoiseAnalyzer.sig_result`.
+        units : str
+            Units of the analyzed values, used for the axis labels.
+        '''
+        # The DC component cannot be shown on a logarithmic axis
+        self.psd.setData(result['frequencies'][1:], result['psd'][1:])
+        self.histogram.setData(result['edges'], result['counts'])
+        self.psdWidget.setLabel("bottom", "Frequency [Hz]")
+        self.psdWidget.setLabel("left", f"PSD [{units}²/Hz]")
+        self.psdWidget.setTitle(f"{result['samples']} samples at {result['sample_rate']:.3g} Hz")
+        self.histogramWidget.setLabel("bottom", f"Power [{units}]")
+        self.histogramWidget.setLabel("left", "Counts")
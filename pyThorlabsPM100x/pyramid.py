@@ -0,0 +1,219 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Multi-resolution min/max/mean pyramid of the acquired data.
+
+Provides :class:`MinMaxPyramid`, which is maintained alongside an
+:class:`~pyThorlabsPM100x.buffer.AcquisitionBuffer` and stores, for each power-of-two
+decimation level (starting from groups of :attr:`MinMaxPyramid.BASE_SIZE` samples), the minimum,
+maximum and mean of consecutive groups of samples. Any time range of a long recording can then be
+displayed with a bounded number of points, without losing spikes or dropouts.
+"""
+
+import numpy as np
+
+
+class _Level:
+    """
+    Growable arrays describing the buckets of one decimation level. Each bucket summarizes
+    ``2**k`` consecutive samples of the buffer (where ``k`` is the exponent of the level).
+    """
+
+    _FIELDS = ('t_start', 't_end', 'min', 'max', 'sum', 'count')
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        for name in self._FIELDS:
+            setattr(self, '_' + name, np.empty(capacity))
+
+    def __len__(self):
+        return self.size
+
+    def __getattr__(self, name):
+        if name in _Level._FIELDS:
+            return object.__getattribute__(self, '_' + name)[:self.size]
+        raise AttributeError(name)
+
+    def append(self, **fields):
+        n = len(fields['min'])
+        if self.size + n > len(self._min):
+            new_capacity = max(2*len(self._min), self.size + n)
+            for name in self._FIELDS:
+                old = getattr(self, '_' + name)
+                setattr(self, '_' + name, np.concatenate((old[:self.size], np.empty(new_capacity - self.size))))
+        for name in self._FIELDS:
+            getattr(self, '_' + name)[self.size:self.size+n] = fields[name]
+        self.size += n
+
+
+def _summarize(t, v, size):
+    # Return the fields of the buckets summarizing consecutive groups of `size` samples (len(v) must be a multiple of size)
+    finite = np.isfinite(v)
+    v_min = np.where(finite, v, np.inf).reshape(-1, size).min(axis=1)
+    v_max = np.where(finite, v, -np.inf).reshape(-1, size).max(axis=1)
+    return {'t_start': t[0::size], 't_end': t[size-1::size],
+            'min': np.where(np.isinf(v_min), np.nan, v_min), 'max': np.where(np.isinf(v_max), np.nan, v_max),
+            'sum': np.where(finite, v, 0).reshape(-1, size).sum(axis=1), 'count': finite.reshape(-1, size).sum(axis=1)}
+
+
+def _bucket_points(bucket, mode):
+    # Return the points (timestamps, values) representing the buckets described by the dict (or _Level) `bucket`
+    if mode == 'minmax':
+        return (np.column_stack((bucket['t_start'], bucket['t_end'])).ravel(),
+                np.column_stack((bucket['min'], bucket['max'])).ravel())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((bucket['t_start'] + bucket['t_end'])/2, bucket['sum'] / bucket['count'])
+
+
+class MinMaxPyramid:
+    """
+    Min/max/mean pyramid of the samples stored in an :class:`~pyThorlabsPM100x.buffer.AcquisitionBuffer`.
+
+    Each bucket of level ``k`` summarizes ``2**k`` consecutive samples, and stores their first and
+    last timestamps, their minimum, maximum and mean value (``NaN`` samples are ignored). Only the
+    levels from ``k = log2(BASE_SIZE)`` upwards are stored: each bucket of the first stored level
+    summarizes :attr:`BASE_SIZE` samples of the buffer, and each bucket of the following levels
+    summarizes two consecutive buckets of the previous level. The stored levels thus use a small
+    fraction of the memory of the buffer itself. Finer levels, which are only needed to display
+    short time ranges, are computed from the buffer when requested.
+
+    The pyramid is updated incrementally by :meth:`update`, which only processes the samples
+    appended to the buffer since the previous call (amortized O(1) per sample), and
+    :meth:`get_range` returns any time range with at most about ``max_points`` points, choosing
+    the appropriate level, in a time which does not depend on the length of the recording
+    (apart from a binary search).
+
+    Timestamps in the buffer must be non-decreasing.
+
+    Attributes
+    ----------
+    buffer : AcquisitionBuffer
+        The buffer summarized by this pyramid.
+    levels : list of _Level
+        ``levels[j]`` contains the buckets of level ``log2(BASE_SIZE) + j``, i.e. of
+        ``BASE_SIZE*2**j`` samples.
+    """
+
+    BASE_SIZE = 32      # Number of samples summarized by each bucket of the first stored level (a power of two)
+
+    def __init__(self, buffer):
+        '''
+        Parameters
+        ----------
+        buffer : AcquisitionBuffer
+            The buffer summarized by this pyramid.
+        '''
+        self.buffer = buffer
+        self.clear()
+
+    def clear(self):
+        '''Discard all levels. They are rebuilt from the buffer at the next :meth:`update`.'''
+        self.levels = []
+        self._consumed = 0      # Number of samples of the buffer already summarized in levels[0]
+
+    def update(self):
+        '''
+        Summarize the samples appended to :attr:`buffer` since the last call. If the buffer was
+        cleared in the meanwhile, the pyramid is cleared and rebuilt.
+        '''
+        if len(self.buffer) < self._consumed:
+            self.clear()
+        # The first stored level is built from groups of BASE_SIZE samples of the buffer
+        n_groups = (len(self.buffer) - self._consumed)//self.BASE_SIZE
+        if n_groups == 0:
+            return
+        end = self._consumed + n_groups*self.BASE_SIZE
+        fields = _summarize(self.buffer.timestamps[self._consumed:end], self.buffer.values[self._consumed:end], self.BASE_SIZE)
+        self._consumed = end
+        if not self.levels:
+            self.levels.append(_Level())
+        self.levels[0].append(**fields)
+        # Each following level is built from pairs of buckets of the previous level
+        k = 0
+        while len(self.levels[k]) >= 2:
+            source = self.levels[k]
+            if k + 1 == len(self.levels):
+                self.levels.append(_Level())
+            target = self.levels[k + 1]
+            start = 2*len(target)
+            n_pairs = (len(source) - start)//2
+            if n_pairs == 0:
+                break
+            end = start + 2*n_pairs
+            target.append(t_start=source.t_start[start:end:2], t_end=source.t_end[start+1:end:2],
+                          min=np.fmin(source.min[start:end:2], source.min[start+1:end:2]),
+                          max=np.fmax(source.max[start:end:2], source.max[start+1:end:2]),
+                          sum=source.sum[start:end].reshape(-1, 2).sum(axis=1),
+                          count=source.count[start:end].reshape(-1, 2).sum(axis=1))
+            k += 1
+
+    def get_range(self, t0, t1, max_points=2000, mode='minmax'):
+        '''
+        Return the data acquired between ``t0`` and ``t1``, decimated to at most about ``max_points`` points.
+
+        The coarsest level with enough resolution is chosen. With ``mode='minmax'``, each bucket
+        of that level is returned as two points, at its first and last timestamp, with its
+        minimum and maximum value, so that no spike or dropout is lost. With ``mode='mean'``,
+        each bucket is returned as a single point with its mean value. The most recent samples,
+        which do not fill a complete bucket of the chosen level yet, are returned with the
+        best resolution available. If the chosen level is finer than the stored ones, its buckets
+        are computed from the samples of the buffer within the range (there are at most about
+        ``max_points*BASE_SIZE`` of them).
+
+        Parameters
+        ----------
+        t0, t1 : float
+            Time range, in the same units as the timestamps of the buffer.
+        max_points : int, optional
+            Approximate maximum number of points returned. Default is 2000.
+        mode : str, optional
+            ``'minmax'`` or ``'mean'``. Default is ``'minmax'``.
+
+        Returns
+        -------
+        (timestamps, values) : (numpy.ndarray, numpy.ndarray)
+            The decimated data.
+        '''
+        if mode not in ('minmax', 'mean'):
+            raise ValueError("mode must be 'minmax' or 'mean'.")
+        self.update()
+        raw_t = self.buffer.timestamps
+        raw_v = self.buffer.values
+        i0 = int(np.searchsorted(raw_t, t0, side='left'))
+        i1 = int(np.searchsorted(raw_t, t1, side='right'))
+        n = i1 - i0
+        points_per_bucket = 2 if mode == 'minmax' else 1
+        base_level = self.BASE_SIZE.bit_length() - 1
+        max_level = base_level + len(self.levels) - 1 if self.levels else base_level - 1
+        level = 0
+        while level < max_level and n*points_per_bucket/(2**level) > max_points:
+            level += 1
+        if level == 0:
+            return raw_t[i0:i1], raw_v[i0:i1]
+        (ts, vs) = ([], [])
+        if level < base_level:
+            # Level not stored: buckets computed from the samples in the range, then the last samples which do not fill a bucket
+            size = 2**level
+            start = i0 + (n//size)*size
+            (t, v) = _bucket_points(_summarize(raw_t[i0:start], raw_v[i0:start], size), mode)
+            return np.concatenate((t, raw_t[start:i1])), np.concatenate((v, raw_v[start:i1]))
+        # Buckets of the chosen level, then (at most) one bucket of each finer stored level, then the last raw samples
+        covered = 0     # Index (in the buffer) of the first sample not covered by the buckets already returned
+        for k in range(level, base_level - 1, -1):
+            lev = self.levels[k - base_level]
+            first = covered // 2**k
+            lo = max(first, int(np.searchsorted(lev.t_end[first:], t0, side='left')) + first)
+            hi = int(np.searchsorted(lev.t_start[first:], t1, side='right')) + first
+            if hi > lo:
+                bucket = {name: getattr(lev, name)[lo:hi] for name in _Level._FIELDS}
+                (t, v) = _bucket_points(bucket, mode)
+                ts.append(t)
+                vs.append(v)
+            covered = len(lev) * 2**k
+        start = max(covered, i0)
+        if i1 > start:
+            ts.append(raw_t[start:i1])
+            vs.append(raw_v[start:i1])
+        if not ts:
+            return raw_t[:0], raw_v[:0]
+        return np.concatenate(ts), np.concatenate(vs)
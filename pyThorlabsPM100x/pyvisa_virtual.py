@@ -1,19 +1,40 @@
 ''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
 
 """
-Drop-in replacement for pyvisa that simulates three Thorlabs PM100x devices.
+Drop-in replacement for pyvisa that simulates Thorlabs PM100x devices (three by default).
 Exposes the same ResourceManager / instrument API that driver.py uses so that
 ThorlabsPM100x(virtual=True) can run without any real hardware or pyvisa installed.
+
+For stress tests, :func:`generate_device_configs` creates any number of devices, mixing PM100A and
+PM100D consoles with instruments of other vendors and with unresponsive resources, and
+:func:`set_default_devices` makes them the devices simulated by the ``ResourceManager`` objects
+created afterwards (e.g. by ``ThorlabsPM100x(virtual=True)``).
+
+The simulated time (which determines the simulated power, and the duration of the zeroing routine
+and of the delays) is given by a clock of :mod:`pyThorlabsPM100x.clock` passed to the
+``ResourceManager``. With a :class:`~pyThorlabsPM100x.clock.ManualClock`, the readings are
+deterministic, and the simulated time can be fast-forwarded.
 """
 
+import bisect
+import itertools
 import math
-import time
+import random
+
+from pyThorlabsPM100x.clock import WallClock
+
+ZERO_DURATION = 0.5     # Duration (in s) of the simulated zeroing routine
+VI_ERROR_TMO = -1073807339  # VISA error code of timeouts
 
-# Per-device configuration.  Each entry describes one simulated instrument.
+# Per-device configuration.  Each entry describes one simulated instrument. Besides the keys used below, a configuration
+# can contain the optional keys 'foreign' (True for instruments of other vendors, which only answer '*IDN?'),
+# 'responsive' (False for resources which never answer, i.e. every command raises a timeout error) and 'delay'
+# (time in s taken by each command, default 0). The keys which describe the simulated power are listed in _Signal
 _DEVICE_CONFIGS = [
     {
         'addr':            'VIRTUAL0::INSTR',
         'idn':             'Thorlabs,PM100A,SN00001,V1.0',
+        'sensor_idn':      'S120C,SEN00001,01-Jan-2020,1,18,289',
         'min_wl':          400,
         'max_wl':          1000,
         'wavelength':      600,
@@ -27,6 +48,7 @@ _DEVICE_CONFIGS = [
     {
         'addr':            'VIRTUAL1::INSTR',
         'idn':             'Thorlabs,PM100D,SN00002,V1.0',
+        'sensor_idn':      'S121C,SEN00002,01-Jan-2020,1,18,289',
         'min_wl':          700,
         'max_wl':          1800,
         'wavelength':      800,
@@ -40,6 +62,7 @@ _DEVICE_CONFIGS = [
     {
         'addr':            'VIRTUAL2::INSTR',
         'idn':             'Thorlabs,PM100D,SN00003,V1.0',
+        'sensor_idn':      'S401C,SEN00003,01-Jan-2020,1,18,289',
         'min_wl':          400,
         'max_wl':          15000,
         'wavelength':      1500,
@@ -52,15 +75,239 @@ _DEVICE_CONFIGS = [
     },
 ]
 
+# Sensor heads used by generate_device_configs(), in the format (name, min wavelength, max wavelength)
+_SENSORS = [('S120C', 400, 1100), ('S121C', 400, 1100), ('S130C', 400, 1100), ('S401C', 190, 20000), ('S302C', 190, 25000)]
+
+# Identities of the instruments of other vendors used by generate_device_configs()
+_FOREIGN_IDNS = ['Keysight Technologies,34461A,MY{:08d},A.02.14', 'TEKTRONIX,MSO44,C{:06d},CF:91.1CT FV:1.26',
+                 'Rohde&Schwarz,NGE103B,{:06d},02.100', 'Stanford_Research_Systems,SR830,s/n{:05d},ver1.07']
+
+_default_devices = _DEVICE_CONFIGS
+
+
+def generate_device_configs(count, foreign_fraction=0.2, unresponsive_fraction=0.05, delay=0, seed=0):
+    '''
+    Generate the configurations of ``count`` simulated devices, to be passed to :class:`ResourceManager`
+    or to :func:`set_default_devices`.
+
+    Each device is, at random, an unresponsive resource (with probability ``unresponsive_fraction``),
+    an instrument of another vendor (with probability ``foreign_fraction``; some of them are serial
+    ``ASRL`` resources) or a PM100A/PM100D console with a random sensor head, wavelength and power range.
+    Addresses and serial numbers are unique.
+
+    Parameters
+    ----------
+    count : int
+        Number of devices.
+    foreign_fraction : float, optional
+        Probability that a device is an instrument of another vendor. Default is 0.2.
+    unresponsive_fraction : float, optional
+        Probability that a device never answers (every command raises a timeout error). Default is 0.05.
+    delay : float, optional
+        Time (in s) taken by each command sent to any device (including the commands which raise a
+        timeout error, for unresponsive devices). Default is 0.
+    seed : int, optional
+        Seed of the random generator, so that the same devices are generated at each call. Default is 0.
+
+    Returns
+    -------
+    list of dict
+        Configurations of the devices, in the same format as the default ones.
+    '''
+    rng = random.Random(seed)
+    configs = []
+    for n in range(count):
+        r = rng.random()
+        if r < unresponsive_fraction:
+            configs.append({'addr': f'TCPIP0::10.0.{n // 256}.{n % 256}::inst0::INSTR', 'idn': '', 'responsive': False, 'delay': delay})
+        elif r < unresponsive_fraction + foreign_fraction:
+            addr = rng.choice([f'GPIB{n // 31}::{n % 31 + 1}::INSTR', f'ASRL{n}::INSTR'])
+            configs.append({'addr': addr, 'idn': rng.choice(_FOREIGN_IDNS).format(n), 'foreign': True, 'delay': delay})
+        else:
+            model = rng.choice(['PM100A', 'PM100D'])
+            (sensor, min_wl, max_wl) = rng.choice(_SENSORS)
+            power_range = rng.choice([1e-4, 1e-3, 1e-2, 1e-1, 1.0])
+            configs.append({
+                'addr':            f'USB0::0x1313::{"0x8079" if model == "PM100A" else "0x8078"}::P{n:07d}::INSTR',
+                'idn':             f'Thorlabs,{model},P{n:07d},1.7.0',
+                'sensor_idn':      f'{sensor},{n:08d},01-Jan-2020,1,18,289',
+                'min_wl':          min_wl,
+                'max_wl':          max_wl,
+                'wavelength':      rng.randrange(min_wl, max_wl, 10),
+                'phase':           rng.uniform(0, 2 * math.pi),
+                'min_power_range': 1e-4,
+                'max_power_range': 10.0,
+                'power_range':     power_range,
+                'auto_power_range': rng.random() < 0.5,
+                'power_units':     'W',
+                'delay':           delay,
+            })
+    return configs
+
+
+def set_default_devices(devices=None):
+    '''
+    Set the devices simulated by the :class:`ResourceManager` objects created afterwards without
+    specifying ``devices``. This includes the resource managers of ``ThorlabsPM100x(virtual=True)``
+    drivers created in this process (but not of the drivers running in a child process, see
+    :mod:`pyThorlabsPM100x.worker`).
+
+    Parameters
+    ----------
+    devices : int or list of dict, optional
+        Either the number of devices to generate (see :func:`generate_device_configs`), or a list of
+        device configurations. Default is ``None``, which restores the three default devices.
+    '''
+    global _default_devices
+    if devices is None:
+        _default_devices = _DEVICE_CONFIGS
+    elif isinstance(devices, int):
+        _default_devices = generate_device_configs(devices)
+    else:
+        _default_devices = list(devices)
+
 
 class VisaIOError(Exception):
     '''
     Simulated VISA I/O error, raised by :class:`_VirtualInstrument` and
     :class:`ResourceManager` in the same situations where ``pyvisa.VisaIOError``
     would be raised by the real pyvisa library (unrecognized SCPI commands,
-    unknown resource addresses, etc.).
+    unknown resource addresses, timeouts, etc.).
+
+    Attributes
+    ----------
+    error_code : int or None
+        VISA error code (e.g. :data:`VI_ERROR_TMO` for timeouts), or ``None``.
     '''
-    pass
+    def __init__(self, message, error_code=None):
+        super().__init__(message)
+        self.error_code = error_code
+
+
+_WAVE_TABLE_SIZE = 4096     # Number of points per period of the precomputed sinusoid
+_SINE_TABLE = [math.sin(2 * math.pi * k / _WAVE_TABLE_SIZE) for k in range(_WAVE_TABLE_SIZE)]
+_NOISE_TABLE_SIZE = 4096    # Number of precomputed noise values of each device (used cyclically)
+
+
+class _Signal:
+    """
+    Simulated power of a virtual device, computed from precomputed tables (so that each reading only
+    costs a few table lookups).
+
+    The power at time ``t`` is ``offset + amplitude*sin(phase + 2*pi*t/period) + drift*(t - t0) + S(t) + noise*n``,
+    where ``t0`` is the time at which the ``ResourceManager`` was created, ``S(t)`` is the sum of the
+    steps which occurred before ``t`` and ``n`` is the next value of a precomputed table of normally
+    distributed numbers. The parameters are read from the optional keys ``'offset'`` (default 1),
+    ``'amplitude'`` (default 1), ``'phase'`` (default 0), ``'period'`` (in s, default 5), ``'drift'``
+    (in W/s, default 0), ``'steps'`` (list of ``(time since t0, change of power)``, default empty)
+    and ``'noise'`` (standard deviation, default 0) of the device configuration.
+    """
+
+    def __init__(self, config, t0):
+        self.offset = config.get('offset', 1.0)
+        self.amplitude = config.get('amplitude', 1.0)
+        self.period = config.get('period', 5.0)
+        self.drift = config.get('drift', 0.0)
+        self.noise = config.get('noise', 0.0)
+        self.t0 = t0
+        self._phase_index = config.get('phase', 0.0) / (2 * math.pi) * _WAVE_TABLE_SIZE
+        steps = sorted(config.get('steps', ()))
+        self._step_times = [t for (t, _) in steps]
+        self._step_levels = list(itertools.accumulate(delta for (_, delta) in steps))  # Total change of power after each step
+        rng = random.Random(config.get('addr'))     # Seeded with the address, so that the noise of each device is reproducible
+        self._noise_table = [rng.gauss(0, 1) for _ in range(_NOISE_TABLE_SIZE)] if self.noise else None
+        self._count = 0
+
+    def value(self, t):
+        index = int(self._phase_index + t / self.period * _WAVE_TABLE_SIZE) % _WAVE_TABLE_SIZE
+        value = self.offset + self.amplitude * _SINE_TABLE[index]
+        if self.drift:
+            value += self.drift * (t - self.t0)
+        if self._step_times:
+            n = bisect.bisect_right(self._step_times, t - self.t0)
+            if n:
+                value += self._step_levels[n - 1]
+        if self._noise_table:
+            value += self.noise * self._noise_table[self._count % _NOISE_TABLE_SIZE]
+            self._count += 1
+        return value
+
+
+def _header_forms(pattern):
+    # Return all the (uppercase) headers matching a SCPI header pattern such as '[SENSe]:CORRection:WAVelength',
+    # where each node can be written in its long form or in its short form (its uppercase letters), and the nodes
+    # in square brackets can be omitted
+    forms = ['']
+    for node in pattern.split(':'):
+        name = node.strip('[]')
+        variants = {name.upper(), ''.join(c for c in name if not c.islower())}
+        if node.startswith('['):
+            variants.add(None)
+        forms = [form if v is None else (form + ':' + v if form else v) for form in forms for v in variants]
+    return forms
+
+
+def _compile_table(commands):
+    # Build the dispatch table {header: handler} of all the forms of a list of (pattern, handler)
+    return {form: handler for (pattern, handler) in commands for form in _header_forms(pattern)}
+
+
+def _limit(arg, value, minimum, maximum):
+    # Answer of a query which accepts the parameters MIN and MAX
+    arg = arg.upper()
+    if arg in ('MIN', 'MINIMUM'):
+        return minimum
+    if arg in ('MAX', 'MAXIMUM'):
+        return maximum
+    if arg:
+        raise ValueError(f"Invalid parameter {arg!r}")
+    return value
+
+
+def _boolean(arg):
+    arg = arg.upper()
+    if arg in ('ON', '1'):
+        return True
+    if arg in ('OFF', '0'):
+        return False
+    raise ValueError(f"Invalid parameter {arg!r}")
+
+
+_MESSAGE_CACHE_SIZE = 4096  # Maximum number of parsed messages kept in cache
+_parsed_messages = {}
+
+
+def _parse_message(message):
+    # Parse a SCPI message into a tuple of commands (header, handler, parameter, is_query). Since the same messages are sent
+    # over and over (e.g. 'measure:power?'), parsed messages are cached
+    try:
+        return _parsed_messages[message]
+    except KeyError:
+        pass
+    commands = []
+    path = ''   # Path of the previous command, used to complete relative headers
+    for command in message.split(';'):
+        (header, _, arg) = command.strip().partition(' ')
+        if not header:
+            continue
+        header = header.upper()
+        if header.startswith(':'):
+            header = header[1:]
+        elif not header.startswith('*'):
+            header = path + header
+        is_query = header.endswith('?')
+        if is_query:
+            header = header[:-1]
+        if not header.startswith('*'):
+            path = header[:header.rfind(':') + 1]
+        handler = (_QUERIES if is_query else _WRITES).get(header)
+        if handler is None:
+            raise VisaIOError(f"Unrecognised {'query' if is_query else 'command'}: {command.strip()!r}")
+        commands.append((header, handler, arg.strip(), is_query))
+    if len(_parsed_messages) >= _MESSAGE_CACHE_SIZE:
+        _parsed_messages.clear()
+    _parsed_messages[message] = commands = tuple(commands)
+    return commands
 
 
 class _VirtualInstrument:
@@ -72,20 +319,30 @@ class _VirtualInstrument:
     :class:`ResourceManager`, so changes made via :meth:`write` persist across
     multiple :meth:`query` calls and survive re-opening the same virtual resource.
 
+    Commands are parsed as SCPI messages: headers are case-insensitive, each node can be written in
+    its short or long form (e.g. ``SENS:CORR:WAV?`` or ``sense:correction:wavelength?``), optional
+    nodes (in square brackets below) can be omitted, and several commands can be sent in a single
+    message, separated by ``;`` (a command which does not start with ``:`` or ``*`` is relative to
+    the path of the previous one, e.g. ``POW:DC:RANG:AUTO OFF;:POW:DC:RANG 0.01;RANG?``). Each header is
+    looked up in a precompiled dispatch table, and parsed messages are cached.
+
     Supported SCPI commands
     -----------------------
     Queries (``query``):
-        ``*IDN?``, ``measure:power?``, ``power:dc:unit?``, ``SENS:CORR:WAV?``,
-        ``SENS:CORR:WAV? MIN``, ``SENS:CORR:WAV? MAX``, ``POW:DC:RANG? MIN``,
-        ``POW:DC:RANG? MAX``, ``POW:DC:RANG:AUTO?``, ``POW:DC:RANG?``
+        ``*IDN?``, ``SYSTem:SENSor:IDN?``, ``MEASure[:SCALar]:POWer?``, ``[SENSe]:POWer[:DC]:UNIT?``,
+        ``[SENSe]:CORRection:WAVelength? [MIN|MAX]``, ``[SENSe]:POWer[:DC]:RANGe[:UPPer]? [MIN|MAX]``,
+        ``[SENSe]:POWer[:DC]:RANGe:AUTO?``, ``[SENSe]:CORRection:COLLect:ZERO:STATe?`` (``1`` during the
+        :data:`ZERO_DURATION` seconds following a zero command, ``0`` otherwise)
 
     Writes (``write``):
-        ``SENS:CORR:WAV <value>``, ``POW:DC:RANG:AUTO ON``,
-        ``POW:DC:RANG:AUTO OFF``, ``POW:DC:RANG <value>``,
-        ``sense:correction:collect:zero``
+        ``[SENSe]:CORRection:WAVelength <value>``, ``[SENSe]:POWer[:DC]:RANGe:AUTO ON|OFF|1|0``,
+        ``[SENSe]:POWer[:DC]:RANGe[:UPPer] <value>``, ``[SENSe]:POWer[:DC]:UNIT W|DBM``,
+        ``[SENSe]:CORRection:COLLect:ZERO[:INITiate]``
+
+    Instruments of other vendors (configurations with ``'foreign'`` set) only answer ``*IDN?``.
     """
 
-    def __init__(self, state: dict):
+    def __init__(self, state: dict, clock):
         '''
         Parameters
         ----------
@@ -93,84 +350,127 @@ class _VirtualInstrument:
             Mutable state dictionary for this virtual device, shared with the
             :class:`ResourceManager` that created it. Must contain the keys defined
             in ``_DEVICE_CONFIGS``.
+        clock : object
+            Clock giving the simulated time (see :mod:`pyThorlabsPM100x.clock`).
         '''
         self._s = state  # mutable; shared with ResourceManager so state persists
+        self._clock = clock
+
+    def _check_responsive(self, cmd):
+        # Simulate the time taken by the device to answer, and the timeout of unresponsive devices
+        if self._s.get('delay'):
+            self._clock.sleep(self._s['delay'])
+        if not self._s.get('responsive', True):
+            raise VisaIOError(f"Timeout expired before operation completed: {cmd!r}", VI_ERROR_TMO)
+
+    def _execute(self, message):
+        # Execute all the commands of a SCPI message, and return the list of answers of the queries
+        answers = []
+        for (header, handler, arg, is_query) in _parse_message(message):
+            if self._s.get('foreign') and header != '*IDN':
+                raise VisaIOError(f"Unrecognised {'query' if is_query else 'command'}: {message.strip()!r}")
+            try:
+                answer = handler(self, arg)
+            except ValueError as e:
+                raise VisaIOError(f"Invalid command {message.strip()!r}: {e}") from None
+            if is_query:
+                answers.append(answer)
+        return answers
 
     def query(self, cmd: str) -> str:
         '''
-        Send a SCPI query to the simulated instrument and return its response.
+        Send a SCPI message to the simulated instrument and return its response.
 
-        The simulated power (``measure:power?``) is a sinusoid oscillating between
-        0 and 2 with a period of 5 seconds, offset by a per-device phase.
+        The simulated power (``measure:power?``) is, by default, a sinusoid oscillating between
+        0 and 2 with a period of 5 seconds (of the simulated time), offset by a per-device phase.
+        Noise, drift and steps can be added via the device configuration (see :class:`_Signal`).
 
         Parameters
         ----------
         cmd : str
-            SCPI query string (leading/trailing whitespace is stripped).
+            SCPI message, containing one or more commands separated by ``;``.
 
         Returns
         -------
         str
-            The simulated instrument response.
+            The simulated instrument response. If the message contains several queries, their
+            answers are separated by ``;``.
 
         Raises
         ------
         VisaIOError
-            If ``cmd`` is not one of the supported query strings.
+            If any command of ``cmd`` is not supported or has an invalid parameter, if ``cmd``
+            contains no query, or if the device is unresponsive.
         '''
-        cmd = cmd.strip()
-        s = self._s
-        if cmd == '*IDN?':
-            return s['idn']
-        if cmd == 'measure:power?':
-            value = math.sin(s['phase'] + 2 * math.pi * time.time() / 5) + 1
-            return str(value)
-        if cmd == 'power:dc:unit?':
-            return s['power_units']
-        if cmd == 'SENS:CORR:WAV?':
-            return str(float(s['wavelength']))
-        if cmd == 'SENS:CORR:WAV? MIN':
-            return str(float(s['min_wl']))
-        if cmd == 'SENS:CORR:WAV? MAX':
-            return str(float(s['max_wl']))
-        if cmd == 'POW:DC:RANG? MIN':
-            return str(s['min_power_range'])
-        if cmd == 'POW:DC:RANG? MAX':
-            return str(s['max_power_range'])
-        if cmd == 'POW:DC:RANG:AUTO?':
-            return '1' if s['auto_power_range'] else '0'
-        if cmd == 'POW:DC:RANG?':
-            return str(s['power_range'])
-        raise VisaIOError(f"Unrecognised query: {cmd!r}")
+        self._check_responsive(cmd)
+        answers = self._execute(cmd)
+        if not answers:
+            raise VisaIOError(f"Timeout expired before operation completed: {cmd!r} has no answer", VI_ERROR_TMO)
+        return ';'.join(answers)
 
     def write(self, cmd: str) -> None:
         '''
-        Send a SCPI write command to the simulated instrument, updating its state.
+        Send a SCPI message to the simulated instrument, updating its state.
 
         Parameters
         ----------
         cmd : str
-            SCPI write command string (leading/trailing whitespace is stripped).
+            SCPI message, containing one or more commands separated by ``;``. The answers of any
+            query it contains are discarded.
 
         Raises
         ------
         VisaIOError
-            If ``cmd`` is not one of the supported write commands.
+            If any command of ``cmd`` is not supported or has an invalid parameter, or if the
+            device is unresponsive.
         '''
-        cmd = cmd.strip()
+        self._check_responsive(cmd)
+        self._execute(cmd)
+
+    # Handlers of the SCPI commands. Each one receives the parameter of the command (empty string if none)
+
+    def _query_idn(self, arg):
+        return self._s['idn']
+
+    def _query_sensor_idn(self, arg):
+        return self._s['sensor_idn']
+
+    def _query_power(self, arg):
+        return '%.6E' % self._s['signal'].value(self._clock.time())     # Same format as the answers of the real consoles
+
+    def _query_units(self, arg):
+        return self._s['power_units']
+
+    def _write_units(self, arg):
+        if arg.upper() not in ('W', 'DBM'):
+            raise ValueError(f"Invalid units {arg!r}")
+        self._s['power_units'] = 'W' if arg.upper() == 'W' else 'dBm'
+
+    def _query_wavelength(self, arg):
         s = self._s
-        if cmd.startswith('SENS:CORR:WAV '):
-            s['wavelength'] = int(float(cmd.split(' ', 1)[1]))
-        elif cmd == 'POW:DC:RANG:AUTO ON':
-            s['auto_power_range'] = True
-        elif cmd == 'POW:DC:RANG:AUTO OFF':
-            s['auto_power_range'] = False
-        elif cmd.startswith('POW:DC:RANG '):
-            s['power_range'] = float(cmd.split(' ', 1)[1])
-        elif cmd == 'sense:correction:collect:zero':
-            pass  # zeroing is a no-op in simulation
-        else:
-            raise VisaIOError(f"Unrecognised write command: {cmd!r}")
+        return str(float(_limit(arg, s['wavelength'], s['min_wl'], s['max_wl'])))
+
+    def _write_wavelength(self, arg):
+        self._s['wavelength'] = int(float(arg))
+
+    def _query_power_range(self, arg):
+        s = self._s
+        return str(_limit(arg, s['power_range'], s['min_power_range'], s['max_power_range']))
+
+    def _write_power_range(self, arg):
+        self._s['power_range'] = float(arg)
+
+    def _query_auto_power_range(self, arg):
+        return '1' if self._s['auto_power_range'] else '0'
+
+    def _write_auto_power_range(self, arg):
+        self._s['auto_power_range'] = _boolean(arg)
+
+    def _write_zero(self, arg):
+        self._s['zero_end'] = self._clock.time() + ZERO_DURATION  # zeroing only takes some time in simulation
+
+    def _query_zero_state(self, arg):
+        return '1' if self._clock.time() < self._s.get('zero_end', 0) else '0'
 
     def before_close(self) -> None:
         '''No-op. Provided for API compatibility with pyvisa resources.'''
@@ -192,12 +492,32 @@ class _VirtualInstrument:
         pass
 
 
+# Dispatch tables of the SCPI queries and writes, in the format {header: handler}, with all the accepted forms of each header
+_QUERIES = _compile_table([
+    ('*IDN', _VirtualInstrument._query_idn),
+    ('SYSTem:SENSor:IDN', _VirtualInstrument._query_sensor_idn),
+    ('MEASure:[SCALar]:POWer', _VirtualInstrument._query_power),
+    ('[SENSe]:POWer:[DC]:UNIT', _VirtualInstrument._query_units),
+    ('[SENSe]:CORRection:WAVelength', _VirtualInstrument._query_wavelength),
+    ('[SENSe]:POWer:[DC]:RANGe:[UPPer]', _VirtualInstrument._query_power_range),
+    ('[SENSe]:POWer:[DC]:RANGe:AUTO', _VirtualInstrument._query_auto_power_range),
+    ('[SENSe]:CORRection:COLLect:ZERO:STATe', _VirtualInstrument._query_zero_state),
+])
+_WRITES = _compile_table([
+    ('[SENSe]:POWer:[DC]:UNIT', _VirtualInstrument._write_units),
+    ('[SENSe]:CORRection:WAVelength', _VirtualInstrument._write_wavelength),
+    ('[SENSe]:POWer:[DC]:RANGe:[UPPer]', _VirtualInstrument._write_power_range),
+    ('[SENSe]:POWer:[DC]:RANGe:AUTO', _VirtualInstrument._write_auto_power_range),
+    ('[SENSe]:CORRection:COLLect:ZERO:[INITiate]', _VirtualInstrument._write_zero),
+])
+
+
 class ResourceManager:
     """
-    Simulated pyvisa ``ResourceManager``, advertising three virtual PM100x devices.
+    Simulated pyvisa ``ResourceManager``, advertising three virtual PM100x devices by default.
 
-    Each instance gets its own independent copy of the device state (deep-copied
-    from ``_DEVICE_CONFIGS``), so multiple :class:`ResourceManager` instances do
+    Each instance gets its own independent copy of the device state (copied
+    from the device configurations), so multiple :class:`ResourceManager` instances do
     not share state. Within a single instance, state changes made via
     :meth:`~_VirtualInstrument.write` on an opened resource persist for the
     lifetime of that ``ResourceManager``.
@@ -210,14 +530,46 @@ class ResourceManager:
         PM100D, wavelength range 700–1800 nm.
     ``VIRTUAL2::INSTR``
         PM100D, wavelength range 400–15000 nm.
+
+    Other devices can be simulated by passing ``devices``, or by calling :func:`set_default_devices`.
+
+    Attributes
+    ----------
+    clock : object
+        Clock giving the simulated time of all devices (see :mod:`pyThorlabsPM100x.clock`).
     """
 
-    def __init__(self):
+    def __init__(self, devices=None, clock=None):
         '''
         Initialize the resource manager with independent copies of all device states.
+
+        Parameters
+        ----------
+        devices : int or list of dict, optional
+            Either the number of devices to generate (see :func:`generate_device_configs`), or a
+            list of device configurations. Default is ``None``, which uses the devices set by
+            :func:`set_default_devices` (the three devices listed above, unless changed).
+        clock : object, optional
+            Clock giving the simulated time (see :mod:`pyThorlabsPM100x.clock`). Default is
+            ``None``, which uses a :class:`~pyThorlabsPM100x.clock.WallClock`.
+
+        Raises
+        ------
+        ValueError
+            If two devices have the same address.
         '''
-        # Deep-copy configs so each ResourceManager instance has independent state.
-        self._states = [dict(cfg) for cfg in _DEVICE_CONFIGS]
+        self.clock = clock if clock is not None else WallClock()
+        if devices is None:
+            devices = _default_devices
+        elif isinstance(devices, int):
+            devices = generate_device_configs(devices)
+        # Copy configs so each ResourceManager instance has independent state. States are indexed by address
+        self._states = {cfg['addr']: dict(cfg) for cfg in devices}
+        if len(self._states) != len(devices):
+            raise ValueError("The addresses of the virtual devices must be unique.")
+        t0 = self.clock.time()
+        for state in self._states.values():
+            state['signal'] = _Signal(state, t0)
 
     def list_resources(self) -> tuple:
         '''
@@ -226,9 +578,9 @@ class ResourceManager:
         Returns
         -------
         tuple of str
-            VISA address strings for all three virtual devices.
+            VISA address strings for all virtual devices.
         '''
-        return tuple(s['addr'] for s in self._states)
+        return tuple(self._states)
 
     def open_resource(self, addr: str) -> _VirtualInstrument:
         '''
@@ -248,9 +600,9 @@ class ResourceManager:
         Raises
         ------
         VisaIOError
-            If ``addr`` does not match any of the three simulated device addresses.
+            If ``addr`` does not match any of the simulated device addresses.
         '''
-        for s in self._states:
-            if s['addr'] == addr:
-                return _VirtualInstrument(s)
-        raise VisaIOError(f"No virtual resource at address {addr!r}")
\ No newline at end of file
+        try:
+            return _VirtualInstrument(self._states[addr], self.clock)
+        except KeyError:
+            raise VisaIOError(f"No virtual resource at address {addr!r}") from None
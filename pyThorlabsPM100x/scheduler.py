@@ -0,0 +1,204 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Prioritized command queue which serializes all the communication with a device.
+
+Provides :class:`CommandScheduler`, which executes the commands submitted to it one at a time,
+on a single worker thread, in order of priority. Commands submitted by the user (e.g. a new
+wavelength) are executed before background commands (e.g. the software auto-ranging) and before
+the periodic power readings, and a command can supersede a pending command with the same key
+(e.g. only the last of several wavelengths typed before the device is free is actually written).
+Each command returns a :class:`concurrent.futures.Future` with its result.
+"""
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+PRIORITY_USER = 0           # Commands requested by the user (GUI, scripts, streaming clients)
+PRIORITY_BACKGROUND = 1     # Commands issued automatically (e.g. software auto-ranging, device watcher)
+PRIORITY_POLL = 2           # Periodic power readings
+
+
+class _Command:
+    __slots__ = ('function', 'args', 'key', 'future', 'superseded')
+
+    def __init__(self, function, args, key, future):
+        self.function = function
+        self.args = args
+        self.key = key
+        self.future = future
+        self.superseded = False
+
+
+class CommandScheduler:
+    """
+    Execute commands one at a time on a worker thread, in order of priority.
+
+    Commands with the same priority are executed in the order in which they were submitted.
+    If a command is submitted with a ``key``, any command with the same key which is still
+    waiting to be executed is dropped (and its future is cancelled), so that only the most
+    recent one is executed.
+
+    Attributes
+    ----------
+    name : str
+        Name of the worker thread.
+    executed : int
+        Number of commands executed so far.
+    coalesced : int
+        Number of commands dropped because they were superseded by a more recent one.
+    """
+
+    def __init__(self, name='CommandScheduler'):
+        '''
+        Parameters
+        ----------
+        name : str, optional
+            Name of the worker thread. Default is ``'CommandScheduler'``.
+        '''
+        self.name = name
+        self.executed = 0
+        self.coalesced = 0
+        self._queue = []        # Heap of (priority, sequence number, command)
+        self._pending = {}      # Commands waiting to be executed, indexed by key (only commands with a key)
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        with self._condition:
+            return sum(1 for (_, _, command) in self._queue if not command.superseded)
+
+    def submit(self, function, *args, priority=PRIORITY_USER, key=None):
+        '''
+        Queue the call ``function(*args)``.
+
+        Parameters
+        ----------
+        function : callable
+            The function to call on the worker thread.
+        *args
+            Arguments passed to ``function``.
+        priority : int, optional
+            :data:`PRIORITY_USER` (default), :data:`PRIORITY_BACKGROUND` or :data:`PRIORITY_POLL`.
+            Lower values are executed first.
+        key : hashable, optional
+            If specified, any command submitted earlier with the same key, and not executed yet,
+            is dropped.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future which receives the return value of ``function`` (or the exception it raised).
+            It is cancelled if the command is superseded, or if the scheduler is closed before
+            the command is executed.
+
+        Raises
+        ------
+        RuntimeError
+            If the scheduler was closed.
+        '''
+        future = Future()
+        command = _Command(function, args, key, future)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The command scheduler was closed.")
+            if key is not None:
+                old = self._pending.pop(key, None)
+                if old:
+                    old.superseded = True
+                    old.future.cancel()
+                    self.coalesced += 1
+                self._pending[key] = command
+            heapq.heappush(self._queue, (priority, next(self._counter), command))
+            self._condition.notify()
+        return future
+
+    def is_pending(self, key):
+        '''Return ``True`` if a command submitted with ``key`` is waiting to be executed.'''
+        with self._condition:
+            return key in self._pending
+
+    def call(self, function, *args, priority=PRIORITY_USER, timeout=None):
+        '''
+        Queue the call ``function(*args)``, wait until it is executed, and return its result.
+
+        If called from the worker thread itself (i.e. by a command being executed), ``function``
+        is called immediately.
+
+        Parameters
+        ----------
+        function : callable
+            The function to call on the worker thread.
+        *args
+            Arguments passed to ``function``.
+        priority : int, optional
+            See :meth:`submit`. Default is :data:`PRIORITY_USER`.
+        timeout : float, optional
+            Maximum time to wait, in seconds. Default is ``None`` (wait indefinitely).
+
+        Returns
+        -------
+        object
+            The return value of ``function``. Any exception raised by ``function`` is raised again.
+        '''
+        if threading.current_thread() is self._thread:
+            return function(*args)
+        return self.submit(function, *args, priority=priority).result(timeout)
+
+    def flush(self, timeout=None):
+        '''
+        Wait until all the commands submitted so far have been executed.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait, in seconds. Default is ``None`` (wait indefinitely).
+        '''
+        self.call(lambda: None, priority=PRIORITY_POLL, timeout=timeout)
+
+    def close(self, timeout=5):
+        '''
+        Cancel all the commands not executed yet, and stop the worker thread once the command
+        being executed (if any) is finished.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait for the worker thread to stop, in seconds. Default is 5.
+        '''
+        with self._condition:
+            self._closed = True
+            for (_, _, command) in self._queue:
+                command.future.cancel()
+            self._queue = []
+            self._pending = {}
+            self._condition.notify()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                (_, _, command) = heapq.heappop(self._queue)
+                if command.superseded:
+                    continue
+                if command.key is not None:
+                    del self._pending[command.key]
+            if not command.future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = command.function(*command.args)
+            except Exception as e:
+                command.future.set_exception(e)
+            else:
+                command.future.set_result(result)
+            self.executed += 1
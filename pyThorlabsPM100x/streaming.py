@@ -0,0 +1,379 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Local socket streaming server for pyThorlabsPM100x.
+
+Provides :class:`StreamServer`, which fans out the power readings acquired by an
+:class:`~pyThorlabsPM100x.main.interface` to any number of clients connected over a
+local TCP socket or a Unix domain socket. This module only depends on the Python
+standard library, and does not use Qt.
+
+Wire format
+-----------
+Every message sent by the server is a *frame*, made of an 8-byte header followed by a
+payload. The header is packed as ``'<2sBBI'``:
+
+==========  =======  ===============================================================
+Field       Type     Description
+==========  =======  ===============================================================
+magic       2 bytes  Always ``b'PM'``.
+version     uint8    Protocol version (currently 1).
+type        uint8    :data:`FRAME_DATA` or :data:`FRAME_REPLY`.
+count       uint32   Number of samples (``FRAME_DATA``) or of bytes (``FRAME_REPLY``).
+==========  =======  ===============================================================
+
+The payload of a ``FRAME_DATA`` frame is ``count`` pairs of little-endian doubles
+``(timestamp, value)``, where ``timestamp`` is in seconds since the epoch. The payload
+of a ``FRAME_REPLY`` frame is a UTF-8 string, sent in answer to a command.
+
+Command channel
+---------------
+Clients can send newline-terminated ASCII commands to the server. Supported commands
+(case-insensitive) are ``WAV <nm>``, ``RANGE <watts>``, ``RANGE UP``, ``RANGE DOWN``,
+``AUTO ON``, ``AUTO OFF`` and ``ZERO``. Each command is answered by a ``FRAME_REPLY``
+frame containing either ``'OK'``, ``'ERR <message>'``, or ``'PENDING'`` if the command was
+accepted but not executed yet (e.g. because the device is busy): it will be executed later.
+"""
+
+import collections
+import math
+import os
+import socket
+import stat
+import struct
+import threading
+
+FRAME_HEADER = struct.Struct('<2sBBI')
+FRAME_MAGIC = b'PM'
+FRAME_VERSION = 1
+FRAME_DATA = 1
+FRAME_REPLY = 2
+
+COMMANDS = ('WAV', 'RANGE', 'AUTO', 'ZERO')
+PENDING = 'PENDING'     # Value returned by a command handler for a command accepted but not executed yet
+
+
+def encode_data_frame(timestamps, values):
+    '''
+    Encode a block of samples into a ``FRAME_DATA`` frame.
+
+    Parameters
+    ----------
+    timestamps : sequence of float
+        Acquisition time of each sample, in seconds since the epoch.
+    values : sequence of float
+        Power value of each sample. Must have the same length as ``timestamps``.
+
+    Returns
+    -------
+    bytes
+        The encoded frame (header + payload).
+    '''
+    n = len(values)
+    interleaved = [x for pair in zip(timestamps, values) for x in pair]
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_DATA, n) + struct.pack(f'<{2*n}d', *interleaved)
+
+
+def encode_reply_frame(text):
+    '''
+    Encode a text answer into a ``FRAME_REPLY`` frame.
+
+    Parameters
+    ----------
+    text : str
+        The reply to be sent to the client.
+
+    Returns
+    -------
+    bytes
+        The encoded frame (header + payload).
+    '''
+    payload = text.encode('utf-8')
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_REPLY, len(payload)) + payload
+
+
+def decode_frames(buffer):
+    '''
+    Decode all complete frames contained in ``buffer``. Useful for writing clients.
+
+    Parameters
+    ----------
+    buffer : bytes or bytearray
+        Raw bytes received from the server.
+
+    Returns
+    -------
+    (frames, remainder) : (list, bytes)
+        ``frames`` is a list of ``(type, content)`` tuples, where ``content`` is a list of
+        ``(timestamp, value)`` tuples for ``FRAME_DATA`` frames, or a string for
+        ``FRAME_REPLY`` frames. ``remainder`` contains the bytes of the last, incomplete frame
+        (if any), which should be prepended to the next chunk of received data.
+
+    Raises
+    ------
+    ValueError
+        If the buffer does not start with a valid frame header.
+    '''
+    frames = []
+    buffer = bytes(buffer)
+    while len(buffer) >= FRAME_HEADER.size:
+        magic, version, frame_type, count = FRAME_HEADER.unpack_from(buffer)
+        if magic != FRAME_MAGIC:
+            raise ValueError("Invalid frame header.")
+        size = 16*count if frame_type == FRAME_DATA else count
+        if len(buffer) < FRAME_HEADER.size + size:
+            break
+        payload = buffer[FRAME_HEADER.size:FRAME_HEADER.size + size]
+        if frame_type == FRAME_DATA:
+            data = struct.unpack(f'<{2*count}d', payload)
+            frames.append((frame_type, list(zip(data[0::2], data[1::2]))))
+        else:
+            frames.append((frame_type, payload.decode('utf-8')))
+        buffer = buffer[FRAME_HEADER.size + size:]
+    return frames, buffer
+
+
+def parse_command(line):
+    '''
+    Parse and validate a command received from a client.
+
+    Parameters
+    ----------
+    line : str
+        A single command line, e.g. ``'WAV 800'`` or ``'range up'``.
+
+    Returns
+    -------
+    (name, argument) : (str, object)
+        ``name`` is one of :data:`COMMANDS`. ``argument`` is an ``int`` (wavelength), a ``float``
+        (power range), ``+1``/``-1`` (``RANGE UP``/``RANGE DOWN``), a ``bool`` (``AUTO``), or
+        ``None`` (``ZERO``).
+
+    Raises
+    ------
+    ValueError
+        If the command is unknown or its argument is not valid (including non-finite numbers,
+        such as ``inf`` or ``nan``).
+    '''
+    parts = line.strip().split()
+    if not parts:
+        raise ValueError("Empty command.")
+    name = parts[0].upper()
+    args = parts[1:]
+    if name not in COMMANDS:
+        raise ValueError(f"Unknown command {parts[0]!r}.")
+    if name == 'ZERO':
+        if args:
+            raise ValueError("ZERO does not take any argument.")
+        return name, None
+    if len(args) != 1:
+        raise ValueError(f"{name} requires exactly one argument.")
+    arg = args[0].upper()
+    if name == 'AUTO':
+        if arg not in ('ON', 'OFF'):
+            raise ValueError("AUTO must be followed by ON or OFF.")
+        return name, arg == 'ON'
+    if name == 'RANGE' and arg in ('UP', 'DOWN'):
+        return name, +1 if arg == 'UP' else -1
+    value = float(arg)
+    if not math.isfinite(value):
+        raise ValueError(f"Invalid argument {args[0]!r}.")
+    return name, int(value) if name == 'WAV' else value
+
+
+class _StreamClient:
+    """
+    A client connected to a :class:`StreamServer`.
+
+    Outgoing frames are stored in a bounded queue (a ``collections.deque`` with ``maxlen``).
+    When the queue is full, the oldest frame is dropped to make room for the new one, so that
+    a slow client never blocks the server (and therefore the acquisition). A dedicated thread
+    sends queued frames to the socket, and another one reads incoming commands.
+    """
+
+    def __init__(self, server, sock, queue_size):
+        self.server = server
+        self.sock = sock
+        self.queue = collections.deque(maxlen=queue_size)
+        self.condition = threading.Condition()
+        self.dropped_frames = 0     #Number of frames discarded because this client was too slow
+        self.running = True
+        self.sender = threading.Thread(target=self._send_loop, daemon=True)
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.sender.start()
+        self.reader.start()
+
+    def push(self, frame):
+        with self.condition:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped_frames += 1
+            self.queue.append(frame)
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _send_loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                frames = list(self.queue)
+                self.queue.clear()
+            try:
+                self.sock.sendall(b''.join(frames))
+            except OSError:
+                self.server._remove_client(self)
+                return
+
+    def _read_loop(self):
+        stream = self.sock.makefile('r', encoding='ascii', errors='replace', newline='\n')
+        try:
+            for line in stream:
+                if not line.strip():
+                    continue
+                self.push(encode_reply_frame(self.server._handle_command(line)))
+        except (OSError, ValueError):
+            pass
+        self.server._remove_client(self)
+
+
+class StreamServer:
+    """
+    Fan out power readings to many clients over a local TCP or Unix domain socket.
+
+    Samples are passed to :meth:`publish`, which encodes them once and appends the
+    resulting frame to the bounded queue of each connected client. :meth:`publish` never
+    blocks on the network: slow clients lose their oldest frames instead (drop-oldest
+    backpressure).
+
+    Attributes
+    ----------
+    address : (str, int) or str
+        Address the server is listening on. For TCP servers this is the ``(host, port)``
+        tuple actually bound (useful when ``port=0`` was requested).
+    queue_size : int
+        Maximum number of frames queued for each client.
+    command_handler : callable or None
+        Function called with ``(name, argument)`` (see :func:`parse_command`) whenever a
+        client sends a valid command. It is called from the client's reader thread. It must
+        return ``None`` on success, :data:`PENDING` if the command will be executed later, or an
+        error message. If ``None``, commands are rejected.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), queue_size=256, command_handler=None):
+        '''
+        Parameters
+        ----------
+        address : (str, int) or str, optional
+            Either a ``(host, port)`` tuple for a TCP server, or a filesystem path for a Unix
+            domain socket. Default is ``('127.0.0.1', 0)``, i.e. a TCP server on localhost on
+            a port chosen by the operating system. A socket file already existing at the path
+            (e.g. left over by a server which crashed) is replaced.
+        queue_size : int, optional
+            Maximum number of frames queued for each client. Default is 256.
+        command_handler : callable, optional
+            See :attr:`command_handler`.
+
+        Raises
+        ------
+        FileExistsError
+            If ``address`` is the path of an existing file which is not a socket.
+        OSError
+            If the socket cannot be bound.
+        '''
+        if queue_size < 1:
+            raise ValueError("queue_size must be a positive integer.")
+        self.queue_size = queue_size
+        self.command_handler = command_handler
+        self.clients = []
+        self._lock = threading.Lock()
+        if isinstance(address, str):
+            if os.path.exists(address):
+                if not stat.S_ISSOCK(os.stat(address).st_mode):
+                    raise FileExistsError(f"{address} exists and is not a socket.")
+                os.unlink(address)  # Left over by a previous server
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(address)
+        self._socket.listen()
+        self.address = self._socket.getsockname()
+        self.running = True
+        self._accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._accept_thread.start()
+
+    def publish(self, timestamps, values):
+        '''
+        Send a block of samples to all connected clients.
+
+        Parameters
+        ----------
+        timestamps : sequence of float
+            Acquisition time of each sample, in seconds since the epoch.
+        values : sequence of float
+            Power value of each sample.
+        '''
+        if not self.clients or len(values) == 0:
+            return
+        frame = encode_data_frame(timestamps, values)
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.push(frame)
+
+    def close(self):
+        '''Stop accepting connections, disconnect all clients and close the listening socket.'''
+        self.running = False
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)     # Closing the socket alone does not interrupt a blocked accept() on Linux
+        except OSError:
+            pass
+        self._socket.close()
+        self._accept_thread.join(timeout=1)
+        with self._lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+        if isinstance(self.address, str) and os.path.exists(self.address) and stat.S_ISSOCK(os.stat(self.address).st_mode):
+            os.unlink(self.address)
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                sock, _ = self._socket.accept()
+            except OSError:
+                return
+            client = _StreamClient(self, sock, self.queue_size)
+            with self._lock:
+                self.clients.append(client)
+
+    def _remove_client(self, client):
+        with self._lock:
+            if client not in self.clients:
+                return
+            self.clients.remove(client)
+        client.close()
+
+    def _handle_command(self, line):
+        # Any exception is turned into an error reply, so that a bad command cannot stop the reader thread of a client
+        try:
+            name, argument = parse_command(line)
+            if self.command_handler is None:
+                return "ERR Commands are not enabled on this server."
+            error = self.command_handler(name, argument)
+        except Exception as e:
+            return f"ERR {e}"
+        if error is None:
+            return "OK"
+        return PENDING if error is PENDING else f"ERR {error}"
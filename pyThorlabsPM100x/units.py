@@ -0,0 +1,80 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Vectorized conversion of power values between the units supported by pyThorlabsPM100x.
+
+All data acquired by :class:`~pyThorlabsPM100x.main.interface` are stored in watts
+(the canonical unit). The functions of this module convert blocks of values from and
+to watts, so that data can be displayed or exported in any unit without changing the
+unit of the console.
+"""
+
+import numpy as np
+
+UNITS = ('W', 'mW', 'µW', 'nW', 'dBm')
+_LINEAR_SCALES = {'W': 1, 'mW': 1e-3, 'µW': 1e-6, 'nW': 1e-9}
+_ALIASES = {'uW': 'µW', 'DBM': 'dBm'}
+
+
+def normalize_units(units):
+    '''
+    Return the canonical name of ``units`` (e.g. ``'uW'`` becomes ``'µW'``).
+
+    Raises
+    ------
+    ValueError
+        If ``units`` is not one of the supported units (see :data:`UNITS`).
+    '''
+    units = str(units).strip()
+    units = _ALIASES.get(units, units)
+    if units not in UNITS:
+        raise ValueError(f"Unsupported power units {units!r}. Supported units are " + ", ".join(UNITS))
+    return units
+
+
+def to_watts(values, units):
+    '''
+    Convert power values from ``units`` to watts.
+
+    Parameters
+    ----------
+    values : float or array_like of float
+        Power values, expressed in ``units``.
+    units : str
+        One of :data:`UNITS`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The power values in watts.
+    '''
+    units = normalize_units(units)
+    values = np.asarray(values, dtype=float)
+    if units == 'dBm':
+        return 1e-3 * np.power(10, values / 10)
+    return values * _LINEAR_SCALES[units]
+
+
+def from_watts(values, units):
+    '''
+    Convert power values from watts to ``units``.
+
+    Parameters
+    ----------
+    values : float or array_like of float
+        Power values, in watts.
+    units : str
+        One of :data:`UNITS`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The power values in ``units``. When converting to ``'dBm'``, zero values become ``-inf``
+        and negative values become ``NaN``.
+    '''
+    units = normalize_units(units)
+    values = np.asarray(values, dtype=float)
+    if units == 'dBm':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 10 * np.log10(values / 1e-3)
+    return values / _LINEAR_SCALES[units]
@@ -0,0 +1,477 @@
+''' Note: most of docstrings in this file have been generated automatically by Claude. AI can make mistakes'''
+
+"""
+Process-isolated version of the :class:`~pyThorlabsPM100x.driver.ThorlabsPM100x` driver.
+
+:class:`ProcessDriver` starts a child process which owns the VISA session and the actual
+:class:`~pyThorlabsPM100x.driver.ThorlabsPM100x` object. Commands (connection, wavelength,
+power range, zero, ...) are sent to the child process through a pipe, while the power
+readings acquired continuously by the child process are written into a ring buffer in shared
+memory, from which they are read in blocks via :meth:`ProcessDriver.read_block`.
+
+Since the child process has its own interpreter (and its own GIL), the acquisition timing
+does not depend on how busy the process using the driver (e.g. a GUI) is.
+
+Child processes are created with the ``spawn`` start method. As for any other use of
+``multiprocessing``, scripts using this module must protect their entry point with
+``if __name__ == '__main__':``.
+"""
+
+import math
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import pyThorlabsPM100x.driver
+from pyThorlabsPM100x.clock import WallClock
+
+# Attributes of the driver which are copied back to the ProcessDriver after each command
+_MIRRORED_ATTRIBUTES = ['connected', 'model', 'model_user', 'being_zeroed', 'min_wavelength', 'max_wavelength',
+                        'list_valid_devices', '_wavelength', '_auto_power_range', '_power_range', '_power',
+                        '_power_units', '_min_power_range', '_max_power_range', 'sensor_idn']
+
+_HEADER_SIZE = 5    #The ring buffer starts with five int64: total number of samples written, error flag, total number of invalid readings,
+                    #VISA error code of the error which stopped the sampling, and total number of timeouts
+VI_ERROR_TMO = -1073807339      #VISA error code of timeouts
+_MAX_CONSECUTIVE_TIMEOUTS = 3   #Number of consecutive timeouts after which the child process stops sampling (i.e. a reading and its two retries)
+
+
+class VisaIOError(Exception):
+    '''
+    Raised by :class:`ProcessDriver` when a VISA I/O error occurs in the child process.
+
+    Attributes
+    ----------
+    error_code : int or None
+        The VISA error code of the original error (if any).
+    '''
+    def __init__(self, message, error_code=None):
+        super().__init__(message)
+        self.error_code = error_code
+
+
+class _Ring:
+    """
+    Ring buffer of ``(timestamp, value)`` samples stored in a shared memory block.
+    There is a single writer (the child process) and a single reader (the parent process).
+    """
+
+    def __init__(self, buf, capacity):
+        self.capacity = capacity
+        self.header = np.ndarray((_HEADER_SIZE,), dtype=np.int64, buffer=buf)
+        self.timestamps = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=8*_HEADER_SIZE)
+        self.values = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=8*(_HEADER_SIZE + capacity))
+
+    @staticmethod
+    def size_in_bytes(capacity):
+        return 8*(_HEADER_SIZE + 2*capacity)
+
+    def write(self, timestamp, value):
+        index = self.header[0] % self.capacity
+        self.timestamps[index] = timestamp
+        self.values[index] = value
+        self.header[0] += 1     #The counter is increased only after the sample has been written
+
+
+def _worker_main(conn, shm_name, capacity, model, virtual, profile_cache=None):
+    # Entry point of the child process. It owns the driver, executes the commands received via conn,
+    # and (when sampling is on) reads the power every `interval` seconds and writes it into the ring buffer
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = _Ring(shm.buf, capacity)
+    try:
+        driver = pyThorlabsPM100x.driver.ThorlabsPM100x(model=model, virtual=virtual, profile_cache=profile_cache)
+    except Exception as e:
+        conn.send(('error', type(e).__name__, str(e), None, {}))
+        return
+    conn.send(('ok', None, _state(driver)))  #Tell the parent process that the driver is ready
+    interval = None
+    next_sample = 0
+    consecutive_timeouts = 0
+    while True:
+        timeout = 0.1 if interval is None else max(0, next_sample - time.time())
+        if conn.poll(timeout):
+            message = conn.recv()
+            command = message[0]
+            if command == 'quit':
+                break
+            if command == 'start_sampling':
+                interval = message[1]
+                next_sample = time.time()
+                consecutive_timeouts = 0
+                ring.header[1] = 0
+                conn.send(('ok', None, _state(driver)))
+            elif command == 'stop_sampling':
+                interval = None
+                conn.send(('ok', None, _state(driver)))
+            else:
+                conn.send(_execute(driver, *message))
+            continue
+        if interval is None or not driver.connected:
+            continue
+        now = time.time()
+        next_sample += interval
+        try:
+            power, _ = driver.power
+        except driver._VisaIOError as e:
+            error_code = getattr(e, 'error_code', None)
+            if error_code == VI_ERROR_TMO and consecutive_timeouts + 1 < _MAX_CONSECUTIVE_TIMEOUTS:
+                consecutive_timeouts += 1
+                ring.header[4] += 1  #Timeouts are transient: signal it to the parent process, skip the reading and keep sampling
+                continue
+            ring.header[3] = 0 if error_code is None else error_code
+            ring.header[1] = 1  #Signal the error to the parent process, and stop sampling
+            interval = None
+            continue
+        except Exception:
+            ring.header[2] += 1  #E.g. a malformed answer. Signal the error to the parent process, skip the reading and keep sampling
+            continue
+        consecutive_timeouts = 0
+        ring.write(now, math.nan if power is None else power)
+        if next_sample < now:   #If we are late (e.g. because a command took long), we do not try to catch up with a burst of readings
+            next_sample = now + interval
+    if driver.connected:
+        driver.disconnect_device()
+    del ring
+    shm.close()
+
+
+def _state(driver):
+    return {name: getattr(driver, name, None) for name in _MIRRORED_ATTRIBUTES}
+
+
+def _execute(driver, kind, name, *args):
+    try:
+        if kind == 'get':
+            result = getattr(driver, name)
+        elif kind == 'set':
+            setattr(driver, name, args[0])
+            result = None
+        else:
+            result = getattr(driver, name)(*args)
+        return ('ok', result, _state(driver))
+    except driver._VisaIOError as e:
+        return ('error', 'VisaIOError', str(e), getattr(e, 'error_code', None), _state(driver))
+    except Exception as e:
+        return ('error', type(e).__name__, str(e), None, _state(driver))
+
+
+class ProcessDriver:
+    """
+    Drop-in replacement for :class:`~pyThorlabsPM100x.driver.ThorlabsPM100x` which runs the
+    actual driver in a child process.
+
+    All public properties and methods of :class:`~pyThorlabsPM100x.driver.ThorlabsPM100x` are available
+    with the same signatures, and are forwarded to the child process (the VISA objects themselves,
+    such as ``rm`` and ``instrument``, only exist in the child process). The cached attributes of the
+    driver (``connected``, ``min_wavelength``, ``_power_range``, etc.) are copied back after each
+    command, so that they can be read without any inter-process communication.
+
+    On top of that, :meth:`start_sampling` makes the child process read the power continuously at a
+    fixed interval, independently of the parent process. The readings are stored in a shared memory
+    ring buffer, and are retrieved with :meth:`read_block`.
+
+    Attributes
+    ----------
+    capacity : int
+        Size (number of samples) of the shared memory ring buffer.
+    lost_samples : int
+        Number of samples which were overwritten in the ring buffer before :meth:`read_block` was
+        called (i.e. :meth:`read_block` was not called often enough).
+    clock : WallClock
+        The readings of the child process are always timestamped with the system time.
+    """
+
+    model_identifiers = pyThorlabsPM100x.driver.ThorlabsPM100x.model_identifiers
+
+    def __init__(self, model=None, virtual=False, capacity=65536, profile_cache=None):
+        '''
+        Parameters
+        ----------
+        model : str, optional
+            See :class:`~pyThorlabsPM100x.driver.ThorlabsPM100x`.
+        virtual : bool, optional
+            See :class:`~pyThorlabsPM100x.driver.ThorlabsPM100x`.
+        capacity : int, optional
+            Size (number of samples) of the shared memory ring buffer. Default is 65536.
+        profile_cache : str, optional
+            See :class:`~pyThorlabsPM100x.driver.ThorlabsPM100x`.
+        '''
+        self._VisaIOError = VisaIOError
+        self.clock = WallClock()
+        self.capacity = capacity
+        self.lost_samples = 0
+        self.sampling = False
+        self._read_count = 0
+        self._invalid_count = 0
+        self._timeout_count = 0
+        self._sampling_error = None     # VisaIOError which stopped the sampling of the child process, raised again by read_block() until the sampling is restarted
+        self._lock = threading.Lock()
+        for name in _MIRRORED_ATTRIBUTES:
+            setattr(self, name, None)
+        self.connected = False
+        self.model_user = model
+        self.being_zeroed = 0
+        self.list_valid_devices = []
+        self._shm = shared_memory.SharedMemory(create=True, size=_Ring.size_in_bytes(capacity))
+        self._ring = _Ring(self._shm.buf, capacity)
+        self._ring.header[:] = 0
+        context = multiprocessing.get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(child_conn, self._shm.name, capacity, model, virtual, profile_cache), daemon=True)
+        self._process.start()
+        try:
+            self._handle_answer(self._conn.recv())   #Wait until the driver has been created in the child process, and raise any error raised while creating it
+        except Exception:
+            self.close()
+            raise
+
+    def _call(self, kind, name, *args):
+        with self._lock:
+            if not self._process.is_alive():
+                raise RuntimeError("The acquisition process is not running.")
+            self._conn.send((kind, name) + args)
+            answer = self._conn.recv()
+        return self._handle_answer(answer)
+
+    def _handle_answer(self, answer):
+        for key, value in answer[-1].items():
+            setattr(self, key, value)
+        if answer[0] == 'ok':
+            return answer[1]
+        _, error_type, message, error_code, _ = answer
+        if error_type == 'VisaIOError':
+            raise VisaIOError(message, error_code)
+        raise {'RuntimeError': RuntimeError, 'ValueError': ValueError, 'TypeError': TypeError}.get(error_type, RuntimeError)(message)
+
+    def list_devices(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.list_devices`.'''
+        return self._call('call', 'list_devices')
+
+    def update_list_devices(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.update_list_devices`.'''
+        return self._call('call', 'update_list_devices')
+
+    def connect_device(self, device_addr):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.connect_device`.'''
+        return self._call('call', 'connect_device', device_addr)
+
+    def read_parameters_upon_connection(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.read_parameters_upon_connection`.'''
+        return self._call('call', 'read_parameters_upon_connection')
+
+    def close_idle_resources(self, max_idle=None):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.close_idle_resources`.'''
+        return self._call('call', 'close_idle_resources', max_idle)
+
+    def read_sensor_idn(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.read_sensor_idn`.'''
+        return self._call('call', 'read_sensor_idn')
+
+    def load_profile(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.load_profile`.'''
+        return self._call('call', 'load_profile')
+
+    def save_profile(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.save_profile`.'''
+        return self._call('call', 'save_profile')
+
+    def disconnect_device(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.disconnect_device`. Sampling is stopped before disconnecting.'''
+        if self.sampling:
+            self.stop_sampling()
+        return self._call('call', 'disconnect_device')
+
+    @property
+    def power(self):
+        '''
+        (float, str): The power currently measured by the console, and its units.
+
+        While sampling is on (see :meth:`start_sampling`), the most recent sample in the ring buffer
+        is returned, without any communication with the child process.
+        '''
+        if self.sampling and self._ring.header[0] > 0:
+            index = (self._ring.header[0] - 1) % self.capacity
+            value = float(self._ring.values[index])
+            return (None, '') if math.isnan(value) else (value, self._power_units)
+        return self._call('get', 'power')
+
+    @property
+    def cached_state(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.cached_state`. Built from the attributes copied back after the last command.'''
+        return {key: getattr(self, attr) for (key, attr) in pyThorlabsPM100x.driver.STATE_ATTRIBUTES.items()}
+
+    @property
+    def power_units(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.power_units`.'''
+        return self._call('get', 'power_units')
+
+    @property
+    def wavelength(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.wavelength`.'''
+        return self._call('get', 'wavelength')
+
+    @wavelength.setter
+    def wavelength(self, wl):
+        self._call('set', 'wavelength', wl)
+
+    def read_min_max_wavelength(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.read_min_max_wavelength`.'''
+        return self._call('call', 'read_min_max_wavelength')
+
+    @property
+    def min_power_range(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.min_power_range`.'''
+        return self._call('get', 'min_power_range')
+
+    @property
+    def max_power_range(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.max_power_range`.'''
+        return self._call('get', 'max_power_range')
+
+    @property
+    def auto_power_range(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.auto_power_range`.'''
+        return self._call('get', 'auto_power_range')
+
+    @auto_power_range.setter
+    def auto_power_range(self, status):
+        self._call('set', 'auto_power_range', status)
+
+    @property
+    def power_range(self):
+        '''See :attr:`~pyThorlabsPM100x.driver.ThorlabsPM100x.power_range`.'''
+        return self._call('get', 'power_range')
+
+    @power_range.setter
+    def power_range(self, power):
+        self._call('set', 'power_range', power)
+
+    def start_zero(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.start_zero`.'''
+        return self._call('call', 'start_zero')
+
+    def read_zero_state(self):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.read_zero_state`.'''
+        return self._call('call', 'read_zero_state')
+
+    def set_zero_async(self, poll_interval=0.1, timeout=60):
+        '''
+        See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.set_zero_async`. The state of the zeroing
+        routine is polled by a thread of this process, so that the child process keeps sampling
+        (``NaN`` readings) in the meanwhile.
+        '''
+        return pyThorlabsPM100x.driver.zero_async(self, poll_interval, timeout)
+
+    def set_zero(self, poll_interval=0.1, timeout=60):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.set_zero`.'''
+        try:
+            self.set_zero_async(poll_interval, timeout).result()
+            return 1
+        except (VisaIOError, RuntimeError, ValueError):
+            return 0
+
+    def move_to_next_power_range(self, direction, LastPowerRange=None):
+        '''See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.move_to_next_power_range`.'''
+        return self._call('call', 'move_to_next_power_range', direction, LastPowerRange)
+
+    def sweep_wavelength(self, wavelengths, samples_per_point=1, settle_time=0):
+        '''
+        See :meth:`~pyThorlabsPM100x.driver.ThorlabsPM100x.sweep_wavelength`. The sweep is executed by
+        the child process, which does not take any sample for the ring buffer in the meanwhile.
+        '''
+        return self._call('call', 'sweep_wavelength', list(wavelengths), samples_per_point, settle_time)
+
+    def start_sampling(self, interval):
+        '''
+        Make the child process read the power every ``interval`` seconds, and store the readings
+        in the shared memory ring buffer. Calling this method while sampling is already on just
+        changes the sampling interval.
+
+        Parameters
+        ----------
+        interval : float
+            Time between consecutive readings, in seconds.
+
+        Raises
+        ------
+        RuntimeError
+            If no device is currently connected.
+        '''
+        if not self.connected:
+            raise RuntimeError("No powermeter is currently connected.")
+        with self._lock:
+            self._conn.send(('start_sampling', float(interval)))
+            self._conn.recv()
+        self.sampling = True
+        self._sampling_error = None
+
+    def stop_sampling(self):
+        '''Stop the continuous acquisition started by :meth:`start_sampling`. Samples not read yet are preserved.'''
+        with self._lock:
+            self._conn.send(('stop_sampling',))
+            self._conn.recv()
+        self.sampling = False
+        self._invalid_count = int(self._ring.header[2])     #Invalid readings and timeouts of a stopped acquisition are not reported
+        self._timeout_count = int(self._ring.header[4])
+
+    def read_block(self):
+        '''
+        Return all samples written in the ring buffer since the previous call.
+
+        Returns
+        -------
+        (timestamps, values) : (numpy.ndarray, numpy.ndarray)
+            Timestamps (in seconds since the epoch) and power values of the new samples. Values are
+            ``NaN`` for samples acquired while the device was being zeroed.
+
+        Raises
+        ------
+        VisaIOError
+            If the child process got a timeout since the previous call (the reading is skipped and
+            the sampling goes on; the error has the code :data:`VI_ERROR_TMO`), or if it stopped
+            sampling because of a VISA I/O error (another error, or :data:`_MAX_CONSECUTIVE_TIMEOUTS`
+            consecutive timeouts). In the latter case, samples acquired before the error are returned
+            by the following call, and the error (with the VISA error code of the original one) is then
+            raised by each call until the sampling is restarted.
+        ValueError
+            If the child process got invalid readings (e.g. malformed answers) since the previous call.
+            These readings are skipped, the sampling goes on, and the new samples are returned by the
+            following call.
+        '''
+        invalid_count = int(self._ring.header[2])
+        if invalid_count != self._invalid_count:
+            n_invalid = invalid_count - self._invalid_count
+            self._invalid_count = invalid_count
+            raise ValueError(f"{n_invalid} invalid reading(s) skipped by the acquisition process.")
+        timeout_count = int(self._ring.header[4])
+        if timeout_count != self._timeout_count:
+            n_timeouts = timeout_count - self._timeout_count
+            self._timeout_count = timeout_count
+            raise VisaIOError(f"{n_timeouts} timeout(s) while reading power in the acquisition process.", VI_ERROR_TMO)
+        count = int(self._ring.header[0])
+        if self._ring.header[1] and count == self._read_count:
+            error_code = int(self._ring.header[3]) or None
+            self._ring.header[1] = 0
+            self.sampling = False
+            self._sampling_error = VisaIOError("A VISA I/O error occurred while reading power in the acquisition process.", error_code)
+        if self._sampling_error is not None and count == self._read_count:
+            raise self._sampling_error
+        if count - self._read_count > self.capacity:
+            self.lost_samples += count - self._read_count - self.capacity
+            self._read_count = count - self.capacity
+        indices = np.arange(self._read_count, count) % self.capacity
+        self._read_count = count
+        return self._ring.timestamps[indices], self._ring.values[indices]
+
+    def close(self):
+        '''Stop the child process (disconnecting the device, if connected) and release the shared memory.'''
+        if self._process.is_alive():
+            with self._lock:
+                self._conn.send(('quit',))
+            self._process.join(5)
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()